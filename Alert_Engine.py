@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import requests
+
+from Perf_Metrics import timed
+from Core_Model import arrow
+
+# =========================
+# 조건 알림 (전체 리포트 대신 조건이 충족될 때만 짧은 메시지)
+# =========================
+# 실행: python Alert_Engine.py   (시세 한 번 조회 후 규칙 평가)
+# Watch_Daemon.py 에서는 조회할 때마다 evaluate()를 호출
+BOT_TOKEN = os.environ.get("BOT_TOKEN")
+CHAT_ID = os.environ.get("CHAT_ID")
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+
+STATE_FILE = "data/alert_state.json"
+
+# =========================
+# 알림 규칙
+# =========================
+#   holding_move : 보유 종목이 마지막 스냅샷 대비 ±pct% 이상 움직임
+#   account_below: 계좌 평가금액이 value 원 아래로 떨어짐
+#   fx_jump      : USD/KRW가 당일 첫 관측값 대비 ±pct% 이상 움직임
+ALERT_RULES = [
+    {"type": "holding_move", "pct": 3.0},
+    {"type": "account_below", "account": "IRP", "value": 3_000_000},
+    {"type": "account_below", "account": "Non Tax Pension", "value": 12_000_000},
+    {"type": "account_below", "account": "김종학", "value": 45_000_000},
+    {"type": "fx_jump", "pct": 1.0},
+]
+
+# 한 번 울린 알림은 기준선에서 이 비율만큼 되돌아와야 다시 울릴 수 있음
+HYSTERESIS = 0.5
+# 계좌 하한 알림은 기준선보다 이 비율 이상 회복해야 해제
+FLOOR_REARM = 0.01
+
+KST = ZoneInfo("Asia/Seoul")
+
+
+# =========================
+# 기준값 (리포트 스냅샷 / 포트폴리오)
+# =========================
+def load_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_holdings():
+    """[(계좌, 이름, 종목코드, 수량, 스냅샷 키, 스냅샷 파일)]"""
+    import Jonghak_ETF_Telegram as jonghak
+    import Pension_ETF_Telegram as pension
+
+    holdings = [
+        ("김종학", p["name"], p["code"], p["qty"], p["code"], jonghak.SNAPSHOT_PATH)
+        for p in jonghak.portfolio
+    ]
+    holdings += [
+        (p["account"], p["name"], p["code"], p["qty"], f"{p['account']}_{p['code']}", pension.SNAPSHOT_FILE)
+        for p in pension.portfolio
+    ]
+    return holdings
+
+
+def snapshot_prices(holdings):
+    """스냅샷 평가금액 / 수량 → 종목별 기준가"""
+    snapshots = {}
+    ref = {}
+    for _, _, code, qty, key, path in holdings:
+        snap = snapshots.setdefault(path, load_json(path))
+        if key in snap and qty:
+            ref[code] = snap[key] / qty
+    return ref
+
+
+# =========================
+# 엔진
+# =========================
+class AlertEngine:
+    def __init__(self, rules=None, holdings=None, state_file=STATE_FILE):
+        self.rules = ALERT_RULES if rules is None else rules
+        self.holdings = load_holdings() if holdings is None else holdings
+        self.state_file = state_file
+        self.state = load_json(state_file)
+        self.state.setdefault("active", {})
+        self.ref_prices = snapshot_prices(self.holdings)
+
+    def account_values(self, prices):
+        """계좌별 평가금액. 시세가 빠진 종목이 하나라도 있는 계좌는 제외 (일부 합계로 하한선 오판 방지)"""
+        values = {}
+        partial = set()
+        for acc, _, code, qty, _, _ in self.holdings:
+            if code in prices:
+                values[acc] = values.get(acc, 0) + qty * prices[code]
+            else:
+                partial.add(acc)
+        return {acc: value for acc, value in values.items() if acc not in partial}
+
+    def _conditions(self, prices, fx):
+        """규칙별 (키, 발동 여부, 해제 여부, 메시지) 생성"""
+        names = {code: name for _, name, code, _, _, _ in self.holdings}
+        accounts = None
+
+        for rule in self.rules:
+            kind = rule["type"]
+
+            if kind == "holding_move":
+                pct = rule["pct"]
+                for code, ref in self.ref_prices.items():
+                    if code not in prices or not ref:
+                        continue
+                    move = (prices[code] - ref) / ref * 100
+                    for sign in (1, -1):
+                        yield (
+                            f"move:{code}:{'up' if sign > 0 else 'down'}",
+                            move * sign >= pct,
+                            move * sign < pct * (1 - HYSTERESIS),
+                            f"{arrow(move)} {names.get(code, code)} {move:+.2f}% "
+                            f"(기준 {ref:,.0f}원 → {prices[code]:,.0f}원)",
+                        )
+
+            elif kind == "account_below":
+                if accounts is None:
+                    accounts = self.account_values(prices)
+                acc, floor = rule["account"], rule["value"]
+                if acc not in accounts:
+                    # 시세가 일부만 있는 계좌 → 이번 조회는 판단하지 않음 (발동 / 해제 모두)
+                    continue
+                value = accounts[acc]
+                yield (
+                    f"floor:{acc}",
+                    value < floor,
+                    value >= floor * (1 + FLOOR_REARM),
+                    f"🔻 {acc} 평가금액 {value:,.0f}원 (기준 {floor:,.0f}원 하회)",
+                )
+
+            elif kind == "fx_jump" and fx:
+                today = datetime.now(KST).strftime("%Y-%m-%d")
+                ref = self.state.get("fx_ref")
+                if not ref or ref["date"] != today:
+                    ref = self.state["fx_ref"] = {"date": today, "value": fx}
+                move = (fx - ref["value"]) / ref["value"] * 100
+                pct = rule["pct"]
+                yield (
+                    "fx_jump",
+                    abs(move) >= pct,
+                    abs(move) < pct * (1 - HYSTERESIS),
+                    f"💱 USD/KRW {fx:,.2f}원 ({move:+.2f}%, 당일 시작 {ref['value']:,.2f}원)",
+                )
+
+    def evaluate(self, prices, fx=None):
+        """시세 한 건 평가 → 새로 발동한 알림 메시지 목록"""
+        active = self.state["active"]
+        fired = []
+        for key, triggered, cleared, message in self._conditions(prices, fx):
+            if triggered and not active.get(key):
+                active[key] = True
+                fired.append(message)
+            elif cleared and active.get(key):
+                active.pop(key)
+        return fired
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+
+
+def render_alerts(fired):
+    now = datetime.now(KST).strftime("%H:%M")
+    return "\n".join([f"🚨 알림 ({now})"] + fired)
+
+
+@timed("send", "telegram:sendMessage")
+def send_alerts(fired, session=requests):
+    url = f"{TELEGRAM_API_URL}/bot{BOT_TOKEN}/sendMessage"
+    session.post(url, data={"chat_id": CHAT_ID, "text": render_alerts(fired)}, timeout=10)
+
+
+def main():
+    from Quote_Client import QuoteClient
+
+    engine = AlertEngine()
+    client = QuoteClient()
+    try:
+        codes = {code for _, _, code, _, _, _ in engine.holdings}
+        prices = client.prices(codes)
+        fx = client.usdkrw() if any(r["type"] == "fx_jump" for r in engine.rules) else None
+    finally:
+        client.close()
+
+    fired = engine.evaluate(prices, fx)
+    if fired:
+        send_alerts(fired)
+    else:
+        print("발동한 알림 없음")
+    engine.save()
+
+
+if __name__ == "__main__":
+    if not BOT_TOKEN or not CHAT_ID:
+        print("오류: BOT_TOKEN 또는 CHAT_ID 환경 변수가 설정되지 않았습니다.")
+        sys.exit(1)
+    main()
@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================
+# 봇 실행기 (봇별 의존성 그룹 + 병렬 실행)
+# =========================
+# 실행
+#   python Bot_Launcher.py etf index            # 여러 봇을 동시에 실행
+#   python Bot_Launcher.py --install etf index  # 필요한 의존성 그룹만 설치 (CI 에서 캐시 없을 때)
+#   python Bot_Launcher.py --requirements etf   # 필요한 requirements 파일 목록
+#   --sequential                                # 한 번에 하나씩 (순서 유지)
+#   --profile                                   # 봇마다 data/profiles/ 에 프로파일 기록 (Profiler.py)
+# 표준 라이브러리만 사용 → 의존성 설치 전에도 실행 가능
+# 공용 data/ 파일은 State_File 로 잠금 / 원자적 저장 → 동시에 실행해도 서로 덮어쓰지 않음
+REQUIREMENTS_DIR = "requirements"
+BOT_TIMEOUT = int(os.environ.get("BOT_TIMEOUT", "0")) or None   # 초 (0 = 제한 없음)
+
+BOTS = {
+    # 이름: (스크립트, 의존성 그룹)
+    "jonghak": ("Jonghak_ETF_Telegram.py", ["reports"]),
+    "pension": ("Pension_ETF_Telegram.py", ["reports"]),
+    "three_women": ("Three_Women_ETF.py", ["reports"]),
+    "woorisaju": ("Woorisaju.py", ["reports"]),
+    "risk": ("Risk_Analytics.py", ["reports"]),
+    "watch": ("Watch_Daemon.py", ["reports"]),
+    "command_server": ("Command_Server.py", ["reports", "index"]),
+    "index": ("Index.py", ["index"]),
+    "total_etf": ("Total_ETF_Stocks_Telegram_for_GIThub.py", ["total_etf"]),
+    "investment_share": ("Investment_Share.py", ["invest"]),
+    "news": ("NEWS.py", ["news"]),
+    "lotto": ("Lotto.py", ["lotto"]),
+    "lotto_backtest": ("Lotto_Backtest.py", ["lotto"]),
+    "english": ("EnglishPatternBot.py", ["english"]),
+}
+
+# 묶음 이름
+ALIASES = {
+    "etf": ["jonghak", "pension", "three_women", "woorisaju"],
+}
+
+
+def resolve(names):
+    bots = []
+    for name in names:
+        for bot in ALIASES.get(name, [name]):
+            if bot not in BOTS:
+                raise SystemExit(f"알 수 없는 봇: {bot} (가능: {', '.join([*BOTS, *ALIASES])})")
+            if bot not in bots:
+                bots.append(bot)
+    return bots
+
+
+def requirement_files(bots):
+    groups = dict.fromkeys(g for b in bots for g in BOTS[b][1])
+    return [os.path.join(REQUIREMENTS_DIR, f"{g}.txt") for g in groups]
+
+
+def install(bots):
+    """pip 한 번에 필요한 그룹 전부 설치 (공통 패키지 중복 해석 없음)"""
+    args = [a for f in requirement_files(bots) for a in ("-r", f)]
+    subprocess.run([sys.executable, "-m", "pip", "install", "--disable-pip-version-check", *args], check=True)
+
+
+# =========================
+# 실행
+# =========================
+_print_lock = threading.Lock()
+
+
+def _pump(name, stream):
+    # 봇 출력을 줄 단위로 이름을 붙여 바로 전달 (여러 봇 출력이 섞여도 구분 가능)
+    for line in iter(stream.readline, ""):
+        with _print_lock:
+            sys.stdout.write(f"[{name}] {line}")
+            sys.stdout.flush()
+    stream.close()
+
+
+def start(bot):
+    script = BOTS[bot][0]
+    proc = subprocess.Popen(
+        [sys.executable, script],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env={**os.environ, "PYTHONIOENCODING": "utf-8", "PYTHONUNBUFFERED": "1"},
+    )
+    pump = threading.Thread(target=_pump, args=(bot, proc.stdout), daemon=True)
+    pump.start()
+    return proc, pump
+
+
+def finish(bot, proc, pump, started):
+    try:
+        code = proc.wait(timeout=BOT_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        code = proc.wait()
+        print(f"[{bot}] 시간 초과 ({BOT_TIMEOUT}초) → 종료")
+    pump.join()
+    return code, time.perf_counter() - started
+
+
+def launch(bot):
+    started = time.perf_counter()
+    return finish(bot, *start(bot), started)
+
+
+def run(bots, parallel=True):
+    """→ {봇: (종료 코드, 걸린 초)}"""
+    if parallel:
+        with ThreadPoolExecutor(max_workers=len(bots)) as pool:
+            results = dict(zip(bots, pool.map(launch, bots)))
+    else:
+        results = {b: launch(b) for b in bots}
+
+    for b, (code, seconds) in results.items():
+        status = "OK" if code == 0 else f"실패 (코드 {code})"
+        print(f"• {b}: {status}, {seconds:.1f}초")
+    return results
+
+
+if __name__ == "__main__":
+    names = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not names:
+        print("사용법: python Bot_Launcher.py [--install | --requirements | --sequential | --profile] <봇 ...>")
+        print(f"봇: {', '.join(BOTS)} / 묶음: {', '.join(ALIASES)}")
+        sys.exit(1)
+    bots = resolve(names)
+    if "--profile" in sys.argv:
+        os.environ["PROFILE"] = "1"   # 자식 프로세스가 환경변수로 이어받음
+
+    if "--requirements" in sys.argv:
+        print("\n".join(requirement_files(bots)))
+    elif "--install" in sys.argv:
+        install(bots)
+    else:
+        results = run(bots, parallel="--sequential" not in sys.argv)
+        sys.exit(max(code for code, _ in results.values()) and 1)
@@ -0,0 +1,252 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from Quote_Client import QuoteClient, is_krx_code
+from Share_Allocator import allocate
+from Perf_Metrics import timed, flush
+from Market_Calendar import is_open
+
+# =========================
+# 텔레그램 명령 응답 서버 (long polling)
+# =========================
+# 실행: python Command_Server.py
+# 명령: /pension /jonghak /woorisaju /index /alloc <예산> /price <코드>
+# 시세와 리포트는 백그라운드에서 미리 계산해 두고 캐시에서 바로 응답
+BOT_TOKEN = os.environ["BOT_TOKEN"]
+CHAT_ID = os.environ["CHAT_ID"]
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+
+REFRESH_SECONDS = int(os.environ.get("CMD_REFRESH_SECONDS", "60"))
+INDEX_REFRESH_SECONDS = int(os.environ.get("CMD_INDEX_REFRESH_SECONDS", "600"))
+POLL_TIMEOUT = 25
+ERROR_BACKOFF = 3          # 네트워크 오류 후 대기 (초)
+API_ERROR_BACKOFF = 30     # 토큰 오류(401) / 다른 폴러·웹훅 충돌(409) 등 {"ok": false} 후 대기 (초)
+INPUT_FILE = "input.txt"
+
+HELP_TEXT = (
+    "📋 사용 가능한 명령\n"
+    "/pension - 연금 / ISA 리포트\n"
+    "/jonghak - 김종학 ETF 리포트\n"
+    "/woorisaju - 우리사주 리포트\n"
+    "/index - 시장 요약\n"
+    "/alloc <예산> - input.txt 비중대로 매수 수량 계산\n"
+    "/price <코드> - 현재가 조회"
+)
+
+
+# =========================
+# 미리 계산해 두는 캐시
+# =========================
+class WarmCache:
+    def __init__(self, client):
+        self.client = client
+        self.reports = {}
+        self.lock = threading.Lock()
+
+    def report_modules(self):
+        import Jonghak_ETF_Telegram as jonghak
+        import Pension_ETF_Telegram as pension
+        import Woorisaju as woorisaju
+        return {"jonghak": jonghak, "pension": pension, "woorisaju": woorisaju}
+
+    def refresh_portfolios(self):
+        """보유 종목 시세를 한 번에 새로 받아 세 리포트를 다시 작성"""
+        modules = self.report_modules()
+        codes = {p["code"] for m in modules.values() for p in m.portfolio}
+        prices = self.client.prices(codes, max_age=0)
+
+        for name, module in modules.items():
+            # 조회 실패 종목은 빼고 전달 → 리포트에 '시세 조회 실패'로 표시
+            module_prices = {p["code"]: prices[p["code"]] for p in module.portfolio if p["code"] in prices}
+            with timed("compute", f"report:{name}"):
+                text = module.build_report(module_prices, module.load_snapshot())[0]
+            with self.lock:
+                self.reports[name] = text
+
+    def refresh_index(self):
+        import Index
+        text = Index.build_report()[0]
+        with self.lock:
+            self.reports["index"] = text
+
+    def get(self, name):
+        with self.lock:
+            return self.reports.get(name)
+
+    def run_forever(self):
+        last_index = 0
+        while True:
+            # KRX 장이 닫혀 있으면 이미 만들어 둔 리포트를 그대로 사용
+            if is_open("KRX") or self.get("pension") is None:
+                try:
+                    self.refresh_portfolios()
+                except Exception as e:
+                    print(f"[WARN] 리포트 갱신 실패 ({e})")
+            if time.monotonic() - last_index >= INDEX_REFRESH_SECONDS:
+                try:
+                    self.refresh_index()
+                    last_index = time.monotonic()
+                except Exception as e:
+                    print(f"[WARN] 시장 요약 갱신 실패 ({e})")
+            flush()
+            time.sleep(REFRESH_SECONDS)
+
+
+# =========================
+# 명령 처리
+# =========================
+def load_weights():
+    """input.txt 의 '종목, 비중' 줄 (첫 줄 예산은 무시)"""
+    with open(INPUT_FILE, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    weights = []
+    for line in lines[1:]:
+        parts = line.split(",")
+        if len(parts) == 2:
+            weights.append((parts[0].strip().upper(), float(parts[1].strip())))
+    return weights
+
+
+class CommandHandler:
+    def __init__(self, cache, client):
+        self.cache = cache
+        self.client = client
+
+    def report(self, name):
+        text = self.cache.get(name)
+        if text is None:
+            if name == "index":
+                self.cache.refresh_index()
+            else:
+                self.cache.refresh_portfolios()
+            text = self.cache.get(name)
+        return text or "⚠️ 리포트를 준비하지 못했습니다."
+
+    def price(self, args):
+        if not args:
+            return "사용법: /price <코드>"
+        symbol = args[0].upper()
+        price = self.client.price(symbol)
+        if is_krx_code(symbol):
+            return f"💹 {symbol}: {price:,}원"
+        fx = self.client.usdkrw()
+        return f"💹 {symbol}: ${price:,.2f} (₩{price * fx:,.0f})"
+
+    def alloc(self, args):
+        if not args:
+            return "사용법: /alloc <예산>"
+        budget = float(args[0].replace(",", ""))
+        weights = load_weights()
+        symbols = [s for s, _ in weights]
+        prices = self.client.prices(symbols)
+        fx = self.client.usdkrw() if any(not is_krx_code(s) for s in symbols) else 1
+
+        priced = [(s, w, prices[s] * (1 if is_krx_code(s) else fx)) for s, w in weights if s in prices]
+        if not priced:
+            return "⚠️ 시세를 가져오지 못했습니다."
+        sub_budget = budget * sum(w for _, w, _ in priced) / 100
+        qtys, cash = allocate(sub_budget, [p for _, _, p in priced], [w for _, w, _ in priced])
+
+        lines = [f"📝 {budget:,.0f}원 배분"]
+        for (symbol, weight, price), qty in zip(priced, qtys):
+            lines.append(f"• {symbol} {weight:g}% → {int(qty)}주 (@{price:,.0f}원)")
+        missing = [s for s in symbols if s not in prices]
+        if missing:
+            lines.append(f"❌ 시세 조회 실패: {', '.join(missing)}")
+        lines.append(f"☕ 예상 잔액: {cash:,.0f}원")
+        return "\n".join(lines)
+
+    def handle(self, text):
+        command, *args = text.strip().split()
+        command = command.split("@")[0].lower()
+        if command in ("/pension", "/jonghak", "/woorisaju", "/index"):
+            return self.report(command[1:])
+        if command == "/price":
+            return self.price(args)
+        if command == "/alloc":
+            return self.alloc(args)
+        if command in ("/help", "/start"):
+            return HELP_TEXT
+        return None
+
+
+# =========================
+# long polling 루프
+# =========================
+class TelegramAPIError(Exception):
+    """텔레그램이 {"ok": false} 로 응답 (429 면 retry_after 초 뒤 재시도)"""
+
+    def __init__(self, method, body):
+        self.code = body.get("error_code")
+        self.retry_after = (body.get("parameters") or {}).get("retry_after")
+        super().__init__(f"{method} {self.code}: {body.get('description')}")
+
+
+class CommandServer:
+    def __init__(self, client=None, workers=8):
+        self.client = client or QuoteClient(ttl=REFRESH_SECONDS)
+        self.cache = WarmCache(self.client)
+        self.handler = CommandHandler(self.cache, self.client)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.session = self.client.session
+        self.offset = 0
+
+    def api(self, method, http_timeout=10, **data):
+        res = self.session.post(f"{TELEGRAM_API_URL}/bot{BOT_TOKEN}/{method}", data=data, timeout=http_timeout)
+        body = res.json()
+        if not body.get("ok"):
+            raise TelegramAPIError(method, body)
+        return body.get("result")
+
+    def reply(self, chat_id, text):
+        with timed("send", "telegram:sendMessage"):
+            self.api("sendMessage", chat_id=chat_id, text=text)
+
+    def handle_update(self, update):
+        message = update.get("message") or {}
+        text = message.get("text", "")
+        chat_id = message.get("chat", {}).get("id")
+        # 등록된 채팅방의 명령만 응답
+        if str(chat_id) != str(CHAT_ID) or not text.startswith("/"):
+            return
+        try:
+            with timed("compute", f"command:{text.split()[0]}"):
+                answer = self.handler.handle(text)
+        except Exception as e:
+            answer = f"⚠️ 처리 중 오류: {e}"
+        if answer:
+            self.reply(chat_id, answer)
+
+    def poll_once(self):
+        updates = self.api("getUpdates", POLL_TIMEOUT + 10, offset=self.offset, timeout=POLL_TIMEOUT)
+        for update in updates or []:
+            self.offset = update["update_id"] + 1
+            self.executor.submit(self.handle_update, update)
+
+    def serve_forever(self):
+        threading.Thread(target=self.cache.run_forever, daemon=True).start()
+        while True:
+            try:
+                self.poll_once()
+            except TelegramAPIError as e:
+                wait = e.retry_after or API_ERROR_BACKOFF
+                print(f"[WARN] getUpdates 거부 ({e}) → {wait}초 후 재시도")
+                time.sleep(wait)
+            except (requests.RequestException, ValueError) as e:
+                print(f"[WARN] getUpdates 실패 ({e})")
+                time.sleep(ERROR_BACKOFF)
+
+
+if __name__ == "__main__":
+    server = CommandServer()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown(wait=False)
+        server.client.close()
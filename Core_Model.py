@@ -0,0 +1,238 @@
+import numpy as np
+
+# =========================
+# 보유 종목 / 시세 / 평가 공통 모델
+# =========================
+# - Holding   : 보유 종목 한 줄 (설정값)
+# - Quote     : 조회한 시세 한 건 (지연 시세면 stale_at 에 저장 시각)
+# - Valuation : 평가 결과 한 줄 (종목 / 계좌 합계 / 전체 합계 공통, Report_Renderer 템플릿 입력)
+# - Portfolio : 보유 종목을 열 배열(numpy)로 들고 시세를 한 번에 반영 → 평가금액 / 계좌 합계는 배열 연산
+# 모두 __slots__ → 인스턴스마다 __dict__ 가 없어 종목 수만 개(과거 재생 등)에서도 메모리 / 속성 접근 비용이 작음
+# 원화 종목은 정수 배열 그대로 계산 → 리포트 숫자 형식({now:,})이 바뀌지 않음
+
+
+# 등락 표시 (상승, 하락, 보합) — Total_ETF 리포트는 굵은 화살표 사용
+ARROWS = ("🔺", "🔻", "➖")
+BOLD_ARROWS = ("⬆️", "⬇️", "➖")
+
+
+def arrow(val, marks=ARROWS):
+    return marks[0] if val > 0 else marks[1] if val < 0 else marks[2]
+
+
+class Holding:
+    __slots__ = ("name", "code", "qty", "buy", "account", "currency", "principal")
+
+    def __init__(self, name, code, qty, buy=None, account=None, currency="KRW", principal=None):
+        self.name = name
+        self.code = code
+        self.qty = qty
+        self.buy = buy                # 평균 매수가 (principal 이 있으면 무시)
+        self.account = account
+        self.currency = currency
+        self.principal = principal    # 투자 원금 (원화)
+
+    @classmethod
+    def from_record(cls, record):
+        """포트폴리오 설정 dict ({"name", "code" 또는 "ticker", "qty", ...}) → Holding"""
+        return cls(
+            record["name"],
+            record.get("code") or record.get("ticker"),
+            record["qty"],
+            record.get("buy"),
+            record.get("account"),
+            record.get("currency", "KRW"),
+            record.get("principal"),
+        )
+
+    @property
+    def cost(self):
+        return self.principal if self.principal is not None else self.qty * self.buy
+
+    def __repr__(self):
+        return f"Holding({self.name!r}, {self.code!r}, qty={self.qty})"
+
+
+class Quote:
+    __slots__ = ("code", "price", "stale_at")
+
+    def __init__(self, code, price, stale_at=None):
+        self.code = code
+        self.price = price
+        self.stale_at = stale_at      # 대체값이면 저장 시각, 제때 조회했으면 None
+
+    @classmethod
+    def table(cls, prices, stale=None):
+        """{코드: 가격} + {코드: 저장 시각} → {코드: Quote}"""
+        stale = stale or {}
+        return {code: cls(code, price, stale.get(code)) for code, price in prices.items()}
+
+    def __repr__(self):
+        return f"Quote({self.code!r}, {self.price!r}, stale_at={self.stale_at!r})"
+
+
+class Valuation:
+    __slots__ = ("name", "now", "cost", "prev", "price", "weight")
+
+    def __init__(self, name, now, cost, prev=None, price=None, weight=None):
+        self.name = name
+        self.now = now          # 평가금액
+        self.cost = cost        # 매수금액 또는 투자 원금
+        self.prev = prev        # 직전 스냅샷 평가금액 (없으면 now)
+        self.price = price      # 현재가
+        self.weight = weight    # 비중 (%)
+
+    @property
+    def profit(self):
+        return self.now - self.cost
+
+    @property
+    def rate(self):
+        return (self.now - self.cost) / self.cost * 100 if self.cost else 0
+
+    @property
+    def delta(self):
+        return self.now - (self.now if self.prev is None else self.prev)
+
+    # 템플릿({rate_arrow} 등)에서 행마다 읽으므로 arrow() 호출 없이 같은 식을 바로 계산
+    @property
+    def rate_arrow(self):
+        rate = (self.now - self.cost) / self.cost if self.cost else 0
+        return "🔺" if rate > 0 else "🔻" if rate < 0 else "➖"
+
+    @property
+    def profit_arrow(self):
+        profit = self.now - self.cost
+        return "🔺" if profit > 0 else "🔻" if profit < 0 else "➖"
+
+    @property
+    def delta_arrow(self):
+        delta = self.now - (self.now if self.prev is None else self.prev)
+        return "🔺" if delta > 0 else "🔻" if delta < 0 else "➖"
+
+    def values(self):
+        profit = self.now - self.cost
+        rate = profit / self.cost * 100 if self.cost else 0
+        delta = self.now - (self.now if self.prev is None else self.prev)
+        return {
+            "name": self.name,
+            "price": self.price,
+            "now": self.now,
+            "cost": self.cost,
+            "profit": profit,
+            "rate": rate,
+            "delta": delta,
+            "weight": self.weight,
+            "rate_arrow": arrow(rate),
+            "profit_arrow": arrow(profit),
+            "delta_arrow": arrow(delta),
+        }
+
+    def __repr__(self):
+        return f"Valuation({self.name!r}, now={self.now!r}, cost={self.cost!r}, prev={self.prev!r})"
+
+
+# =========================
+# 배열 기반 포트폴리오
+# =========================
+class Portfolio:
+    """보유 종목 열 배열 + 시세 반영 결과
+
+    key(holding) 는 스냅샷 키 (기본 종목코드, 계좌가 여러 개면 f"{계좌}_{코드}" 등)
+    mark() 이후 price / now / prev / priced 배열과 valuation() / totals() / total() 사용
+    """
+
+    __slots__ = ("holdings", "keys", "qty", "cost", "price", "now", "prev", "priced", "stale", "_groups")
+
+    def __init__(self, holdings, key=lambda h: h.code):
+        self.holdings = list(holdings)
+        self.keys = [key(h) for h in self.holdings]
+        self.qty = np.array([h.qty for h in self.holdings])
+        self.cost = np.array([h.cost for h in self.holdings])
+        n = len(self.holdings)
+        self.price = self.now = self.prev = np.zeros(n, dtype=np.int64)
+        self.priced = np.zeros(n, dtype=bool)
+        self.stale = np.zeros(n, dtype=bool)
+        self._groups = None
+
+    @classmethod
+    def from_records(cls, records, key=lambda h: h.code):
+        return cls((Holding.from_record(r) for r in records), key)
+
+    def __len__(self):
+        return len(self.holdings)
+
+    def __iter__(self):
+        return iter(self.holdings)
+
+    # -------------------------
+    # 시세 반영
+    # -------------------------
+    def mark(self, quotes, prev=None, fx=None):
+        """quotes {코드: Quote 또는 가격} / prev {스냅샷 키: 직전 평가금액} / fx {통화: 원화 환율}
+
+        시세가 없는 종목은 priced=False (합계에서 빠짐), 직전 값이 없는 종목은 prev = now
+        """
+        prev = prev or {}
+        found = [quotes.get(h.code) for h in self.holdings]
+        found = [q if q is None or isinstance(q, Quote) else Quote(h.code, q) for h, q in zip(self.holdings, found)]
+        self.priced = np.array([q is not None for q in found], dtype=bool)
+        self.stale = np.array([q is not None and q.stale_at is not None for q in found], dtype=bool)
+        raw = np.array([0 if q is None else q.price for q in found])
+        if fx:
+            # 원화가 아닌 종목은 환율 곱한 원화 가격 (평가금액은 수량 × 현지 가격 × 환율 순서)
+            rate = np.array([fx.get(h.currency, 1) for h in self.holdings])
+            self.price = raw * rate
+            self.now = self.qty * raw * rate
+        else:
+            self.price = raw
+            self.now = self.qty * raw
+        self.prev = np.array([prev.get(k, n) for k, n in zip(self.keys, self.now.tolist())])
+        return self
+
+    def snapshot(self, prev=None):
+        """다음 실행의 전일 대비 기준 → {스냅샷 키: 평가금액} (시세 없는 종목은 이전 값 유지)"""
+        prev = prev or {}
+        return {
+            k: n if ok else prev[k]
+            for k, n, ok in zip(self.keys, self.now.tolist(), self.priced.tolist())
+            if ok or k in prev
+        }
+
+    # -------------------------
+    # 평가 결과
+    # -------------------------
+    def valuation(self, i, name=None, weight=None):
+        return Valuation(
+            self.holdings[i].name if name is None else name,
+            self.now[i].item(), self.cost[i].item(), self.prev[i].item(),
+            price=self.price[i].item(), weight=weight,
+        )
+
+    def groups(self):
+        """{계좌: 종목 인덱스 배열} (처음 나온 순서)"""
+        if self._groups is None:
+            groups = {}
+            for i, h in enumerate(self.holdings):
+                groups.setdefault(h.account, []).append(i)
+            self._groups = {acc: np.array(idx, dtype=np.intp) for acc, idx in groups.items()}
+        return self._groups
+
+    def total(self, name="전체", index=None, cost=None):
+        """index(없으면 전체) 중 시세가 있는 종목 합계 → Valuation. cost 를 주면 원금으로 사용"""
+        mask = self.priced if index is None else self.priced[index]
+        pick = (lambda a: a[mask]) if index is None else (lambda a: a[index][mask])
+        return Valuation(
+            name,
+            pick(self.now).sum().item(),
+            pick(self.cost).sum().item() if cost is None else cost,
+            pick(self.prev).sum().item(),
+        )
+
+    def totals(self):
+        """{계좌: 계좌 합계 Valuation} (시세가 있는 종목이 하나도 없는 계좌는 빠짐)"""
+        return {
+            acc: self.total(acc, idx)
+            for acc, idx in self.groups().items()
+            if self.priced[idx].any()
+        }
@@ -1,7 +1,11 @@
 import os
-import pandas as pd
+import sys
+import json
+import hashlib
 from datetime import datetime, timedelta, timezone
 import requests
+from Perf_Metrics import timed, with_perf_footer
+from Profiler import profile_if_requested
 
 # ==========================================
 # 1. 환경 변수 및 설정
@@ -10,6 +14,7 @@ import requests
 BOT_TOKEN = os.environ.get("BOT_TOKEN")
 CHAT_ID = os.environ.get("CHAT_ID")
 EXCEL_FILE = "English_90Days_Master.xlsx"
+LESSON_STORE = "data/english_lessons.json"
 
 # 한국 시간(KST) 설정 (GitHub 서버는 UTC 기준이므로 필수)
 KST = timezone(timedelta(hours=9))
@@ -26,6 +31,52 @@ def get_today_day(start_date_str="2026-02-01"):
         print(f"날짜 계산 오류: {e}")
         return 1
 
+# ==========================================
+# 2. 학습 데이터 저장소 (엑셀 → Day별 JSON)
+# ==========================================
+def file_sha256(path):
+    """엑셀 변경 여부 판단용 해시"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def build_lesson_store(excel_file=EXCEL_FILE, store_file=LESSON_STORE):
+    """엑셀을 한 번 읽어 Day를 키로 하는 JSON 저장소 생성 (pandas는 여기서만 사용)"""
+    import pandas as pd
+
+    df = pd.read_excel(excel_file)
+    days = {}
+    for row in df.to_dict("records"):
+        days.setdefault(str(int(row["Day"])), []).append({
+            "Pattern": row["Pattern"],
+            "Example": row["Example"],
+            "Korean": row["Korean"],
+            "WritingTopic": row["WritingTopic"],
+        })
+
+    store = {"source_sha256": file_sha256(excel_file), "days": days}
+    os.makedirs(os.path.dirname(store_file), exist_ok=True)
+    with open(store_file, "w", encoding="utf-8") as f:
+        json.dump(store, f, ensure_ascii=False, separators=(",", ":"))
+    return store
+
+@timed("parse", "english_lessons")
+def load_lesson_store(excel_file=EXCEL_FILE, store_file=LESSON_STORE):
+    """저장소가 최신이면 그대로 사용, 엑셀이 바뀌었을 때만 재생성"""
+    store = None
+    if os.path.exists(store_file):
+        with open(store_file, "r", encoding="utf-8") as f:
+            store = json.load(f)
+
+    if os.path.exists(excel_file):
+        if store is None or store.get("source_sha256") != file_sha256(excel_file):
+            print(f"{excel_file} 변경 감지: 학습 데이터 저장소를 다시 생성합니다.")
+            store = build_lesson_store(excel_file, store_file)
+
+    return store
+
 def send_telegram(text):
     """텔레그램 메시지 전송 함수"""
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
@@ -35,12 +86,14 @@ def send_telegram(text):
         "parse_mode": "HTML",
         "disable_web_page_preview": True
     }
-    try:
-        response = requests.post(url, data=payload)
-        return response.status_code
-    except Exception as e:
-        print(f"텔레그램 전송 오류: {e}")
-        return 500
+    with timed("send", "telegram:sendMessage") as m:
+        try:
+            response = requests.post(url, data=payload)
+            return response.status_code
+        except Exception as e:
+            m.fail(e)
+            print(f"텔레그램 전송 오류: {e}")
+            return 500
 
 def main():
     # 환경 변수 체크
@@ -52,28 +105,27 @@ def main():
     day = get_today_day()
     
     try:
-        # 2. 엑셀 파일 로드
-        if not os.path.exists(EXCEL_FILE):
+        # 2. 학습 데이터 로드 (Day 키로 바로 조회)
+        store = load_lesson_store()
+        if store is None:
             print(f"오류: {EXCEL_FILE} 파일을 찾을 수 없습니다.")
             return
-            
-        df = pd.read_excel(EXCEL_FILE)
-        
-        # 3. 오늘 날짜 데이터 필터링 (구문 3개)
-        today_data = df[df["Day"] == day]
-        
-        if today_data.empty:
+
+        # 3. 오늘 날짜 데이터 조회 (구문 3개)
+        today_data = store["days"].get(str(day), [])
+
+        if not today_data:
             print(f"오류: Day {day}에 해당하는 데이터가 엑셀에 없습니다.")
             return
 
         # 4. 작문 주제 추출 (첫 번째 행에서 가져옴)
-        today_topic = today_data.iloc[0]["WritingTopic"]
+        today_topic = today_data[0]["WritingTopic"]
         
         # 5. 메시지 포맷 구성
         message = f"<b>📅 Day {day} English Pattern</b>\n"
         message += "━━━━━━━━━━━━━━━━━━\n\n"
         
-        for _, row in today_data.iterrows():
+        for row in today_data:
             message += f"💡 <b>{row['Pattern']}</b>\n"
             message += f"✍️ {row['Example']}\n"
             message += f"🇰🇷 {row['Korean']}\n\n"
@@ -83,7 +135,7 @@ def main():
         message += f"<i>{today_topic}</i>"
         
         # 6. 전송 실행
-        status = send_telegram(message)
+        status = send_telegram(with_perf_footer(message))
         
         if status == 200:
             print(f"성공: Day {day} 메시지를 발송했습니다.")
@@ -94,4 +146,9 @@ def main():
         print(f"실행 중 오류 발생: {e}")
 
 if __name__ == "__main__":
-    main()
+    profile_if_requested()
+    if "--build" in sys.argv:
+        build_lesson_store()
+        print(f"생성 완료: {LESSON_STORE}")
+    else:
+        main()
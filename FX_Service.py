@@ -0,0 +1,223 @@
+import os
+import csv
+import json
+import time
+import bisect
+import threading
+from datetime import datetime
+
+import requests
+
+from Perf_Metrics import timed, retrying
+from Price_Guard import REQUEST_TIMEOUT, SourceUnavailable, fetch_with_breaker
+from State_File import update_json
+
+# =========================
+# 환율 서비스 (일괄 조회 + TTL 캐시 + 시각별 기록)
+# =========================
+# 사용법
+#   fx = default_service()
+#   fx.rate("USD/KRW")                    # 캐시(TTL) → 없으면 사용 중인 통화쌍 전체 일괄 조회
+#   fx.convert(100, "USD")                # → 원화
+#   fx.rate_at("USD/KRW", "2026-10-16")   # 과거 시점 환율 (기록 기준)
+# 여러 봇이 차례로 실행돼도 data/fx_cache.json 을 공유해 TTL 동안 다시 조회하지 않음
+YAHOO_BASE_URL = os.environ.get("YAHOO_BASE_URL", "https://query1.finance.yahoo.com")
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+CACHE_FILE = "data/fx_cache.json"
+HISTORY_FILE = "data/history/fx.csv"
+FX_TTL = int(os.environ.get("FX_TTL", "600"))  # 초
+DEFAULT_PAIRS = ("USD/KRW",)
+HOME_CURRENCY = "KRW"
+
+
+def yahoo_symbol(pair):
+    """'USD/KRW' → 'KRW=X', 'JPY/KRW' → 'JPYKRW=X'"""
+    base, quote = pair.split("/")
+    return f"{quote}=X" if base == "USD" else f"{base}{quote}=X"
+
+
+class FXService:
+    def __init__(self, pairs=DEFAULT_PAIRS, ttl=FX_TTL, session=None,
+                 cache_file=CACHE_FILE, history_file=HISTORY_FILE):
+        self.pairs = list(pairs)
+        self.ttl = ttl
+        self.session = session or requests.Session()
+        self.cache_file = cache_file
+        self.history_file = history_file
+        self.stale = {}          # {통화쌍: 저장 시각} 조회 실패로 지난 값을 쓴 경우
+        self._cache = self._load_cache()
+        self._history = None
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # 캐시
+    # -------------------------
+    def _load_cache(self):
+        if not os.path.exists(self.cache_file):
+            return {}
+        with open(self.cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_cache(self):
+        # 다른 봇이 그사이 더 최근 값을 저장했으면 그 값을 유지
+        def merge(saved):
+            for pair, entry in self._cache.items():
+                if pair not in saved or saved[pair]["ts"] <= entry["ts"]:
+                    saved[pair] = entry
+        update_json(self.cache_file, merge)
+
+    def _fresh(self, pair, max_age):
+        entry = self._cache.get(pair)
+        if entry and time.time() - entry["ts"] < max_age:
+            return entry
+        return None
+
+    # -------------------------
+    # 원본 조회
+    # -------------------------
+    def _fetch_spark(self, pairs):
+        """여러 통화쌍을 요청 한 번으로 조회 → {통화쌍: (환율, 전일 종가)}"""
+        symbols = {yahoo_symbol(p): p for p in pairs}
+        url = f"{YAHOO_BASE_URL}/v8/finance/spark"
+        with timed("fetch", f"yahoo-spark:{','.join(symbols)}") as m:
+            res = self.session.get(
+                url,
+                params={"symbols": ",".join(symbols), "range": "1d", "interval": "1d"},
+                headers=HEADERS,
+                timeout=REQUEST_TIMEOUT,
+            )
+            m.add_bytes(len(res.content))
+            res.raise_for_status()
+        quotes = {}
+        for item in res.json()["spark"]["result"]:
+            meta = item["response"][0]["meta"]
+            pair = symbols.get(item["symbol"])
+            if pair and meta.get("regularMarketPrice"):
+                quotes[pair] = (meta["regularMarketPrice"], meta.get("chartPreviousClose"))
+        return quotes
+
+    def _fetch_chart(self, pair):
+        symbol = yahoo_symbol(pair)
+        with timed("fetch", f"yahoo:{symbol}") as m:
+            res = self.session.get(f"{YAHOO_BASE_URL}/v8/finance/chart/{symbol}", headers=HEADERS, timeout=REQUEST_TIMEOUT)
+            m.add_bytes(len(res.content))
+            res.raise_for_status()
+        meta = res.json()["chart"]["result"][0]["meta"]
+        return meta["regularMarketPrice"], meta.get("chartPreviousClose")
+
+    def _fetch(self, pairs):
+        try:
+            quotes = fetch_with_breaker("yahoo", self._fetch_spark, pairs, deadline=None)
+        except Exception as e:
+            print(f"[WARN] 환율 일괄 조회 실패 ({e}) → 통화쌍별 조회")
+            quotes = {}
+        for pair in pairs:
+            if pair in quotes:
+                continue
+            try:
+                # 일괄 조회에서 빠진 통화쌍을 다시 조회 → 재시도로 기록
+                with retrying():
+                    quotes[pair] = fetch_with_breaker("yahoo", self._fetch_chart, pair, deadline=None)
+            except Exception as e:
+                print(f"[WARN] 환율 조회 실패: {pair} ({e})")
+        return quotes
+
+    # -------------------------
+    # 조회
+    # -------------------------
+    def refresh(self, pairs=None, max_age=None):
+        """캐시가 지난 통화쌍만 모아 한 번에 조회"""
+        max_age = self.ttl if max_age is None else max_age
+        wanted = list(dict.fromkeys(list(pairs or []) + self.pairs))
+        with self._lock:
+            missing = [p for p in wanted if not self._fresh(p, max_age)]
+            if not missing:
+                return
+            quotes = self._fetch(missing)
+            now = time.time()
+            for pair, (rate, prev) in quotes.items():
+                self._cache[pair] = {"rate": rate, "prev": prev, "ts": now}
+                self.stale.pop(pair, None)
+            for pair in missing:
+                if pair not in quotes and pair in self._cache:
+                    self.stale[pair] = datetime.fromtimestamp(self._cache[pair]["ts"]).strftime("%Y-%m-%d %H:%M")
+            if quotes:
+                self._save_cache()
+                self._append_history(quotes, now)
+
+    def quote(self, pair="USD/KRW", max_age=None):
+        """→ (환율, 전일 종가). 조회 실패 시 지난 값, 그것도 없으면 (None, None)"""
+        if pair not in self.pairs:
+            self.pairs.append(pair)
+        self.refresh([pair], max_age)
+        entry = self._cache.get(pair)
+        if entry is None:
+            return None, None
+        return entry["rate"], entry.get("prev")
+
+    def rate(self, pair="USD/KRW", max_age=None):
+        return self.quote(pair, max_age)[0]
+
+    def rates(self, pairs=None, max_age=None):
+        pairs = list(pairs or self.pairs)
+        self.refresh(pairs, max_age)
+        return {p: self._cache[p]["rate"] for p in pairs if p in self._cache}
+
+    def convert(self, amount, currency, to=HOME_CURRENCY, max_age=None):
+        """외화 금액 → to 통화 (같은 통화면 그대로)"""
+        if currency == to:
+            return amount
+        rate = self.rate(f"{currency}/{to}", max_age)
+        return None if rate is None else amount * rate
+
+    # -------------------------
+    # 기록 (시각, 통화쌍, 환율)
+    # -------------------------
+    def _append_history(self, quotes, ts):
+        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+        stamp = datetime.fromtimestamp(ts).strftime("%Y-%m-%dT%H:%M:%S")
+        with open(self.history_file, "a", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            for pair, (rate, _) in quotes.items():
+                writer.writerow([stamp, pair, rate])
+        self._history = None
+
+    def history(self, pair):
+        """→ ([시각], [환율]) 시각순"""
+        if self._history is None:
+            self._history = {}
+            if os.path.exists(self.history_file):
+                with open(self.history_file, "r", encoding="utf-8", newline="") as f:
+                    for stamp, p, rate in csv.reader(f):
+                        times, values = self._history.setdefault(p, ([], []))
+                        times.append(stamp)
+                        values.append(float(rate))
+        return self._history.get(pair, ([], []))
+
+    def rate_at(self, pair, when):
+        """when('YYYY-MM-DD' 또는 'YYYY-MM-DDTHH:MM:SS') 시점에 가장 최근 기록된 환율"""
+        times, values = self.history(pair)
+        if len(when) == 10:
+            when += "T23:59:59"
+        i = bisect.bisect_right(times, when)
+        return values[i - 1] if i else None
+
+
+_default = None
+
+
+def default_service():
+    global _default
+    if _default is None:
+        _default = FXService()
+    return _default
+
+
+def guarded_rate(pair="USD/KRW", service=None):
+    """→ (환율, 저장 시각 또는 None). 지난 값도 없으면 SourceUnavailable"""
+    service = service or default_service()
+    rate = service.rate(pair)
+    if rate is None:
+        raise SourceUnavailable(f"환율 조회 실패: {pair}")
+    return rate, service.stale.get(pair)
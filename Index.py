@@ -1,45 +1,68 @@
 import os
-import requests
-import yfinance as yf
+import bisect
+import numpy as np
 import matplotlib.pyplot as plt
-from datetime import datetime
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 import io
+from Perf_Metrics import timed, with_perf_footer
+from Profiler import profile_if_requested
+from Telegram_Delivery import deliver_text, deliver_photo
+from Market_Calendar import check_sessions, mark_reported, is_trading_day, latest_session
+from FX_Service import default_service
+from OHLC_Cache import get_ohlc
 
 BOT_TOKEN = os.environ["BOT_TOKEN"]
 CHAT_ID = os.environ["CHAT_ID"]
 
+# 거래소 지수는 달력 기준으로 최근 거래일 / 직전 거래일 종가를 고름
+# (선물 / 환율 / 코인은 yfinance 행 그대로)
+CALENDAR_MARKETS = {"^KS11": "KRX", "^KQ11": "KRX", "^GSPC": "US", "^IXIC": "US"}
+
 # =============================
 # 텔레그램 전송
 # =============================
 def send_telegram(text, photo=None):
-    url_msg = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    requests.post(url_msg, data={
-        "chat_id": CHAT_ID,
-        "text": text,
-        "parse_mode": "HTML",
-        "disable_web_page_preview": True
-    })
+    # REPORT_DELIVERY=edit 이면 지난 리포트 메시지를 수정하거나 변경 없을 때 생략
+    deliver_text(
+        BOT_TOKEN, CHAT_ID, "index", text,
+        parse_mode="HTML",
+        disable_web_page_preview=True
+    )
     
     if photo:
-        url_photo = f"https://api.telegram.org/bot{BOT_TOKEN}/sendPhoto"
-        files = {'photo': photo}
-        requests.post(url_photo, data={"chat_id": CHAT_ID}, files=files)
+        deliver_photo(BOT_TOKEN, CHAT_ID, "index_chart", photo)
 
 # =============================
 # 가격 조회
 # =============================
 def get_price(ticker):
-    try:
-        df = yf.Ticker(ticker).history(period="3d")
-        if df.empty or len(df) < 2:
+    # 일봉은 data/ohlc 캐시에서 (지난 실행 이후 구간만 새로 받음)
+    rows = get_ohlc(ticker)
+    with timed("parse", f"ohlc:{ticker}") as m:
+        days = sorted(rows)
+        market = CALENDAR_MARKETS.get(ticker)
+        if market and days:
+            # 휴장일에 찍힌 행 / 아직 열리지 않은 날짜 행 제외
+            last = latest_session(market).isoformat()
+            days = [d for d in days if d <= last and is_trading_day(market, date.fromisoformat(d))]
+        if len(days) < 2:
+            m.fail(ValueError("history too short"))
             return None, None
-        today = float(df["Close"].iloc[-1])
-        prev = float(df["Close"].iloc[-2])
+        today = rows[days[-1]][3]
+        prev = rows[days[-2]][3]
         change = round((today - prev) / prev * 100, 2)
         return round(today, 2), change
-    except:
+
+def get_fx(pair="USD/KRW"):
+    # 환율은 FX_Service 공용 캐시 경유 (전일 대비는 전일 종가 기준)
+    rate, prev = default_service().quote(pair)
+    if rate is None:
         return None, None
+    change = round((rate - prev) / prev * 100, 2) if prev else None
+    return round(rate, 2), change
 
 # =============================
 # ⭐ 이모지 통일 (상승 ⬆️ / 하락 ⬇️ / 보합 -)
@@ -58,45 +81,117 @@ def fmt(val, unit="", change=None):
     return f"<b>{formatted_val} {unit}</b> ({change:+.2f}% {indicator})"
 
 # =============================
-# 그래프 생성 (가격 표시 추가)
+# 대시보드 (자산별 5D / 1M / YTD 스파크라인)
 # =============================
+DASHBOARD_TICKERS = {
+    "KOSPI": "^KS11", "KOSDAQ": "^KQ11", "S&P500": "^GSPC", "NASDAQ": "^IXIC",
+    "Gold": "GC=F", "Silver": "SI=F", "Copper": "HG=F", "Oil": "CL=F", "BTC": "BTC-USD",
+}
+WINDOWS = (("5D", 5), ("1M", 30), ("YTD", None))   # (이름, 달력 일수 / 거래일 수)
+PANEL_HEIGHT = 0.75  # inch
+DASHBOARD_DPI = 100
+PNG_COLORS = 64
+UP, DOWN, FLAT = "#ff4d4d", "#4d94ff", "#808080"
+
+
+def window(days, closes, span, size):
+    """마지막 날짜 기준 구간 종가"""
+    if span == "5D":
+        return closes[-size:]
+    last = date.fromisoformat(days[-1])
+    start = date(last.year, 1, 1) if size is None else last - timedelta(days=size)
+    return closes[bisect.bisect_left(days, start.isoformat()):]
+
+
+class Dashboard:
+    """그림 / 선 / 글자 객체는 처음 한 번만 만들고, 그릴 때는 데이터만 바꿈"""
+
+    def __init__(self, labels):
+        self.labels = list(labels)
+        n = len(self.labels)
+        height = PANEL_HEIGHT * n + 0.5
+        self.fig, axes = plt.subplots(n, len(WINDOWS), figsize=(9, height), dpi=DASHBOARD_DPI, squeeze=False)
+        self.canvas = FigureCanvasAgg(self.fig)
+        # bbox_inches="tight" (그림을 두 번 그림) 대신 여백 고정
+        self.fig.subplots_adjust(left=0.01, right=0.99, top=1 - 0.3 / height, bottom=0.1 / height,
+                                 hspace=0.8, wspace=0.06)
+        self.panels = []
+        for r in range(n):
+            for c in range(len(WINDOWS)):
+                ax = axes[r][c]
+                ax.set_axis_off()
+                line, = ax.plot([], [], linewidth=1.2)
+                base, = ax.plot([], [], linestyle=":", linewidth=0.8, color=FLAT)
+                title = ax.set_title("", loc="left", fontsize=8, fontweight="bold")
+                change = ax.text(1, 1.02, "", transform=ax.transAxes, ha="right", va="bottom", fontsize=8)
+                self.panels.append((ax, line, base, title, change))
+
+    def update(self, series, headers):
+        """series: {라벨: (날짜 목록, 종가 목록)} / headers: {라벨: 첫 칸 제목}"""
+        panels = iter(self.panels)
+        for label in self.labels:
+            days, closes = series.get(label, ([], []))
+            for span, size in WINDOWS:
+                ax, line, base, title, change = next(panels)
+                title.set_text(f"{headers.get(label, label)} · {span}" if span == WINDOWS[0][0] else span)
+                ys = window(days, closes, span, size) if days else []
+                if len(ys) < 2:
+                    line.set_data([], [])
+                    base.set_data([], [])
+                    change.set_text("N/A")
+                    change.set_color(FLAT)
+                    continue
+                rate = (ys[-1] - ys[0]) / ys[0] * 100
+                color = UP if rate > 0 else DOWN if rate < 0 else FLAT
+                xs = np.arange(len(ys))
+                line.set_data(xs, ys)
+                line.set_color(color)
+                base.set_data([0, len(ys) - 1], [ys[0], ys[0]])
+                change.set_text(f"{rate:+.2f}%")
+                change.set_color(color)
+                lo, hi = min(ys), max(ys)
+                pad = (hi - lo) * 0.08 or abs(hi) * 0.01 or 1
+                ax.set_xlim(0, len(ys) - 1)
+                ax.set_ylim(lo - pad, hi + pad)
+
+    def render(self):
+        """PNG 버퍼. 캔버스 픽셀을 바로 팔레트 PNG로 저장 (savefig 인코딩 / 디코딩 생략, 용량 약 1/3)"""
+        self.canvas.draw()
+        img = Image.frombuffer("RGBA", self.canvas.get_width_height(), self.canvas.buffer_rgba())
+        img = img.convert("RGB").quantize(colors=PNG_COLORS, method=Image.Quantize.FASTOCTREE)
+        out = io.BytesIO()
+        img.save(out, format="PNG", optimize=True)
+        out.seek(0)
+        return out
+
+
+_dashboards = {}
+
+
+@timed("render", "index_chart")
 def create_chart(labels, values, prices):
-    plt.figure(figsize=(12, 7))
-    colors = ['#ff4d4d' if v > 0 else '#4d94ff' if v < 0 else '#808080' for v in values]
-    
-    bars = plt.bar(labels, values, color=colors)
-    plt.axhline(0, color='black', linewidth=0.8)
-    plt.title("Market Change Rate (%) & Current Price", fontsize=15, fontweight='bold')
-    plt.ylabel("Change (%)")
-    plt.grid(axis='y', linestyle='--', alpha=0.5)
-
-    # 막대 위/아래에 정보 표시
-    for bar, val, price in zip(bars, values, prices):
-        yval = bar.get_height()
-        
-        # 1. 증감률(%) 표시 (막대 끝 부분)
-        plt.text(bar.get_x() + bar.get_width()/2, yval, f"{val:+.2f}%", 
-                 va='bottom' if yval >= 0 else 'top', ha='center', 
-                 fontsize=10, fontweight='bold')
-        
-        # 2. 현재 가격 표시 (막대 중간 또는 0선 근처)
-        # 텍스트가 겹치지 않도록 yval의 위치에 따라 높낮이 조절
-        price_y_pos = yval / 2 if abs(yval) > 2 else (1.5 if yval >= 0 else -1.5)
-        plt.text(bar.get_x() + bar.get_width()/2, price_y_pos, f"{price}", 
-                 va='center', ha='center', fontsize=9, 
-                 fontweight='bold', color='black',
-                 bbox=dict(facecolor='white', alpha=0.6, edgecolor='none', pad=1))
-
-    img_buf = io.BytesIO()
-    plt.savefig(img_buf, format='png', bbox_inches='tight')
-    img_buf.seek(0)
-    plt.close()
-    return img_buf
+    """자산 목록이 같으면 같은 Dashboard 재사용"""
+    key = tuple(labels)
+    if key not in _dashboards:
+        _dashboards[key] = Dashboard(labels)
+    series = {}
+    for label in labels:
+        rows = get_ohlc(DASHBOARD_TICKERS[label])
+        days = sorted(rows)
+        series[label] = (days, [rows[d][3] for d in days])
+    headers = {
+        label: f"{label} {price} ({val:+.2f}%)" if price != "0" else label
+        for label, val, price in zip(labels, values, prices)
+    }
+    dashboard = _dashboards[key]
+    dashboard.update(series, headers)
+    return dashboard.render()
 
 # =============================
 # MAIN
 # =============================
-def main():
+def build_report():
+    """시세 조회 후 메시지 / 그래프 데이터 작성 → (메시지, 라벨, 증감률, 가격표시)"""
     now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M")
 
     # 데이터 수집
@@ -104,17 +199,16 @@ def main():
     nasdaq, na_ch = get_price("^IXIC")
     kospi, ko_ch = get_price("^KS11")
     kosdaq, kq_ch = get_price("^KQ11")
-    usdkrw, fx_ch = get_price("KRW=X")
+    usdkrw, fx_ch = get_fx("USD/KRW")
     gold_usd, gold_ch = get_price("GC=F")
     silver_usd, silver_ch = get_price("SI=F")
     copper_usd, cu_ch = get_price("HG=F")
     oil_usd, oil_ch = get_price("CL=F")
     btc_usd, btc_ch = get_price("BTC-USD")
 
-    # 환산 계산
-    rate = usdkrw if usdkrw else 1450.0
-    gold_krw_don = (gold_usd * rate / 31.1035 * 3.75) if gold_usd else None
-    silver_krw_don = (silver_usd * rate / 31.1035 * 3.75) if silver_usd else None
+    # 환산 계산 (환율이 없으면 원화 환산은 조회 불가로 표시)
+    gold_krw_don = (gold_usd * usdkrw / 31.1035 * 3.75) if gold_usd and usdkrw else None
+    silver_krw_don = (silver_usd * usdkrw / 31.1035 * 3.75) if silver_usd and usdkrw else None
 
     # 메시지 작성
     message = (
@@ -159,8 +253,20 @@ def main():
         f"${btc_usd:,.0f}" if btc_usd else "0"
     ]
 
+    return message, labels, values, chart_prices
+
+def main():
+    # 지난 실행 이후 KRX / 미국 모두 새 거래일이 없으면 조회 없이 종료
+    run, sessions = check_sessions("index", ["KRX", "US"])
+    if not run:
+        return
+
+    message, labels, values, chart_prices = build_report()
     chart_img = create_chart(labels, values, chart_prices)
-    send_telegram(message, chart_img)
+    send_telegram(with_perf_footer(message), chart_img)
+    if sessions:
+        mark_reported("index", sessions)
 
 if __name__ == "__main__":
+    profile_if_requested()
     main()
@@ -1,125 +1,242 @@
 import yfinance as yf
-import pandas as pd
-import requests
+import aiohttp
 from bs4 import BeautifulSoup
 import telegram
 import asyncio
 import os
 import sys
+import json
+import time
+from Share_Allocator import allocate, naive_allocate
+from Perf_Metrics import timed, record_failure, with_perf_footer
+from Profiler import profile_if_requested
+from FX_Service import default_service
 
 # --- 환경 변수 설정 (GitHub Secrets 사용 권장) ---
 BOT_TOKEN = os.environ.get("BOT_TOKEN")
 CHAT_ID = os.environ.get("CHAT_ID")
 INPUT_FILE = "input.txt"
+NAME_CACHE_FILE = "data/name_cache.json"
+NAME_TTL = 30 * 24 * 3600  # 30일
 
-async def send_telegram_msg(text):
-    bot = telegram.Bot(token=BOT_TOKEN)
-    await bot.send_message(chat_id=CHAT_ID, text=text, parse_mode='HTML')
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+NAVER_URL = "https://finance.naver.com/item/main.naver?code={code}"
+YAHOO_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
 
-def get_exchange_rate():
-    try:
-        rate = yf.Ticker("USDKRW=X").fast_info.last_price
-        return rate if rate else 1350.0
-    except:
-        return 1350.0
+async def send_telegram_msg(bot, text):
+    with timed("send", "telegram:sendMessage"):
+        await bot.send_message(chat_id=CHAT_ID, text=text, parse_mode='HTML')
 
-def fetch_price(code, current_rate):
-    # 1. 네이버 시도 (국내)
+# --- 종목명 캐시 (이름은 거의 바뀌지 않으므로 길게 보관) ---
+def load_name_cache():
+    if not os.path.exists(NAME_CACHE_FILE):
+        return {}
     try:
-        url = f"https://finance.naver.com/item/main.naver?code={code}"
-        res = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=3)
-        soup = BeautifulSoup(res.text, "html.parser")
-        
-        name_tag = soup.select_one(".wrap_company h2 a")
-        price_tag = soup.select_one("p.no_today span.blind")
-        
-        if name_tag and price_tag:
-            name = name_tag.text
-            price = int(price_tag.text.replace(",", ""))
-            # 국내 주식은 원화만 반환
-            return name, price, f"₩{price:,.0f}"
-    except: pass
-    
-    # 2. 야후 시도 (해외)
+        with open(NAME_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_name_cache(cache):
+    os.makedirs(os.path.dirname(NAME_CACHE_FILE), exist_ok=True)
+    with open(NAME_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+def cached_name(cache, symbol):
+    entry = cache.get(symbol)
+    if entry and time.time() - entry["ts"] < NAME_TTL:
+        return entry["name"]
+    return None
+
+def is_krx_code(symbol):
+    # 국내 종목코드는 6자리 (005930, 0072R0 등), 나머지는 해외 티커
+    return len(symbol) == 6 and symbol[0].isdigit()
+
+# --- 시세 조회 (비동기 HTTP, 파싱/yfinance는 executor로 분리) ---
+@timed("parse", "naver")
+def parse_naver(html):
+    soup = BeautifulSoup(html, "html.parser")
+    name_tag = soup.select_one(".wrap_company h2 a")
+    price_tag = soup.select_one("p.no_today span.blind")
+
+    if name_tag and price_tag:
+        return name_tag.text, int(price_tag.text.replace(",", ""))
+    return None, None
+
+def yahoo_long_name(symbol):
+    # ticker.info는 무겁고 블로킹이므로 캐시에 없을 때만 executor에서 호출
+    info = yf.Ticker(symbol).info
+    return info.get('longName') or info.get('shortName') or symbol
+
+async def fetch_naver(session, code):
+    with timed("fetch", f"naver:{code}") as m:
+        async with session.get(NAVER_URL.format(code=code), timeout=aiohttp.ClientTimeout(total=3)) as res:
+            body = await res.read()
+            m.add_bytes(len(body))
+            html = body.decode(res.get_encoding(), errors="replace")
+    return await asyncio.to_thread(parse_naver, html)
+
+async def fetch_yahoo_meta(session, symbol):
+    with timed("fetch", f"yahoo:{symbol}") as m:
+        async with session.get(YAHOO_URL.format(symbol=symbol), timeout=aiohttp.ClientTimeout(total=5)) as res:
+            body = await res.read()
+            m.add_bytes(len(body))
+    data = json.loads(body)
+    return data["chart"]["result"][0]["meta"]
+
+async def fetch_yahoo(session, symbol, names):
+    meta = await fetch_yahoo_meta(session, symbol)
+    p = meta.get("regularMarketPrice")
+    name = cached_name(names, symbol) or meta.get("longName") or meta.get("shortName")
+    if p and not name:
+        name = await asyncio.to_thread(yahoo_long_name, symbol)
+    return name, p, meta.get("currency") or "USD"
+
+async def get_exchange_rates(currencies=("USD",)):
+    """FX_Service 공용 캐시 경유 일괄 조회 → {통화: 원화 환율} (조회 실패 통화는 빠짐)"""
+    pairs = {f"{c}/KRW": c for c in currencies if c != "KRW"}
+    rates = await asyncio.to_thread(default_service().rates, list(pairs))
+    return {pairs[p]: r for p, r in rates.items()}
+
+async def fetch_quote(session, code, names):
+    """종목 원시 시세 → (이름, 가격, 통화)"""
+    # 1. 네이버 (국내 종목코드만)
+    if is_krx_code(code):
+        try:
+            name, price = await fetch_naver(session, code)
+            if price:
+                names[code] = {"name": name, "ts": time.time()}
+                return name, price, "KRW"
+        except Exception as e:
+            record_failure("fetch", f"naver:{code}", e)
+
+    # 2. 야후 (해외, 통화는 거래소 통화 그대로)
     try:
-        ticker = yf.Ticker(code)
-        name = ticker.info.get('longName') or ticker.info.get('shortName') or code
-        p = ticker.fast_info.last_price
-        
-        if p: 
-            p_krw = p * current_rate
-            # 해외 주식은 요청하신 대로 '$가격 (₩환산가)' 형식으로 반환
-            return name, p_krw, f"${p:,.2f} (₩{p_krw:,.0f})"
-    except: pass
+        name, p, currency = await fetch_yahoo(session, code, names)
+        if p:
+            names[code] = {"name": name, "ts": time.time()}
+            return name, p, currency
+    except Exception as e:
+        record_failure("fetch", f"yahoo:{code}", e)
     return None, None, None
 
+CURRENCY_SIGNS = {"USD": "$", "JPY": "¥", "EUR": "€"}
+
+def to_krw_label(price, currency, current_rate):
+    if currency == "KRW":
+        # 국내 주식은 원화만 반환
+        return price, f"₩{price:,.0f}"
+    # 해외 주식은 '$가격 (₩환산가)' 형식, 환율이 없으면 매수 계산에서 제외
+    sign = CURRENCY_SIGNS.get(currency, f"{currency} ")
+    if current_rate is None:
+        return None, f"{sign}{price:,.2f} (환율 조회 실패)"
+    p_krw = price * current_rate
+    return p_krw, f"{sign}{price:,.2f} (₩{p_krw:,.0f})"
+
+async def resolve_prices(session, symbols):
+    """환율과 모든 종목을 동시에 조회 → (USD 환율, {종목: (이름, 원화가격, 표시문자열)})"""
+    names = load_name_cache()
+    usd, *raw = await asyncio.gather(
+        get_exchange_rates(),
+        *(fetch_quote(session, s, names) for s in symbols),
+    )
+    await asyncio.to_thread(save_name_cache, names)
+
+    # USD 외 통화 종목이 있으면 그 통화쌍만 추가 조회 (USD는 방금 캐시됨)
+    rates = await get_exchange_rates({c for _, _, c in raw if c} | {"USD"})
+    results = {}
+    for symbol, (name, price, currency) in zip(symbols, raw):
+        if price:
+            results[symbol] = (name, *to_krw_label(price, currency, rates.get(currency)))
+        else:
+            results[symbol] = (None, None, None)
+    return usd.get("USD"), results
+
 async def main():
-    try:
-        if not os.path.exists(INPUT_FILE):
-            print(f"Error: {INPUT_FILE} 파일을 찾을 수 없습니다.")
-            return
+    # 봇과 HTTP 세션은 실행 동안 하나만 유지
+    async with telegram.Bot(token=BOT_TOKEN) as bot, \
+            aiohttp.ClientSession(headers=HEADERS) as session:
+        try:
+            await build_and_send(bot, session)
+        except Exception as e:
+            await send_telegram_msg(bot, f"⚠️ 시스템 오류: <code>{str(e)}</code>")
 
-        with open(INPUT_FILE, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f.readlines() if line.strip()]
-        
-        if not lines: return
-
-        total_budget = float(lines[0])
-        stock_data = []
-        total_weight = 0.0
-        for line in lines[1:]:
-            parts = line.split(",")
-            if len(parts) == 2:
-                symbol = parts[0].strip().upper()
-                weight = float(parts[1].strip())
-                stock_data.append({"Symbol": symbol, "Weight": weight})
-                total_weight += weight
-        
-        if abs(total_weight - 100) > 0.01:
-            msg = f"<b>⚠️ 비중 오류: {total_weight}%</b>\n100%로 수정해 주세요."
-            await send_telegram_msg(msg)
-            return
+async def build_and_send(bot, session):
+    if not os.path.exists(INPUT_FILE):
+        print(f"Error: {INPUT_FILE} 파일을 찾을 수 없습니다.")
+        return
+
+    with open(INPUT_FILE, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f.readlines() if line.strip()]
+    
+    if not lines: return
 
-        rate = get_exchange_rate()
-        total_remaining_cash = 0 
+    total_budget = float(lines[0])
+    stock_data = []
+    total_weight = 0.0
+    for line in lines[1:]:
+        parts = line.split(",")
+        if len(parts) == 2:
+            symbol = parts[0].strip().upper()
+            weight = float(parts[1].strip())
+            stock_data.append({"Symbol": symbol, "Weight": weight})
+            total_weight += weight
+    
+    if abs(total_weight - 100) > 0.01:
+        msg = f"<b>⚠️ 비중 오류: {total_weight}%</b>\n100%로 수정해 주세요."
+        await send_telegram_msg(bot, msg)
+        return
+
+    # 환율과 종목 시세를 한 번에 병렬 조회
+    rate, quotes = await resolve_prices(session, [item["Symbol"] for item in stock_data])
+
+    # 시세가 조회된 종목 전체를 한 번에 정수 배분 (남는 현금 재분배)
+    priced = [item for item in stock_data if quotes[item["Symbol"]][1]]
+    priced_budget = total_budget * sum(item["Weight"] for item in priced) / 100
+    priced_prices = [quotes[item["Symbol"]][1] for item in priced]
+    priced_weights = [item["Weight"] for item in priced]
+    qtys, total_remaining_cash = allocate(priced_budget, priced_prices, priced_weights)
+    _, naive_remaining_cash = naive_allocate(priced_budget, priced_prices, priced_weights) if priced else (None, 0)
+    allocated = {item["Symbol"]: int(q) for item, q in zip(priced, qtys)}
+    
+    report = [
+        f"<b>📝 자산 배분 매수 리포트</b>",
+        f"<code>────────────────────</code>",
+        f"💵 <b>기준 환율:</b> {rate:,.2f} 원" if rate else "💵 <b>기준 환율:</b> 조회 실패",
+        f"📦 <b>대상 종목:</b> {len(stock_data)} 개",
+        f"💰 <b>총 투자금:</b> {total_budget:,.0f} 원",
+        f"<code>────────────────────</code>\n"
+    ]
+
+    for item in stock_data:
+        code = item["Symbol"]
+        weight = item["Weight"]
+        name, price_krw, label = quotes[code]
         
-        report = [
-            f"<b>📝 자산 배분 매수 리포트</b>",
-            f"<code>────────────────────</code>",
-            f"💵 <b>기준 환율:</b> {rate:,.2f} 원",
-            f"📦 <b>대상 종목:</b> {len(stock_data)} 개",
-            f"💰 <b>총 투자금:</b> {total_budget:,.0f} 원",
-            f"<code>────────────────────</code>\n"
-        ]
-
-        for item in stock_data:
-            code = item["Symbol"]
-            weight = item["Weight"]
-            name, price_krw, label = fetch_price(code, rate)
+        if price_krw:
+            budget = total_budget * (weight / 100)
+            qty = allocated[code]
+            spent = qty * price_krw
+            remaining = budget - spent
             
-            if price_krw:
-                budget = total_budget * (weight / 100)
-                qty = int(budget // price_krw)
-                spent = qty * price_krw
-                remaining = budget - spent
-                total_remaining_cash += remaining
-                
-                report.append(f"<b>🔹 {name}</b> (<code>{code}</code>)")
-                report.append(f"  ├ 비중: <b>{weight}%</b> (할당: {budget:,.0f}원)")
-                report.append(f"  ├ 현재가: <code>{label}</code>")
-                report.append(f"  └ <b>매수 수량: {qty} 주</b>")
-                report.append(f"  └ 남은잔액: {remaining:,.0f} 원")
-                report.append("") 
-            else:
-                report.append(f"❌ <b>{code}</b>: 시세 조회 실패\n")
-
-        report.append(f"<code>────────────────────</code>")
-        report.append(f"☕ <b>최종 예상 잔액 예수금: {total_remaining_cash:,.0f} 원</b>")
-        report.append(f"✅ 모든 계산이 완료되었습니다.")
-
-        await send_telegram_msg("\n".join(report))
-    except Exception as e:
-        await send_telegram_msg(f"⚠️ 시스템 오류: <code>{str(e)}</code>")
+            report.append(f"<b>🔹 {name}</b> (<code>{code}</code>)")
+            report.append(f"  ├ 비중: <b>{weight}%</b> (할당: {budget:,.0f}원)")
+            report.append(f"  ├ 현재가: <code>{label}</code>")
+            report.append(f"  └ <b>매수 수량: {qty} 주</b>")
+            report.append(f"  └ 할당 대비 잔액: {remaining:+,.0f} 원")
+            report.append("") 
+        elif label:
+            report.append(f"❌ <b>{name}</b> (<code>{code}</code>): <code>{label}</code>\n")
+        else:
+            report.append(f"❌ <b>{code}</b>: 시세 조회 실패\n")
+
+    report.append(f"<code>────────────────────</code>")
+    report.append(f"☕ <b>최종 예상 잔액 예수금: {total_remaining_cash:,.0f} 원</b>")
+    report.append(f"  (종목별 단순 배분 시: {naive_remaining_cash:,.0f} 원)")
+    report.append(f"✅ 모든 계산이 완료되었습니다.")
+
+    await send_telegram_msg(bot, with_perf_footer("\n".join(report)))
 
 if __name__ == "__main__":
+    profile_if_requested()
     asyncio.run(main())
@@ -4,6 +4,13 @@ from datetime import datetime
 import time
 import os
 import json
+from Perf_Metrics import timed, with_perf_footer
+from Telegram_Delivery import deliver_text
+from Market_Calendar import check_sessions, mark_reported
+from Price_Guard import REQUEST_TIMEOUT, guarded_price, stale_note
+from Price_History import record_closes
+from Report_Renderer import compile_template, render_block, render_blocks
+from Core_Model import Portfolio, Quote
 
 # =========================
 # 텔레그램 설정
@@ -31,18 +38,41 @@ portfolio = [
     {"name": "KODEX 200 타켓 위클리 커버드콜", "code": "498400", "qty": 1029, "buy": 17068},
 ]
 
+# =========================
+# 리포트 템플릿
+# =========================
+HOLDING_BLOCK = compile_template("■ {name}", [
+    ("현재가", "{price:,}원"),
+    ("수익률", "{rate:+.2f}% {profit_arrow}"),
+    ("평가손익", "{profit:+,}원"),
+    ("전일 대비", "{delta:+,}원 {delta_arrow}"),
+    ("비중", "{weight:.1f}%"),
+])
+
+SUMMARY_BLOCK = compile_template("📈 전체 요약", [
+    ("투자 원금", "{cost:,}원"),
+    ("총 평가금액", "{now:,}원"),
+    ("전체 수익금", "{profit:+,}원"),
+    ("전체 수익률", "{rate:+.2f}%"),
+    ("전일 대비 합계", "{delta:+,}원 {delta_arrow}"),
+])
+
 # =========================
 # 현재가 조회
 # =========================
 def get_current_price(code):
     url = f"https://finance.naver.com/item/main.naver?code={code}"
     headers = {"User-Agent": "Mozilla/5.0"}
-    res = requests.get(url, headers=headers, timeout=10)
-    soup = BeautifulSoup(res.text, "html.parser")
+    with timed("fetch", f"naver:{code}") as m:
+        res = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        m.add_bytes(len(res.content))
+        res.raise_for_status()
 
-    price = soup.select_one("p.no_today span.blind")
-    if not price:
-        raise ValueError("현재가 조회 실패")
+    with timed("parse", f"naver:{code}"):
+        soup = BeautifulSoup(res.text, "html.parser")
+        price = soup.select_one("p.no_today span.blind")
+        if not price:
+            raise ValueError(f"현재가 조회 실패: {code}")
 
     return int(price.text.replace(",", ""))
 
@@ -64,89 +94,86 @@ def save_snapshot(snapshot):
 # 텔레그램 전송
 # =========================
 def send_telegram(text):
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    requests.post(url, data={"chat_id": CHAT_ID, "text": text}, timeout=10)
+    # REPORT_DELIVERY=edit 이면 지난 리포트 메시지를 수정하거나 변경 없을 때 생략
+    deliver_text(BOT_TOKEN, CHAT_ID, "jonghak", text)
 
 # =========================
 # 리포트 실행
 # =========================
-def run_report():
-    prev_snapshot = load_snapshot()
-    today_snapshot = {}
+def fetch_prices():
+    """→ (현재가, 지연 시세 {종목코드: 저장 시각}). 대체값도 없는 종목은 빠짐"""
+    prices = {}
+    stale = {}
+    for item in portfolio:
+        code = item["code"]
+        try:
+            prices[code], at = guarded_price("naver", code, get_current_price)
+        except Exception as e:
+            print(f"[WARN] {item['name']} 시세 없음 ({e})")
+            continue
+        if at:
+            stale[code] = at
+        time.sleep(0.3)
+    return prices, stale
 
-    total_now = 0
-    total_prev = 0
+def build_report(prices, prev_snapshot, stale=None):
+    """조회된 현재가로 리포트 작성 → (본문, 오늘 스냅샷)
+
+    prices 에 없는 종목은 본문에서 빼고 스냅샷은 이전 값 유지,
+    stale 종목은 ⚠️ 표시 후 하단에 기준 시각 안내
+    """
+    stale = stale or {}
+    book = Portfolio.from_records(portfolio).mark(Quote.table(prices, stale), prev_snapshot)
+    total = book.total(cost=PRINCIPAL)
+    missing = [h.name for h, ok in zip(book, book.priced) if not ok]
+    stale_names = {h.name: stale[h.code] for h, s in zip(book, book.stale) if s}
 
     lines = []
     lines.append("📊 김종학 용돈 ETF 포트폴리오 리포트")
     lines.append(f"🕒 {datetime.now().strftime('%Y-%m-%d %H:%M')}")
     lines.append("")
 
-    # 현재가 미리 조회
-    prices = {}
-    for item in portfolio:
-        prices[item["code"]] = get_current_price(item["code"])
-        time.sleep(0.3)
-
-    portfolio_total = sum(
-        item["qty"] * prices[item["code"]] for item in portfolio
-    )
-
-    for item in portfolio:
-        code = item["code"]
-        name = item["name"]
-        qty = item["qty"]
-        buy = item["buy"]
-        price = prices[code]
-
-        buy_amt = qty * buy
-        now_amt = qty * price
-        prev_amt = prev_snapshot.get(code, now_amt)
-
-        profit = now_amt - buy_amt
-        rate = profit / buy_amt * 100
-        delta = now_amt - prev_amt
-        weight = now_amt / portfolio_total * 100
-
-        total_now += now_amt
-        total_prev += prev_amt
-
-        today_snapshot[code] = now_amt
-
-        emoji = "🔺" if profit > 0 else "🔻" if profit < 0 else "➖"
-        delta_emoji = "🔺" if delta > 0 else "🔻" if delta < 0 else "➖"
-
-        lines.append(
-            f"■ {name}\n"
-            f"현재가: {price:,}원\n"
-            f"수익률: {rate:+.2f}% {emoji}\n"
-            f"평가손익: {profit:+,}원\n"
-            f"전일 대비: {delta:+,}원 {delta_emoji}\n"
-            f"비중: {weight:.1f}%"
+    rows = [
+        book.valuation(
+            i,
+            name=f"{h.name} ⚠️" if book.stale[i] else None,
+            weight=book.now[i].item() / total.now * 100,
         )
-        lines.append("────────────────────")
-
-        time.sleep(0.3)
+        for i, h in enumerate(book) if book.priced[i]
+    ]
+    lines += render_blocks(HOLDING_BLOCK, rows, separator="────────────────────")
 
     # =========================
     # ✅ 전체 요약 (원금 기준)
     # =========================
-    total_profit = total_now - PRINCIPAL
-    total_rate = total_profit / PRINCIPAL * 100
-    total_delta = total_now - total_prev
-    total_delta_emoji = "🔺" if total_delta > 0 else "🔻" if total_delta < 0 else "➖"
-
     lines.append("")
-    lines.append("📈 전체 요약")
-    lines.append(f"투자 원금: {PRINCIPAL:,}원")
-    lines.append(f"총 평가금액: {total_now:,}원")
-    lines.append(f"전체 수익금: {total_profit:+,}원")
-    lines.append(f"전체 수익률: {total_rate:+.2f}%")
-    lines.append(f"전일 대비 합계: {total_delta:+,}원 {total_delta_emoji}")
+    lines.append(render_block(SUMMARY_BLOCK, total))
+    if missing:
+        lines.append(f"❌ 시세 조회 실패 (합계 제외): {', '.join(missing)}")
+    lines += stale_note(stale_names)
+
+    return "\n".join(lines), book.snapshot(prev_snapshot)
+
+def run_report():
+    # KRX 휴장일이면 시세 조회 전에 종료
+    run, sessions = check_sessions("jonghak", ["KRX"])
+    if not run:
+        return
+
+    prev_snapshot = load_snapshot()
+
+    # 현재가 미리 조회
+    prices, stale = fetch_prices()
 
-    send_telegram("\n".join(lines))
+    text, today_snapshot = build_report(prices, prev_snapshot, stale)
+    send_telegram(with_perf_footer(text))
 
-    save_snapshot(today_snapshot)
+    # 새 거래일일 때만 스냅샷 갱신 (전일 대비 기준 = 직전 거래일 종가)
+    if sessions:
+        save_snapshot(today_snapshot)
+        mark_reported("jonghak", sessions)
+        # 리스크 분석용 일별 종가 (지연 시세 제외)
+        record_closes({c: p for c, p in prices.items() if c not in stale}, sessions["KRX"])
 
 # =========================
 # 실행
@@ -0,0 +1,170 @@
+import re
+import sys
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# =========================
+# 로컬 대체 서버 (Naver / Yahoo / Telegram 흉내)
+# =========================
+# 실행: python Local_Stub_Server.py 8765
+# 이후 아래 환경변수로 봇들을 이 서버에 연결
+#   NAVER_BASE_URL=http://127.0.0.1:8765
+#   YAHOO_BASE_URL=http://127.0.0.1:8765
+#   TELEGRAM_API_URL=http://127.0.0.1:8765
+# 보낸 텔레그램 메시지는 GET /_messages 로 확인
+# 사용자 명령 흉내: POST /_updates {"chat_id": 1, "text": "/pension"} → getUpdates 로 전달
+
+BASE_PRICES = {
+    "KRW=X": 1400.0,
+    "SPYM": 75.0,
+}
+
+
+class StubState:
+    """요청마다 가격이 조금씩 움직이는 랜덤워크 + 수신 메시지 보관"""
+
+    def __init__(self, seed=0, volatility=0.002):
+        self.rng = random.Random(seed)
+        self.volatility = volatility
+        self.prices = dict(BASE_PRICES)
+        self.messages = []
+        self.updates = []
+        self.lock = threading.Lock()
+        self.new_update = threading.Condition(self.lock)
+
+    def tick(self, symbol):
+        with self.lock:
+            price = self.prices.get(symbol) or self.rng.uniform(10_000, 50_000)
+            price *= 1 + self.rng.gauss(0, self.volatility)
+            self.prices[symbol] = price
+            return price
+
+    def record(self, method, payload):
+        with self.lock:
+            self.messages.append({"method": method, **payload})
+            return len(self.messages)
+
+    def push_update(self, chat_id, text):
+        with self.new_update:
+            update_id = len(self.updates) + 1
+            self.updates.append({
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id,
+                    "chat": {"id": int(chat_id)},
+                    "text": text,
+                },
+            })
+            self.new_update.notify_all()
+            return update_id
+
+    def get_updates(self, offset=0, timeout=0):
+        """offset 이후 업데이트 반환, 없으면 timeout 초까지 대기 (long polling)"""
+        with self.new_update:
+            pending = lambda: [u for u in self.updates if u["update_id"] >= offset]
+            self.new_update.wait_for(pending, timeout=min(timeout, 5))
+            return pending()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body, content_type="application/json"):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/item/main.naver":
+            code = parse_qs(url.query).get("code", [""])[0]
+            price = int(self.state.tick(code))
+            html = (
+                f'<div class="wrap_company"><h2><a>STUB {code}</a></h2></div>'
+                f'<p class="no_today"><em><span class="blind">{price:,}</span></em></p>'
+            )
+            return self._reply(html, "text/html; charset=utf-8")
+
+        m = re.match(r"^/v8/finance/chart/(.+)$", url.path)
+        if m:
+            symbol = m.group(1)
+            price = round(self.state.tick(symbol), 4)
+            body = {"chart": {"result": [{"meta": {
+                "symbol": symbol,
+                "regularMarketPrice": price,
+                "shortName": f"STUB {symbol}",
+            }}]}}
+            return self._reply(json.dumps(body))
+
+        if url.path == "/v8/finance/spark":
+            symbols = parse_qs(url.query).get("symbols", [""])[0].split(",")
+            body = {"spark": {"result": [
+                {"symbol": s, "response": [{"meta": {
+                    "symbol": s,
+                    "regularMarketPrice": round(self.state.tick(s), 4),
+                }}]}
+                for s in symbols if s
+            ], "error": None}}
+            return self._reply(json.dumps(body))
+
+        if url.path == "/_messages":
+            return self._reply(json.dumps(self.state.messages, ensure_ascii=False))
+
+        self.send_error(404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        ctype = self.headers.get("Content-Type", "")
+        if ctype.startswith("application/x-www-form-urlencoded"):
+            payload = {k: v[0] for k, v in parse_qs(raw.decode("utf-8")).items()}
+        elif ctype.startswith("application/json"):
+            payload = json.loads(raw or b"{}")
+        else:
+            payload = {"bytes": len(raw)}
+
+        if url.path == "/_updates":
+            update_id = self.state.push_update(payload["chat_id"], payload["text"])
+            return self._reply(json.dumps({"ok": True, "update_id": update_id}))
+
+        m = re.match(r"^/bot[^/]*/(\w+)$", url.path)
+        if not m:
+            return self.send_error(404)
+
+        if m.group(1) == "getUpdates":
+            updates = self.state.get_updates(
+                int(payload.get("offset") or 0),
+                float(payload.get("timeout") or 0),
+            )
+            return self._reply(json.dumps({"ok": True, "result": updates}, ensure_ascii=False))
+
+        message_id = self.state.record(m.group(1), payload)
+        self._reply(json.dumps({"ok": True, "result": {"message_id": message_id}}))
+
+
+def start_stub_server(port=0, seed=0):
+    """백그라운드 스레드로 서버 시작 → (server, base_url)"""
+    handler = type("Handler", (StubHandler,), {"state": StubState(seed)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server, base_url = start_stub_server(port)
+    print(f"stub server: {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,7 +1,17 @@
 import requests
 import random
-from collections import Counter
+import numpy as np
 import os
+import json
+import codecs
+from Perf_Metrics import timed, with_perf_footer
+from Profiler import profile_if_requested
+from State_File import file_lock
+
+try:
+    import ijson
+except ImportError:  # 없으면 조각 단위 raw_decode 파서 사용
+    ijson = None
 
 # ==============================
 # 환경변수 (GitHub Secrets)
@@ -10,36 +20,255 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
 JSON_URL = "https://smok95.github.io/lotto/results/all.json"
+LATEST_URL = "https://smok95.github.io/lotto/results/latest.json"
+DRAW_URL = "https://smok95.github.io/lotto/results/{}.json"
+
+# ==============================
+# 회차 저장소 (data/lotto_draws.csv)
+# ==============================
+# 한 줄 = 회차, 번호 6개, 보너스 → 전체 이력이 (N, 8) int16 배열 하나
+# - latest.json 으로 최신 회차만 먼저 확인 → 새 회차가 없으면 내려받지 않음
+# - 빠진 회차가 MAX_PER_DRAW 이하면 회차별 JSON 만, 그보다 많으면 all.json 을 스트리밍으로 읽어
+#   저장된 회차는 건너뛰고 번호 배열만 남김 (당첨금 등 나머지 필드는 바로 버림)
+DRAWS_FILE = "data/lotto_draws.csv"
+MAX_PER_DRAW = 10
+CHUNK_SIZE = 64 * 1024
+
+HOT_WINDOW = 30   # 최근 HOT 구간 (회차)
+
+
+def load_draws():
+    """→ (N, 8) int16 [회차, 번호 6개, 보너스], 회차 순"""
+    if not os.path.exists(DRAWS_FILE):
+        return np.empty((0, 8), dtype=np.int16)
+    draws = np.loadtxt(DRAWS_FILE, delimiter=",", dtype=np.int16, ndmin=2)
+    return draws[np.argsort(draws[:, 0], kind="stable")]
+
+
+def append_draws(rows):
+    os.makedirs(os.path.dirname(DRAWS_FILE), exist_ok=True)
+    with file_lock(DRAWS_FILE), open(DRAWS_FILE, "a", encoding="utf-8") as f:
+        f.writelines(",".join(map(str, r)) + "\n" for r in rows)
+
+
+def compact(item):
+    """smok95 회차 객체 → (회차, 번호 6개, 보너스) / 형식이 다르면 None"""
+    try:
+        numbers = sorted(int(n) for n in item["numbers"])
+        row = (int(item["draw_no"]), *numbers, int(item.get("bonus_no") or 0))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return row if len(numbers) == 6 else None
 
 
 # ==============================
 # 로또 데이터 수집
 # ==============================
-def fetch_all_data():
-    res = requests.get(JSON_URL, timeout=15)
-    return res.json()
+def iter_json_array(chunks):
+    """바이트 조각으로 들어오는 JSON 배열의 원소를 하나씩 (버퍼에는 아직 못 읽은 원소 하나 분량만 남음)
+
+    원소가 객체라고 가정 → 덜 들어온 원소는 raw_decode 가 실패하므로 다음 조각을 붙여 다시 시도
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, started = "", 0, False
+    for chunk in chunks:
+        buf = buf[pos:] + text.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ","):
+                pos += 1
+            if pos == len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("JSON 배열이 아님")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break
+            yield item
+    raise ValueError("JSON 배열이 중간에 끊김")
+
+
+def stream_draws(after):
+    """all.json 을 스트리밍으로 읽어 after 회차 이후만 압축 행으로
+
+    최신 회차부터 내려오는 순서면 저장된 회차를 만나는 즉시 중단
+    """
+    rows = []
+    with timed("fetch", "smok95:all.json") as m, requests.get(JSON_URL, timeout=15, stream=True) as res:
+        res.raise_for_status()
+        if ijson is not None:
+            res.raw.decode_content = True
+            items = ijson.items(res.raw, "item")
+        else:
+            items = iter_json_array(res.iter_content(CHUNK_SIZE))
+
+        prev = None
+        for item in items:
+            row = compact(item)
+            if row is None:
+                continue
+            if row[0] <= after:
+                if prev is not None and row[0] < prev:
+                    break
+            else:
+                rows.append(row)
+            prev = row[0]
+        m.add_bytes(res.raw.tell())
+    return rows
+
+
+def fetch_draw(url, source):
+    with timed("fetch", source) as m:
+        res = requests.get(url, timeout=10)
+        m.add_bytes(len(res.content))
+        res.raise_for_status()
+    return compact(res.json())
+
+
+def sync_draws():
+    """저장소를 최신 회차까지 채우고 전체 이력 반환"""
+    draws = load_draws()
+    known = int(draws[-1, 0]) if len(draws) else 0
+
+    try:
+        latest = fetch_draw(LATEST_URL, "smok95:latest.json")
+    except (requests.RequestException, ValueError) as e:
+        print(f"[WARN] 최신 회차 확인 실패 ({e}) → 전체 이력 확인")
+        latest = None
+    if latest is not None and latest[0] <= known:
+        return draws
+
+    if latest is not None and known and latest[0] - known <= MAX_PER_DRAW:
+        try:
+            rows = [fetch_draw(DRAW_URL.format(n), f"smok95:{n}.json") for n in range(known + 1, latest[0])]
+            rows.append(latest)
+        except (requests.RequestException, ValueError) as e:
+            print(f"[WARN] 회차별 조회 실패 ({e}) → 전체 이력 확인")
+            rows = [None]
+        if None in rows:
+            rows = stream_draws(known)
+    else:
+        rows = stream_draws(known)
+
+    rows = sorted(set(rows))
+    if not rows:
+        return draws
+    append_draws(rows)
+    return np.vstack([draws, np.array(rows, dtype=np.int16)])
+
+
+# ==============================
+# 회차 × 번호 행렬 (N × 45)
+# ==============================
+def build_draw_matrix(nums):
+    """(N, 6) 번호 배열 → (N, 45) uint8 행렬 (열 i = 번호 i+1)"""
+    nums = np.asarray(nums, dtype=np.int16)
+
+    matrix = np.zeros((len(nums), 45), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(nums)), nums.shape[1])
+    matrix[rows, nums.ravel() - 1] = 1
+    return matrix
+
+
+# ==============================
+# 통계 (모두 행렬 연산)
+# ==============================
+def frequency(matrix):
+    """번호별 전체 등장 횟수 (45,)"""
+    return matrix.sum(axis=0, dtype=np.int64)
+
+
+def rolling_frequency(matrix, window):
+    """구간별 등장 횟수 (N - window + 1, 45) — 행 t = t ~ t+window-1 회차 합계"""
+    cum = np.vstack([np.zeros((1, 45), dtype=np.int64), matrix.cumsum(axis=0, dtype=np.int64)])
+    return cum[window:] - cum[:-window]
+
+
+def pair_counts(matrix):
+    """번호 쌍 동반 출현 횟수 (45, 45), 대각선은 0"""
+    m = matrix.astype(np.int32)
+    pairs = m.T @ m
+    np.fill_diagonal(pairs, 0)
+    return pairs
+
+
+def gaps(matrix):
+    """번호별 마지막 출현 이후 지난 회차 수 (한 번도 안 나온 번호는 N)"""
+    n = len(matrix)
+    seen = matrix.any(axis=0)
+    since_last = matrix[::-1].argmax(axis=0)
+    return np.where(seen, since_last, n)
+
+
+def odd_even_distribution(matrix):
+    """회차별 홀수 개수 분포 (7,) — index k = 홀수 k개인 회차 수"""
+    odd_counts = matrix[:, 0::2].sum(axis=1)
+    return np.bincount(odd_counts, minlength=7)
+
+
+def sum_distribution(matrix, bin_width=20):
+    """회차별 번호 합계 분포 → (구간 시작값 배열, 회차 수 배열)"""
+    sums = matrix @ np.arange(1, 46)
+    edges = np.arange(0, 280 + bin_width, bin_width)
+    counts, _ = np.histogram(sums, bins=edges)
+    return edges[:-1], counts
 
 
 # ==============================
-# 최다 등장 6개 번호 추출
+# 추천 전략
 # ==============================
-def get_top6(draws, exclude=None):
-    if exclude is None:
-        exclude = set()
+def top_numbers(scores, k=6, exclude=None):
+    """점수 상위 k개 번호 (동점이면 작은 번호 우선)"""
+    scores = np.asarray(scores, dtype=np.float64).copy()
+    if exclude:
+        scores[np.array(sorted(exclude)) - 1] = -np.inf
+    order = np.argsort(-scores, kind="stable")
+    return [int(i) + 1 for i in order[:k]]
+
+
+def get_top6(matrix, exclude=None):
+    """최다 등장 6개 번호"""
+    return top_numbers(frequency(matrix), 6, exclude)
+
 
-    # Counter
-    cnt = Counter()
-    for d in draws:
-        for n in d["numbers"]:
-            if n not in exclude:
-                cnt[n] += 1
+def pick_overdue(matrix, exclude=None):
+    """가장 오래 안 나온 6개 번호"""
+    return top_numbers(gaps(matrix), 6, exclude)
 
-    return [n for n, _ in cnt.most_common(6)]
+
+def pick_companions(matrix, seed):
+    """seed 번호에서 시작해 동반 출현 합계가 가장 큰 번호를 차례로 추가"""
+    pairs = pair_counts(matrix)
+    picked = [seed]
+    while len(picked) < 6:
+        score = pairs[np.array(picked) - 1].sum(axis=0).astype(np.float64)
+        score[np.array(picked) - 1] = -np.inf
+        picked.append(int(score.argmax()) + 1)
+    return picked
+
+
+# Lotto_Backtest.replay 가 같은 규칙을 전 회차에 대해 행렬로 계산 → 규칙을 바꾸면 함께 수정
+STRATEGIES = {
+    "hot": lambda m: get_top6(m[-HOT_WINDOW:]),
+    "long": lambda m: get_top6(m, exclude=set(get_top6(m[-HOT_WINDOW:]))),
+    "overdue": lambda m: pick_overdue(m),
+    "pair": lambda m: pick_companions(m, get_top6(m[-HOT_WINDOW:])[0]),
+    "random": lambda m: random.sample(range(1, 46), 6),
+}
 
 
 # ==============================
 # 텔레그램 보내기
 # ==============================
+@timed("send", "telegram:sendMessage")
 def send_telegram(message):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     payload = {
@@ -53,33 +282,32 @@ def send_telegram(message):
 # 메인 로직
 # ==============================
 def main():
-    data = fetch_all_data()
+    draws = sync_draws()
 
-    # 최신 회차 번호를 draw_no로 구함
-    latest_round = max(d["draw_no"] for d in data)
+    latest_round = int(draws[-1, 0])
     next_round = latest_round + 1
 
+    with timed("compute", "lotto_stats"):
+        # 전체 이력을 한 번만 행렬로 변환
+        matrix = build_draw_matrix(draws[:, 1:7])
 
+        picks = {name: sorted(pick(matrix)) for name, pick in STRATEGIES.items()}
 
-    # ——————————————
-    # 1) 최근 30회
-    # ——————————————
-    recent_30 = data[-30:]
-    recent_top6 = sorted(get_top6(recent_30))
-
-    # ——————————————
-    # 2) 전체 (최근30 제외)
-    # ——————————————
-    # 전체 등장 횟수 추출
-    all_top6 = get_top6(data)
+        # ——————————————
+        # 참고 통계
+        # ——————————————
+        odd_dist = odd_even_distribution(matrix)
+        top_odd = int(odd_dist.argmax())
+        sum_start, sum_counts = sum_distribution(matrix)
+        top_sum = int(sum_start[sum_counts.argmax()])
 
-    # 최근 번호 제외
-    overall_top6 = sorted(get_top6(data, exclude=set(recent_top6)))
-
-    # ——————————————
-    # 3) 랜덤 6개
-    # ——————————————
-    random6 = sorted(random.sample(range(1, 46), 6))
+    # 전략별 과거 성적 (새 회차만 채점)
+    from Lotto_Backtest import LABELS, summarize, update
+    results = update(draws)
+    backtest = "\n".join(
+        f"{LABELS[name]} {s['mean']:.2f}개 · {s['ge3'] * 100:.1f}%"
+        for name, s in summarize(results).items()
+    )
 
     # ——————————————
     # 메시지 생성
@@ -88,20 +316,32 @@ def main():
 🎯 제 {next_round} 회차 당첨 예상 추천 번호
 
 🔥 최근 30회 HOT
-{' '.join(map(str, recent_top6))}
+{' '.join(map(str, picks["hot"]))}
 
 📈 전체 장기 강세 (HOT 제외)
-{' '.join(map(str, overall_top6))}
+{' '.join(map(str, picks["long"]))}
+
+⏳ 장기 미출현
+{' '.join(map(str, picks["overdue"]))}
+
+🤝 HOT 1위 동반 출현
+{' '.join(map(str, picks["pair"]))}
 
 🎲 랜덤
-{' '.join(map(str, random6))}
+{' '.join(map(str, picks["random"]))}
+
+📊 홀:짝 최빈 {top_odd}:{6 - top_odd} / 합계 최빈 구간 {top_sum}~{top_sum + 19}
+
+📐 백테스트 {results["draw_no"][0]}~{results["draw_no"][-1]}회 (평균 적중 · 3개 이상)
+{backtest}
 
 ※ 과거 데이터 기반 참고용 번호입니다
 """
 
-    send_telegram(msg)
+    send_telegram(with_perf_footer(msg))
 
 
 # ==============================
 if __name__ == "__main__":
+    profile_if_requested()
     main()
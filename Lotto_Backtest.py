@@ -0,0 +1,191 @@
+import os
+import sys
+import time
+from math import comb
+
+import numpy as np
+
+from Lotto import HOT_WINDOW, STRATEGIES, build_draw_matrix, load_draws
+from Perf_Metrics import timed
+
+# ==============================
+# 로또 추천 전략 백테스트
+# ==============================
+# 실행: python Lotto_Backtest.py [--full]
+# 각 회차 t 마다 t 이전 회차만으로 전략별 추천 번호를 만들고 t 회차 실제 번호와 비교
+# - 모든 회차를 한 번에 행렬로 계산 (누적합 / 누적 쌍 행렬) → 파이썬 반복은 동반 출현 전략의 5단계뿐
+# - 결과는 data/lotto_backtest.npz 에 회차별 적중 수로 저장 → 새 회차가 생기면 그 회차만 계산
+#   (--full 또는 전략 목록이 바뀌면 처음부터 다시)
+BACKTEST_FILE = "data/lotto_backtest.npz"
+WARMUP = HOT_WINDOW     # 이 회차 수가 쌓인 뒤부터 채점
+RANDOM_SEED = 645
+
+LABELS = {"hot": "HOT", "long": "장기 강세", "overdue": "장기 미출현", "pair": "동반 출현", "random": "랜덤"}
+
+def expected_distribution():
+    """무작위 6개가 k개 맞을 확률 = C(6,k)·C(39,6-k) / C(45,6)"""
+    return np.array([comb(6, k) * comb(39, 6 - k) for k in range(7)]) / comb(45, 6)
+
+
+# ==============================
+# 전 회차 추천 (행렬 연산)
+# ==============================
+def top6(scores):
+    """행마다 점수 상위 6개 번호 인덱스 (동점이면 작은 번호 우선 → Lotto.top_numbers 와 같음)"""
+    return np.argsort(-scores, axis=1, kind="stable")[:, :6]
+
+
+def replay(matrix, start):
+    """start ~ N-1 회차 각각을 그 이전 회차만으로 추천 → {전략: (T, 6) 번호 인덱스 0~44}
+
+    start 이전 부분은 합계 한 번으로 줄이므로 계산량은 새로 채점하는 회차 수에 비례
+    """
+    n = len(matrix)
+    m = matrix.astype(np.int32)
+    steps = np.arange(start, n)
+    rows = np.arange(len(steps))[:, None]
+
+    # 회차 t 직전까지의 번호별 누적 등장 수 (HOT 구간 계산용으로 HOT_WINDOW 만큼 앞에서 시작)
+    lo = max(start - HOT_WINDOW, 0)
+    prior = np.cumsum(np.vstack([m[:lo].sum(axis=0, keepdims=True), m[lo:n - 1]]), axis=0)
+    total = prior[steps - lo].astype(np.float64)
+    recent = total - prior[np.maximum(steps - HOT_WINDOW, 0) - lo]
+
+    picks = {}
+    picks["hot"] = top6(recent)
+
+    excluded = total.copy()
+    excluded[rows, picks["hot"]] = -np.inf
+    picks["long"] = top6(excluded)
+
+    # 번호별 마지막 등장 회차 (없으면 -1) → 지난 회차 수, 한 번도 안 나왔으면 t
+    seen = m[:start].any(axis=0)
+    base = np.where(seen, start - 1 - m[:start][::-1].argmax(axis=0), -1)
+    marks = np.where(m[start:n - 1] > 0, np.arange(start, n - 1)[:, None], -1)
+    last = np.maximum.accumulate(np.vstack([base, marks]), axis=0)
+    gap = np.where(last >= 0, steps[:, None] - 1 - last, steps[:, None])
+    picks["overdue"] = top6(gap.astype(np.float64))
+
+    # 누적 동반 출현 행렬 (T, 45, 45) → HOT 1위부터 동반 합계 최대 번호를 차례로 추가
+    pairs = np.cumsum(
+        np.concatenate([(m[:start].T @ m[:start])[None], m[start:n - 1, :, None] * m[start:n - 1, None, :]]),
+        axis=0,
+    )
+    picked = picks["hot"][:, :1]
+    for _ in range(5):
+        score = pairs[rows, picked].sum(axis=1).astype(np.float64)
+        score[rows, picked] = -np.inf
+        picked = np.hstack([picked, score.argmax(axis=1)[:, None]])
+    picks["pair"] = picked
+
+    rng = np.random.default_rng([RANDOM_SEED, start])
+    picks["random"] = rng.random((len(steps), 45)).argsort(axis=1)[:, :6]
+    return picks
+
+
+def score(matrix, bonus, start, picks):
+    """→ (적중 수 (T, S) int8, 보너스 적중 (T, S) bool) — 열 순서는 picks 순서"""
+    steps = np.arange(start, len(matrix))[:, None]
+    hits = np.stack([matrix[steps, p].sum(axis=1) for p in picks.values()], axis=1).astype(np.int8)
+    bonus_hit = np.stack([(p == bonus[start:, None] - 1).any(axis=1) for p in picks.values()], axis=1)
+    return hits, bonus_hit
+
+
+# ==============================
+# 저장 / 증분 갱신
+# ==============================
+def load_results():
+    if not os.path.exists(BACKTEST_FILE):
+        return None
+    with np.load(BACKTEST_FILE) as f:
+        return {k: f[k] for k in f.files}
+
+
+def save_results(results):
+    os.makedirs(os.path.dirname(BACKTEST_FILE), exist_ok=True)
+    tmp = BACKTEST_FILE + ".tmp.npz"
+    np.savez(tmp, **results)
+    os.replace(tmp, BACKTEST_FILE)
+
+
+def update(draws=None, full=False):
+    """저장된 결과 이후 회차만 채점해 붙임 → {"draw_no", "hits", "bonus", "strategies"}"""
+    draws = load_draws() if draws is None else draws
+    names = np.array(list(STRATEGIES))
+    results = None if full else load_results()
+    if results is not None and list(results["strategies"]) != list(names):
+        results = None
+    if results is None:
+        results = {
+            "draw_no": np.empty(0, dtype=np.int16),
+            "hits": np.empty((0, len(names)), dtype=np.int8),
+            "bonus": np.empty((0, len(names)), dtype=bool),
+            "strategies": names,
+        }
+
+    done = int(results["draw_no"][-1]) if len(results["draw_no"]) else 0
+    start = max(int(np.searchsorted(draws[:, 0], done, side="right")), WARMUP)
+    if start >= len(draws):
+        return results
+
+    with timed("compute", "lotto_backtest"):
+        matrix = build_draw_matrix(draws[:, 1:7])
+        hits, bonus = score(matrix, draws[:, 7], start, replay(matrix, start))
+
+    results["draw_no"] = np.concatenate([results["draw_no"], draws[start:, 0]])
+    results["hits"] = np.vstack([results["hits"], hits])
+    results["bonus"] = np.vstack([results["bonus"], bonus])
+    save_results(results)
+    return results
+
+
+# ==============================
+# 요약
+# ==============================
+def summarize(results, last=None):
+    """전략별 {"draws", "mean", "dist"(0~6개 비율), "ge3", "ranks"{1~5등: 횟수}}"""
+    hits = results["hits"][-last:] if last else results["hits"]
+    bonus = results["bonus"][-last:] if last else results["bonus"]
+    summary = {}
+    for i, name in enumerate(results["strategies"]):
+        h, b = hits[:, i], bonus[:, i]
+        counts = np.bincount(h, minlength=7)
+        summary[str(name)] = {
+            "draws": len(h),
+            "mean": float(h.mean()) if len(h) else 0.0,
+            "dist": counts / max(len(h), 1),
+            "ge3": float((h >= 3).mean()) if len(h) else 0.0,
+            "ranks": {
+                1: int(counts[6]),
+                2: int(((h == 5) & b).sum()),
+                3: int(((h == 5) & ~b).sum()),
+                4: int(counts[4]),
+                5: int(counts[3]),
+            },
+        }
+    return summary
+
+
+def format_summary(summary):
+    expected = expected_distribution()
+    lines = [f"{'전략':<10}{'회차':>6}{'평균':>7}{'3개↑':>8}  0~6개 적중 비율 (%)"]
+    for name, s in summary.items():
+        dist = " ".join(f"{p * 100:5.1f}" for p in s["dist"])
+        lines.append(f"{LABELS.get(name, name):<10}{s['draws']:>6}{s['mean']:>7.3f}{s['ge3'] * 100:>7.2f}%  {dist}")
+    dist = " ".join(f"{p * 100:5.1f}" for p in expected)
+    lines.append(f"{'(무작위 기대)':<10}{'':>6}{0.8:>7.3f}{expected[3:].sum() * 100:>7.2f}%  {dist}")
+    for name, s in summary.items():
+        ranks = ", ".join(f"{r}등 {c}" for r, c in s["ranks"].items() if c)
+        lines.append(f"  {LABELS.get(name, name)}: {ranks or '5등 이상 없음'}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    results = update(full="--full" in sys.argv)
+    elapsed = time.perf_counter() - started
+    if not len(results["draw_no"]):
+        print("채점할 회차가 없습니다 (python Lotto.py 로 회차 저장소를 먼저 채우세요)")
+        sys.exit(1)
+    print(f"{results['draw_no'][0]}~{results['draw_no'][-1]}회 백테스트 ({elapsed:.3f}초)")
+    print(format_summary(summarize(results)))
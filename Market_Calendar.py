@@ -0,0 +1,176 @@
+import os
+import json
+from datetime import datetime, time as dtime, timedelta
+from zoneinfo import ZoneInfo
+
+from State_File import update_json
+
+# =========================
+# 거래소 달력 (KRX / 미국)
+# =========================
+# 각 실행 진입점에서 네트워크 조회 전에 확인
+#   run, sessions = check_sessions("jonghak", ["KRX"])
+#   if not run: return                 # 휴장일 → 조회 / 전송 생략
+#   ...
+#   if sessions: save_snapshot(...); mark_reported("jonghak", sessions)
+# 휴장일에 수동 실행(workflow_dispatch) 하거나 MARKET_CALENDAR=off 이면
+# 그대로 실행하되 스냅샷은 갱신하지 않음 → 전일 대비 기준은 마지막 거래일 종가로 유지
+STATE_FILE = "data/market_sessions.json"
+
+MARKETS = {
+    "KRX": (ZoneInfo("Asia/Seoul"), dtime(9, 0), dtime(15, 30)),
+    "US": (ZoneInfo("America/New_York"), dtime(9, 30), dtime(16, 0)),
+}
+
+# 휴장일 (주말 제외) — 매년 거래소 공지 후 갱신
+HOLIDAYS = {
+    "KRX": {
+        # 2025
+        "2025-01-01", "2025-01-27", "2025-01-28", "2025-01-29", "2025-01-30",
+        "2025-03-03", "2025-05-01", "2025-05-05", "2025-05-06", "2025-06-03",
+        "2025-06-06", "2025-08-15", "2025-10-03", "2025-10-06", "2025-10-07",
+        "2025-10-08", "2025-10-09", "2025-12-25", "2025-12-31",
+        # 2026
+        "2026-01-01", "2026-02-16", "2026-02-17", "2026-02-18", "2026-03-02",
+        "2026-05-01", "2026-05-05", "2026-05-25", "2026-06-03", "2026-08-17",
+        "2026-09-24", "2026-09-25", "2026-10-05", "2026-10-09", "2026-12-25",
+        "2026-12-31",
+        # 2027
+        "2027-01-01", "2027-02-05", "2027-02-08", "2027-03-01", "2027-05-05",
+        "2027-05-13", "2027-08-16", "2027-09-14", "2027-09-15", "2027-09-16",
+        "2027-10-04", "2027-10-11", "2027-12-27", "2027-12-31",
+    },
+    "US": {
+        # 2025
+        "2025-01-01", "2025-01-09", "2025-01-20", "2025-02-17", "2025-04-18",
+        "2025-05-26", "2025-06-19", "2025-07-04", "2025-09-01", "2025-11-27",
+        "2025-12-25",
+        # 2026
+        "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25",
+        "2026-06-19", "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25",
+        # 2027
+        "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31",
+        "2027-06-18", "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-24",
+    },
+}
+CALENDAR_YEARS = range(2025, 2028)
+
+# 장 시간이 다른 날 (개장, 폐장)
+#   KRX: 새해 첫 거래일 10시 개장, 수능일 10시 개장 / 16시 30분 폐장
+#   US : 독립기념일 전날, 추수감사절 다음 날, 크리스마스 이브 13시 조기 폐장
+SPECIAL_SESSIONS = {
+    "KRX": {
+        "2025-01-02": (dtime(10, 0), dtime(15, 30)),
+        "2025-11-13": (dtime(10, 0), dtime(16, 30)),
+        "2026-01-02": (dtime(10, 0), dtime(15, 30)),
+        "2026-11-19": (dtime(10, 0), dtime(16, 30)),
+        "2027-01-04": (dtime(10, 0), dtime(15, 30)),
+        "2027-11-18": (dtime(10, 0), dtime(16, 30)),
+    },
+    "US": {
+        "2025-07-03": (dtime(9, 30), dtime(13, 0)),
+        "2025-11-28": (dtime(9, 30), dtime(13, 0)),
+        "2025-12-24": (dtime(9, 30), dtime(13, 0)),
+        "2026-11-27": (dtime(9, 30), dtime(13, 0)),
+        "2026-12-24": (dtime(9, 30), dtime(13, 0)),
+        "2027-11-26": (dtime(9, 30), dtime(13, 0)),
+    },
+}
+
+
+# =========================
+# 거래일 / 장 시간
+# =========================
+def is_trading_day(market, day):
+    if day.weekday() >= 5:
+        return False
+    if day.year not in CALENDAR_YEARS:
+        # 달력 범위 밖 → 주말만 휴장으로 처리
+        return True
+    return day.isoformat() not in HOLIDAYS[market]
+
+
+def session(market, day):
+    """해당 날짜의 (개장, 폐장) 시각 (거래소 현지 시간대), 휴장이면 None"""
+    if not is_trading_day(market, day):
+        return None
+    tz, start, end = MARKETS[market]
+    start, end = SPECIAL_SESSIONS[market].get(day.isoformat(), (start, end))
+    return datetime.combine(day, start, tz), datetime.combine(day, end, tz)
+
+
+def is_open(market, now=None):
+    tz = MARKETS[market][0]
+    local = (now or datetime.now(tz)).astimezone(tz)
+    hours = session(market, local.date())
+    return hours is not None and hours[0] <= local <= hours[1]
+
+
+def market_date(market, now=None):
+    """now 시점의 거래소 현지 날짜"""
+    tz = MARKETS[market][0]
+    return (now or datetime.now(tz)).astimezone(tz).date()
+
+
+def is_session_over(market, day, now=None):
+    """day 가 휴장일이거나 그날 장이 이미 폐장했으면 True"""
+    hours = session(market, day)
+    return hours is None or (now or datetime.now(MARKETS[market][0])) > hours[1]
+
+
+def previous_trading_day(market, day):
+    day -= timedelta(days=1)
+    while not is_trading_day(market, day):
+        day -= timedelta(days=1)
+    return day
+
+
+def latest_session(market, now=None):
+    """now 시점까지 개장한 가장 최근 거래일 (장중이면 오늘)"""
+    tz = MARKETS[market][0]
+    local = (now or datetime.now(tz)).astimezone(tz)
+    hours = session(market, local.date())
+    if hours is not None and local >= hours[0]:
+        return local.date()
+    return previous_trading_day(market, local.date())
+
+
+# =========================
+# 실행 여부 판단
+# =========================
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def pending_sessions(report, markets, now=None):
+    """아직 리포트하지 않은 거래일 → {시장: 날짜}"""
+    done = load_state().get(report, {})
+    sessions = {m: latest_session(m, now).isoformat() for m in markets}
+    return {m: d for m, d in sessions.items() if done.get(m) != d}
+
+
+def forced():
+    return (
+        os.environ.get("MARKET_CALENDAR", "on") == "off"
+        or os.environ.get("GITHUB_EVENT_NAME") == "workflow_dispatch"
+    )
+
+
+def check_sessions(report, markets, now=None):
+    """→ (실행 여부, 새 거래일 {시장: 날짜}). 네트워크 조회 없이 달력만 확인"""
+    sessions = pending_sessions(report, markets, now)
+    if sessions:
+        return True, sessions
+    if forced():
+        print(f"[{report}] 새 거래일 없음 — 수동 실행이므로 계속 (스냅샷 유지)")
+        return True, {}
+    print(f"[{report}] 지난 실행 이후 {'/'.join(markets)} 새 거래일 없음 — 실행 생략")
+    return False, {}
+
+
+def mark_reported(report, sessions):
+    # 다른 봇이 동시에 기록해도 서로의 키를 덮어쓰지 않도록 잠금 안에서 다시 읽어 갱신
+    update_json(STATE_FILE, lambda state: state.setdefault(report, {}).update(sessions))
@@ -4,6 +4,8 @@ from bs4 import BeautifulSoup
 import re
 from googletrans import Translator
 import feedparser
+from Perf_Metrics import timed
+from Profiler import profile_if_requested
 
 # 환경 변수
 BOT_TOKEN = os.environ.get("BOT_TOKEN")
@@ -19,25 +21,30 @@ RSS_LIST = [
 translator = Translator()
 
 def translate_text(text):
-    try:
-        if not text or text.strip() == "": return text
-        result = translator.translate(text, dest='ko')
-        return result.text
-    except:
-        return text
+    with timed("fetch", "googletrans") as m:
+        try:
+            if not text or text.strip() == "": return text
+            result = translator.translate(text, dest='ko')
+            return result.text
+        except Exception as e:
+            m.fail(e)
+            return text
 
 def get_summary(url):
     """국내 신문사 본문 요약 로직"""
     try:
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
-        r = requests.get(url, timeout=8, headers=headers)
+        with timed("fetch", "article") as m:
+            r = requests.get(url, timeout=8, headers=headers)
+            m.add_bytes(len(r.content))
         r.encoding = 'utf-8'
-        soup = BeautifulSoup(r.text, "html.parser")
-        for s in soup(['script', 'style', 'header', 'footer', 'nav', 'aside']):
-            s.decompose()
-        text = soup.get_text(" ", strip=True)
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        valid_sentences = [s for s in sentences if 40 < len(s) < 200]
+        with timed("parse", "article"):
+            soup = BeautifulSoup(r.text, "html.parser")
+            for s in soup(['script', 'style', 'header', 'footer', 'nav', 'aside']):
+                s.decompose()
+            text = soup.get_text(" ", strip=True)
+            sentences = re.split(r'(?<=[.!?])\s+', text)
+            valid_sentences = [s for s in sentences if 40 < len(s) < 200]
         return " ".join(valid_sentences[:2]) if valid_sentences else "본문 요약을 가져올 수 없습니다."
     except:
         return "요약을 불러오는 중 오류가 발생했습니다."
@@ -48,7 +55,9 @@ def get_realtime_cnn():
     try:
         url = "https://edition.cnn.com/business"
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
-        res = requests.get(url, headers=headers, timeout=10)
+        with timed("fetch", "cnn:business") as m:
+            res = requests.get(url, headers=headers, timeout=10)
+            m.add_bytes(len(res.content))
         soup = BeautifulSoup(res.text, "html.parser")
         
         # CNN의 최신 뉴스 카드/링크 패턴 추출
@@ -75,7 +84,8 @@ def get_realtime_cnn():
 def collect_and_send():
     # 1~3번 국내 뉴스 처리
     for i, rss_url in enumerate(RSS_LIST):
-        feed = feedparser.parse(rss_url)
+        with timed("fetch", f"rss:{rss_url}"):
+            feed = feedparser.parse(rss_url)
         source_name = ["한겨레", "한국경제", "매일경제"][i]
         message = f"<b>🚀 실시간 주요 뉴스 ({i+1}/4) - {source_name}</b>\n\n"
         
@@ -98,10 +108,12 @@ def collect_and_send():
     
     send_to_telegram(message)
 
+@timed("send", "telegram:sendMessage")
 def send_to_telegram(text):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     payload = {"chat_id": CHAT_ID, "text": text, "parse_mode": "HTML", "disable_web_page_preview": True}
     requests.post(url, data=payload)
 
 if __name__ == "__main__":
+    profile_if_requested()
     collect_and_send()
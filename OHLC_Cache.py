@@ -0,0 +1,92 @@
+import os
+import csv
+import time
+from datetime import date, datetime, timedelta
+
+from Perf_Metrics import timed
+
+# =========================
+# 일봉 OHLC 캐시 (종목별 CSV: data/ohlc/<종목>.csv)
+# =========================
+# - 처음에는 YTD / 1개월을 덮는 구간을 한 번 받고, 이후에는 마지막 날짜 며칠 전부터만 받아 합침
+#   (장중에 받은 당일 봉 / 수정된 직전 봉을 덮어쓰기 위해 OVERLAP_DAYS 만큼 겹쳐 받음)
+# - 한 프로세스에서 같은 종목은 MEMO_TTL 동안 다시 받지 않음 (상시 실행 서버용)
+# - 조회 실패 시 캐시에 있는 값 그대로 사용
+OHLC_DIR = "data/ohlc"
+OVERLAP_DAYS = 5
+MIN_LOOKBACK_DAYS = 40   # 1개월 + 여유 (1월에도 1M 구간이 남도록)
+MEMO_TTL = 300           # 초
+
+_loaded = {}
+
+
+def ohlc_path(symbol):
+    safe = symbol.replace("=", "_").replace("^", "_")
+    return os.path.join(OHLC_DIR, f"{safe}.csv")
+
+
+def load_ohlc(symbol):
+    """→ {날짜(YYYY-MM-DD): (시가, 고가, 저가, 종가)}"""
+    path = ohlc_path(symbol)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {row[0]: tuple(map(float, row[1:5])) for row in csv.reader(f) if row}
+
+
+def save_ohlc(symbol, rows):
+    os.makedirs(OHLC_DIR, exist_ok=True)
+    with open(ohlc_path(symbol), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        for day in sorted(rows):
+            writer.writerow([day, *(round(v, 6) for v in rows[day])])
+
+
+def history_start(today):
+    """보관 시작일: 올해 1월 1일과 MIN_LOOKBACK_DAYS 전 중 이른 날"""
+    return min(date(today.year, 1, 1), today - timedelta(days=MIN_LOOKBACK_DAYS))
+
+
+def fetch_ohlc(symbol, start):
+    import yfinance as yf
+
+    with timed("fetch", f"yfinance:{symbol}") as m:
+        df = yf.Ticker(symbol).history(start=start.isoformat(), auto_adjust=False)
+        m.add_bytes(int(df.memory_usage(deep=False).sum()))
+    return {
+        ts.strftime("%Y-%m-%d"): (float(o), float(h), float(l), float(c))
+        for ts, o, h, l, c in zip(df.index, df["Open"], df["High"], df["Low"], df["Close"])
+        if c == c  # NaN 제외
+    }
+
+
+def update_ohlc(symbol, today=None):
+    """캐시에 없는 구간만 받아 합치고 저장 → 갱신된 행"""
+    today = today or datetime.now().date()
+    rows = load_ohlc(symbol)
+    keep_from = history_start(today).isoformat()
+    if rows:
+        last = date.fromisoformat(max(rows))
+        start = max(last - timedelta(days=OVERLAP_DAYS), history_start(today))
+    else:
+        start = history_start(today)
+
+    try:
+        fetched = fetch_ohlc(symbol, start)
+    except Exception as e:
+        print(f"[WARN] 일봉 조회 실패: {symbol} ({e}) → 캐시 사용")
+        return rows
+
+    merged = {d: v for d, v in rows.items() if d >= keep_from}
+    merged.update(fetched)
+    if merged != rows:
+        save_ohlc(symbol, merged)
+    return merged
+
+
+def get_ohlc(symbol, today=None, max_age=MEMO_TTL):
+    """MEMO_TTL 이내에 갱신한 종목은 메모리 값 그대로"""
+    entry = _loaded.get(symbol)
+    if entry is None or time.time() - entry[1] >= max_age:
+        entry = _loaded[symbol] = (update_ohlc(symbol, today), time.time())
+    return entry[0]
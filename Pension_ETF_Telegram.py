@@ -5,7 +5,17 @@ import time
 import os
 import json
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 from matplotlib import font_manager, rc
+from Perf_Metrics import timed, with_perf_footer
+from Profiler import profile_if_requested
+from Report_Renderer import compile_template, render_block, render_blocks
+from Core_Model import Portfolio, Quote
+from Market_Calendar import check_sessions, mark_reported
+from Price_Guard import REQUEST_TIMEOUT, guarded_price, stale_note
+from Price_History import record_closes
+from Rebalancer import suggest, render_actions
+from Series_Store import SeriesStore
 
 # =========================
 # 텔레그램 설정
@@ -16,6 +26,8 @@ CHAT_ID = os.environ["CHAT_ID"]
 DATA_DIR = "data"
 SNAPSHOT_FILE = f"{DATA_DIR}/snapshot_pension.json"
 GRAPH_FILE = f"{DATA_DIR}/pension_account_compare.png"
+HISTORY_GRAPH_FILE = f"{DATA_DIR}/pension_account_history.png"
+HISTORY_SERIES = "pension_accounts"   # 계좌별 평가금액 일별 기록
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # =========================
@@ -46,26 +58,61 @@ portfolio = [
     {"account": "Personal Account", "name": "KODEX 금융 고배당 Top10 타겟 위클리 커버드콜", "code": "498410", "qty": 33, "buy": 14960},
 ]
 
+# 계좌가 여러 개라 스냅샷 키는 "계좌_코드"
+def snapshot_key(holding):
+    return f"{holding.account}_{holding.code}"
+
+# =========================
+# 리포트 템플릿
+# =========================
+HOLDING_BLOCK = compile_template("■ {name}", [
+    ("현재가", "{price:,}원"),
+    ("수익률", "{rate:+.2f}% {rate_arrow}"),
+    ("평가손익", "{profit:+,}원"),
+    ("전일 대비", "{delta:+,}원 {delta_arrow}"),
+    ("비중", "{weight:.1f}%"),
+])
+
+ACCOUNT_BLOCK = compile_template("🧾 {name} 요약", [
+    ("총 평가금액", "{now:,}원"),
+    ("총 수익금", "{profit:+,}원"),
+    ("총 수익률", "{rate:+.2f}% {rate_arrow}"),
+    ("전일 대비", "{delta:+,}원 {delta_arrow}"),
+], footer="========================\n")
+
+PORTFOLIO_BLOCK = compile_template("📈 [전체 포트폴리오 요약]", [
+    ("전체 평가금액", "{now:,}원"),
+    ("전체 총 수익금", "{profit:+,}원"),
+    ("전체 총 수익률", "{rate:+.2f}% {rate_arrow}"),
+    ("전일 대비 합계", "{delta:+,}원 {delta_arrow}"),
+])
+
 # =========================
 # 현재가 조회
 # =========================
 def get_current_price(code):
     url = f"https://finance.naver.com/item/main.naver?code={code}"
     headers = {"User-Agent": "Mozilla/5.0"}
-    res = requests.get(url, headers=headers, timeout=10)
-    soup = BeautifulSoup(res.text, "html.parser")
-    price = soup.select_one("p.no_today span.blind")
-    if not price:
-        raise ValueError(code)
+    with timed("fetch", f"naver:{code}") as m:
+        res = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        m.add_bytes(len(res.content))
+        res.raise_for_status()
+    with timed("parse", f"naver:{code}"):
+        soup = BeautifulSoup(res.text, "html.parser")
+        price = soup.select_one("p.no_today span.blind")
+        if not price:
+            raise ValueError(f"현재가 조회 실패: {code}")
     return int(price.text.replace(",", ""))
 
 # =========================
 # 텔레그램
 # =========================
+@timed("send", "telegram:sendMessage")
 def send_msg(text):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     requests.post(url, data={"chat_id": CHAT_ID, "text": text})
 
+@timed("send", "telegram:sendPhoto")
 def send_photo(path, caption):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendPhoto"
     with open(path, "rb") as f:
@@ -85,21 +132,37 @@ def save_snapshot(data):
 # =========================
 # 실행
 # =========================
-def run_report():
-    prev = load_snapshot()
-    today = {}
+def fetch_prices():
+    """→ (현재가, 지연 시세 {종목코드: 저장 시각}). 대체값도 없는 종목은 빠짐"""
     prices = {}
-
+    stale = {}
+    failed = set()
     for p in portfolio:
+        code = p["code"]
+        if code in prices or code in failed:
+            continue
         try:
-            prices[p["code"]] = get_current_price(p["code"])
-        except:
-            prices[p["code"]] = 0
+            prices[code], at = guarded_price("naver", code, get_current_price)
+        except Exception as e:
+            print(f"[WARN] {p['name']} 시세 없음 ({e})")
+            failed.add(code)
+            continue
+        if at:
+            stale[code] = at
         time.sleep(0.3)
+    return prices, stale
 
-    accounts = {}
-    totals = {}
-    g_buy = g_now = g_prev = 0
+def build_report(prices, prev, stale=None):
+    """조회된 현재가로 리포트 작성 → (본문, 오늘 스냅샷, 계좌별 합계)
+
+    prices 에 없는 종목은 본문 / 합계에서 빼고 스냅샷은 이전 값 유지,
+    stale 종목은 ⚠️ 표시 후 하단에 기준 시각 안내
+    """
+    stale = stale or {}
+    book = Portfolio.from_records(portfolio, key=snapshot_key).mark(Quote.table(prices, stale), prev)
+    totals = book.totals()
+    missing = [f"{h.name} ({h.account})" for h, ok in zip(book, book.priced) if not ok]
+    stale_names = {h.name: stale[h.code] for h, s in zip(book, book.stale) if s}
 
     lines = [
         "📊 연금 / ISA 통합 포트폴리오 리포트",
@@ -107,105 +170,77 @@ def run_report():
         ""
     ]
 
-    for p in portfolio:
-        acc = p["account"]
-        code = p["code"]
-        qty = p["qty"]
-        buy_amt = qty * p["buy"]
-        now_amt = qty * prices[code]
-        key = f"{acc}_{code}"
-        prev_amt = prev.get(key, now_amt)
-
-        today[key] = now_amt
-
-        accounts.setdefault(acc, [])
-        totals.setdefault(acc, {"buy": 0, "now": 0, "prev": 0})
-
-        accounts[acc].append({
-            "name": p["name"],
-            "price": prices[code],
-            "qty": qty,
-            "buy": buy_amt,
-            "now": now_amt,
-            "profit": now_amt - buy_amt,
-            "rate": (now_amt - buy_amt) / buy_amt * 100 if buy_amt else 0,
-            "delta": now_amt - prev_amt
-        })
-
-        totals[acc]["buy"] += buy_amt
-        totals[acc]["now"] += now_amt
-        totals[acc]["prev"] += prev_amt
-
-        g_buy += buy_amt
-        g_now += now_amt
-        g_prev += prev_amt
-
     # =========================
     # 출력
     # =========================
-    for acc in accounts:
+    for acc, total in totals.items():
         lines.append(f"📂 [{acc} 계좌]")
         lines.append("────────────────────")
 
-        acc_now = totals[acc]["now"]
-
-        for i in accounts[acc]:
-            weight = i["now"] / acc_now * 100 if acc_now else 0
-
-            rate_emoji = "🔺" if i["rate"] > 0 else "🔻" if i["rate"] < 0 else "➖"
-            delta_emoji = "🔺" if i["delta"] > 0 else "🔻" if i["delta"] < 0 else "➖"
-
-            lines.append(
-                f"■ {i['name']}\n"
-                f"현재가: {i['price']:,}원\n"
-                f"수익률: {i['rate']:+.2f}% {rate_emoji}\n"
-                f"평가손익: {i['profit']:+,}원\n"
-                f"전일 대비: {i['delta']:+,}원 {delta_emoji}\n"
-                f"비중: {weight:.1f}%"
+        rows = [
+            book.valuation(
+                i,
+                name=f"{book.holdings[i].name} ⚠️" if book.stale[i] else None,
+                weight=book.now[i].item() / total.now * 100 if total.now else 0,
             )
-            lines.append("- - - - -")
-
-        acc_profit = totals[acc]["now"] - totals[acc]["buy"]
-        acc_rate = acc_profit / totals[acc]["buy"] * 100 if totals[acc]["buy"] else 0
-        acc_delta = totals[acc]["now"] - totals[acc]["prev"]
-
-        acc_rate_emoji = "🔺" if acc_rate > 0 else "🔻" if acc_rate < 0 else "➖"
-        acc_delta_emoji = "🔺" if acc_delta > 0 else "🔻" if acc_delta < 0 else "➖"
-
-        lines += [
-            f"🧾 {acc} 요약",
-            f"총 평가금액: {totals[acc]['now']:,}원",
-            f"총 수익금: {acc_profit:+,}원",
-            f"총 수익률: {acc_rate:+.2f}% {acc_rate_emoji}",
-            f"전일 대비: {acc_delta:+,}원 {acc_delta_emoji}",
-            "========================\n"
+            for i in book.groups()[acc] if book.priced[i]
         ]
+        lines += render_blocks(HOLDING_BLOCK, rows, separator="- - - - -")
+        lines.append(render_block(ACCOUNT_BLOCK, total))
 
-    g_profit = g_now - g_buy
-    g_rate = g_profit / g_buy * 100 if g_buy else 0
-    g_delta = g_now - g_prev
+    lines.append(render_block(PORTFOLIO_BLOCK, book.total()))
+    if missing:
+        lines.append(f"❌ 시세 조회 실패 (합계 제외): {', '.join(missing)}")
+    lines += stale_note(stale_names)
 
-    g_rate_emoji = "🔺" if g_rate > 0 else "🔻" if g_rate < 0 else "➖"
-    g_delta_emoji = "🔺" if g_delta > 0 else "🔻" if g_delta < 0 else "➖"
+    # 목표 비중(rebalance_targets.json) 대비 거래 제안
+    lines += render_actions(suggest(portfolio, prices))
 
-    lines += [
-        "📈 [전체 포트폴리오 요약]",
-        f"전체 평가금액: {g_now:,}원",
-        f"전체 총 수익금: {g_profit:+,}원",
-        f"전체 총 수익률: {g_rate:+.2f}% {g_rate_emoji}",
-        f"전일 대비 합계: {g_delta:+,}원 {g_delta_emoji}"
-    ]
+    return "\n".join(lines), book.snapshot(prev), totals
+
+def run_report():
+    # KRX 휴장일이면 시세 조회 전에 종료
+    run, sessions = check_sessions("pension", ["KRX"])
+    if not run:
+        return
+
+    prev = load_snapshot()
+    prices, stale = fetch_prices()
 
-    send_msg("\n".join(lines))
+    text, today, totals = build_report(prices, prev, stale)
+    send_msg(with_perf_footer(text))
 
     # =========================
-    # 그래프
+    # 그래프 (기록이 쌓이면 계좌별 평가금액 추이, 그 전에는 오늘 계좌 비교)
     # =========================
+    history = SeriesStore(HISTORY_SERIES)
+    values = {acc: t.now for acc, t in totals.items()}
+    day = sessions.get("KRX") or datetime.now().strftime("%Y-%m-%d")
+    columns, dates, matrix = history.series(live=(day, values))
+    if len(dates) >= 2:
+        render_history_chart(columns, dates, matrix)
+        send_photo(HISTORY_GRAPH_FILE, "📈 계좌별 평가금액 추이")
+    else:
+        render_chart(totals)
+        send_photo(GRAPH_FILE, "📊 계좌별 평가금액 비교")
+
+    # 새 거래일일 때만 스냅샷 갱신 (전일 대비 기준 = 직전 거래일 종가)
+    if sessions:
+        save_snapshot(today)
+        mark_reported("pension", sessions)
+        # 리스크 분석용 일별 종가 (지연 시세 제외)
+        record_closes({c: p for c, p in prices.items() if c not in stale}, sessions["KRX"])
+        # 계좌 추이는 모든 종목이 제때 조회된 날만 기록 (빠진 종목이 있으면 합계가 틀어짐)
+        if not stale and all(p["code"] in prices for p in portfolio):
+            history.append(sessions["KRX"], values)
+
+@timed("render", "pension_account_compare")
+def render_chart(totals):
     plt.figure(figsize=(6, 4))
     
     # 계좌 이름과 현재 평가액 데이터 추출
     acc_names = list(totals.keys())
-    acc_values = [v["now"] for v in totals.values()]
+    acc_values = [v.now for v in totals.values()]
     
     # 막대 그래프 생성
     bars = plt.bar(acc_names, acc_values)
@@ -227,10 +262,25 @@ def run_report():
     plt.savefig(GRAPH_FILE)
     plt.close()
 
-    send_photo(GRAPH_FILE, "📊 계좌별 평가금액 비교")
-    save_snapshot(today)
+@timed("render", "pension_account_history")
+def render_history_chart(columns, dates, matrix):
+    # 저장된 점은 이미 MAX_POINTS 이하로 줄어 있음 → 기록 길이와 관계없이 그리는 비용 일정
+    fig, ax = plt.subplots(figsize=(7, 4))
+    ax.stackplot(dates, matrix.T, labels=columns, alpha=0.85)
+    ax.plot(dates, matrix.sum(axis=1), color="black", linewidth=1, label="Total")
+    ax.set_title("Total Value by Accounts")
+    ax.set_ylabel("won")
+    ax.yaxis.set_major_formatter(lambda v, _: f"{v / 1e6:,.0f}M")
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(ax.xaxis.get_major_locator()))
+    ax.legend(loc="upper left", fontsize=8)
+    ax.annotate(f"{matrix[-1].sum():,.0f} won", (dates[-1], matrix[-1].sum()),
+                ha="right", va="bottom", fontsize=8)
+    fig.tight_layout()
+    fig.savefig(HISTORY_GRAPH_FILE)
+    plt.close(fig)
 
 if __name__ == "__main__":
+    profile_if_requested()
     run_report()
 
 
@@ -0,0 +1,180 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from contextlib import ContextDecorator
+from datetime import datetime
+
+# =========================
+# 실행 성능 계측 (fetch / parse / render / send)
+# =========================
+# 사용법
+#   with timed("fetch", f"naver:{code}") as m:
+#       res = requests.get(...)
+#       m.add_bytes(len(res.content))
+#
+#   @timed("render")
+#   def create_chart(...): ...
+#
+#   with retrying():                  # 대체 경로 / 차단기 시험 조회 → 안의 구간은 retries=1 로 기록
+#       price = fetch(code)
+#
+# 실행이 끝나면 data/metrics.jsonl 에 한 줄씩 자동 기록
+# PERF_FOOTER=1 이면 with_perf_footer()가 텔레그램 리포트 끝에 요약 한 줄 추가
+
+METRICS_FILE = os.environ.get("METRICS_FILE", "data/metrics.jsonl")
+PERF_FOOTER = os.environ.get("PERF_FOOTER", "") not in ("", "0", "false")
+
+RUN_ID = datetime.now().strftime("%Y%m%d%H%M%S") + f"-{os.getpid()}"
+BOT_NAME = os.path.splitext(os.path.basename(sys.argv[0] or "interactive"))[0]
+
+_records = []
+_flush_registered = False
+_context = threading.local()   # 스레드별 재시도 블록 깊이
+
+
+def _record(entry):
+    global _flush_registered
+    _records.append(entry)
+    if not _flush_registered:
+        atexit.register(flush)
+        _flush_registered = True
+
+
+class timed(ContextDecorator):
+    """구간 지연시간 / 전송 바이트 / 재시도 / 실패 기록 (컨텍스트 매니저 겸 데코레이터)"""
+
+    def __init__(self, stage, source=None):
+        self.stage = stage
+        self.source = source
+        self.bytes = 0
+        self.retries = 0
+        self.error = None
+
+    def _recreate_cm(self):
+        # 데코레이터로 쓸 때 호출마다 새 측정 객체 사용 (동시 호출 안전)
+        return timed(self.stage, self.source)
+
+    def __call__(self, func):
+        if self.source is None:
+            self.source = func.__name__
+        return super().__call__(func)
+
+    def add_bytes(self, n):
+        self.bytes += n or 0
+
+    def retry(self):
+        self.retries += 1
+
+    def fail(self, error):
+        """예외를 삼키는 코드에서 실패만 기록할 때 사용"""
+        self.error = error
+
+    def __enter__(self):
+        if getattr(_context, "retry", 0):
+            self.retry()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.error = exc
+        _record({
+            "run": RUN_ID,
+            "bot": BOT_NAME,
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "stage": self.stage,
+            "source": self.source,
+            "ms": round((time.perf_counter() - self._start) * 1000, 2),
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "ok": self.error is None,
+            "error": None if self.error is None else f"{type(self.error).__name__}: {self.error}"[:200],
+        })
+        return False
+
+
+class retrying:
+    """이 블록 안(같은 스레드)에서 시작하는 timed 구간을 재시도로 기록
+
+    조회 함수 안쪽의 timed 는 바깥의 재시도 여부를 모르므로 호출하는 쪽에서 감쌈
+    """
+
+    def __enter__(self):
+        _context.retry = getattr(_context, "retry", 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _context.retry -= 1
+        return False
+
+
+def record_elapsed(stage, source, ms, error=None):
+    """다른 프로세스에서 잰 구간 기록 (차트 렌더링 프로세스 풀 등)"""
+    _record({
+        "run": RUN_ID,
+        "bot": BOT_NAME,
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "stage": stage,
+        "source": source,
+        "ms": round(ms, 2),
+        "bytes": 0,
+        "retries": 0,
+        "ok": error is None,
+        "error": None if error is None else f"{type(error).__name__}: {error}"[:200],
+    })
+
+
+def record_failure(stage, source, error):
+    """계측 블록 밖에서 잡힌 실패 기록"""
+    with timed(stage, source) as m:
+        m.fail(error)
+
+
+def records():
+    return list(_records)
+
+
+def summary():
+    """단계별 합계 → {stage: {"ms", "count", "bytes", "failures"}}"""
+    stages = {}
+    for r in _records:
+        s = stages.setdefault(r["stage"], {"ms": 0.0, "count": 0, "bytes": 0, "failures": 0})
+        s["ms"] += r["ms"]
+        s["count"] += 1
+        s["bytes"] += r["bytes"]
+        s["failures"] += 0 if r["ok"] else 1
+    return stages
+
+
+def perf_footer():
+    """⏱ fetch 2.31s×8 · parse 0.12s×8 · send 0.40s×1 · 실패 1 · 최장 naver:0072R0 0.90s"""
+    if not _records:
+        return ""
+    parts = [f"{stage} {s['ms'] / 1000:.2f}s×{s['count']}" for stage, s in summary().items()]
+    failures = sum(0 if r["ok"] else 1 for r in _records)
+    if failures:
+        parts.append(f"실패 {failures}")
+    slowest = max(_records, key=lambda r: r["ms"])
+    parts.append(f"최장 {slowest['source']} {slowest['ms'] / 1000:.2f}s")
+    return "⏱ " + " · ".join(parts)
+
+
+def with_perf_footer(text):
+    if not PERF_FOOTER:
+        return text
+    footer = perf_footer()
+    return f"{text}\n\n{footer}" if footer else text
+
+
+def flush():
+    """이번 실행 기록을 JSON-lines 파일에 추가"""
+    if not _records:
+        return
+    os.makedirs(os.path.dirname(METRICS_FILE) or ".", exist_ok=True)
+    with open(METRICS_FILE, "a", encoding="utf-8") as f:
+        for r in _records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    _records.clear()
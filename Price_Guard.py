@@ -0,0 +1,166 @@
+import os
+import time
+import json
+import atexit
+import threading
+from datetime import datetime
+
+import requests
+
+from Perf_Metrics import retrying
+from State_File import update_json
+
+# =========================
+# 시세 조회 보호 계층 (소스별 차단기 + 마지막 가격 대체)
+# =========================
+# 사용법
+#   price, stale_at = guarded_price("naver", code, get_current_price)
+#   stale_at 이 None 이면 방금 조회한 값, 아니면 그 시각에 저장된 마지막 가격
+#
+# - 네트워크 오류(타임아웃 / 연결 실패 / 5xx)가 BREAKER_THRESHOLD 번 연속이면
+#   그 소스 차단기를 열고 BREAKER_COOLDOWN 초 동안 요청하지 않음 → 바로 대체값 사용
+# - 파싱 실패(태그 없음 등)는 해당 종목만 대체값 사용, 차단기에는 반영하지 않음
+# - 실행 시작 후 FETCH_DEADLINE 초가 지나면 남은 종목은 조회 없이 대체값 사용
+LAST_PRICES_FILE = "data/last_prices.json"
+
+REQUEST_TIMEOUT = (3.05, 6)   # (연결, 응답) 초
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 300
+FETCH_DEADLINE = float(os.environ.get("FETCH_DEADLINE", "60"))
+
+_started = time.monotonic()
+
+
+class SourceUnavailable(Exception):
+    """차단기가 열려 있거나 실행 시간 한도를 넘겨 조회하지 않음"""
+
+
+class CircuitBreaker:
+    def __init__(self, name, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN, clock=time.monotonic):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        # half-open 이면 한 번 시도해 보고 결과로 닫거나 다시 엶
+        return self.state != "open"
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold or self.opened_at is not None:
+                if self.opened_at is None:
+                    print(f"[WARN] {self.name} 차단기 열림 ({self.failures}회 연속 실패)")
+                self.opened_at = self.clock()
+
+
+BREAKERS = {
+    "naver": CircuitBreaker("naver"),
+    "yahoo": CircuitBreaker("yahoo"),
+}
+
+
+def is_transport_error(e):
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(e, "response", None)
+    return response is not None and response.status_code >= 500
+
+
+# =========================
+# 마지막 가격 저장소
+# =========================
+_last_prices = None
+_save_registered = False
+_store_lock = threading.Lock()
+
+
+def last_prices():
+    global _last_prices
+    with _store_lock:
+        if _last_prices is None:
+            _last_prices = {}
+            if os.path.exists(LAST_PRICES_FILE):
+                with open(LAST_PRICES_FILE, "r", encoding="utf-8") as f:
+                    _last_prices = json.load(f)
+        return _last_prices
+
+
+def remember(symbol, price):
+    global _save_registered
+    store = last_prices()
+    with _store_lock:
+        store[symbol] = {"price": price, "at": datetime.now().strftime("%Y-%m-%d %H:%M")}
+        if not _save_registered:
+            atexit.register(save_last_prices)
+            _save_registered = True
+
+
+def save_last_prices():
+    # 이번 실행에서 조회한 종목만 덮어쓰고 다른 봇이 저장한 종목은 유지
+    store = last_prices()
+    with _store_lock:
+        update_json(LAST_PRICES_FILE, lambda saved: saved.update(store))
+
+
+# =========================
+# 보호된 조회
+# =========================
+def fetch_with_breaker(source, fetch, *args, deadline=FETCH_DEADLINE):
+    """차단기 확인 후 조회. 막혀 있으면 SourceUnavailable (상시 실행 프로세스는 deadline=None)"""
+    breaker = BREAKERS[source]
+    if deadline is not None and time.monotonic() - _started > deadline:
+        raise SourceUnavailable(f"{source}: 실행 시간 한도 초과")
+    if not breaker.allow():
+        raise SourceUnavailable(f"{source}: 차단기 열림")
+    try:
+        if breaker.state == "half-open":
+            # 차단 후 다시 시도하는 시험 조회 → 지표에는 재시도로 기록
+            with retrying():
+                value = fetch(*args)
+        else:
+            value = fetch(*args)
+    except Exception as e:
+        if is_transport_error(e):
+            breaker.failure()
+        raise
+    breaker.success()
+    return value
+
+
+def guarded_price(source, symbol, fetch):
+    """→ (가격, 대체값 저장 시각 또는 None). 조회도 대체값도 없으면 마지막 예외 그대로"""
+    try:
+        price = fetch_with_breaker(source, fetch, symbol)
+    except Exception as e:
+        cached = last_prices().get(symbol)
+        if cached is None:
+            raise
+        print(f"[WARN] {symbol} 조회 실패 ({e}) → {cached['at']} 가격 사용")
+        return cached["price"], cached["at"]
+    remember(symbol, price)
+    return price, None
+
+
+def stale_note(stale):
+    """{이름: 저장 시각} → 리포트 하단 안내 줄 (없으면 빈 목록)"""
+    if not stale:
+        return []
+    return ["", "⚠️ 지연 시세 (마지막 조회값 사용)"] + [f"  · {name}: {at}" for name, at in stale.items()]
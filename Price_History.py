@@ -0,0 +1,119 @@
+import os
+import re
+import sys
+import csv
+import io
+from datetime import datetime, timezone, timedelta
+
+import requests
+
+from Perf_Metrics import timed
+from State_File import file_lock, write_atomic
+
+# =========================
+# 일별 종가 기록 (종목별 CSV: data/history/<종목>.csv)
+# =========================
+# - 매일 리포트가 이미 조회한 현재가를 그날 종가로 추가 → 추가 네트워크 요청 없음
+# - 처음 한 번만 과거 데이터 채우기: python Price_History.py --backfill [일수]
+HISTORY_DIR = "data/history"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+NAVER_CHART_URL = "https://fchart.stock.naver.com/sise.nhn?symbol={code}&timeframe=day&count={count}&requestType=0"
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?range={range}&interval=1d"
+
+NAVER_ITEM_RE = re.compile(r'data="(\d{8})\|[^|]*\|[^|]*\|[^|]*\|([\d.]+)\|')
+
+
+def history_path(symbol):
+    return os.path.join(HISTORY_DIR, f"{symbol.replace('=', '_')}.csv")
+
+
+def load_history(symbol):
+    """→ {날짜(YYYY-MM-DD): 종가}"""
+    path = history_path(symbol)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {row[0]: float(row[1]) for row in csv.reader(f) if row}
+
+
+def save_history(symbol, closes):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for day in sorted(closes):
+        writer.writerow([day, closes[day]])
+    write_atomic(history_path(symbol), buf.getvalue(), newline="")
+
+
+def record_closes(prices, day):
+    """리포트에서 조회한 가격을 day 종가로 기록 (같은 날 다시 실행하면 덮어씀)"""
+    for symbol, price in prices.items():
+        if price is None:
+            continue
+        # 같은 종목을 가진 봇끼리 동시에 기록할 수 있어 종목 파일 단위로 잠금
+        with file_lock(history_path(symbol)):
+            closes = load_history(symbol)
+            if closes.get(day) == price:
+                continue
+            closes[day] = price
+            save_history(symbol, closes)
+
+
+# =========================
+# 과거 데이터 채우기 (최초 1회)
+# =========================
+def fetch_naver_history(code, count=400):
+    url = NAVER_CHART_URL.format(code=code, count=count)
+    with timed("fetch", f"naver-chart:{code}") as m:
+        res = requests.get(url, headers=HEADERS, timeout=10)
+        m.add_bytes(len(res.content))
+        res.raise_for_status()
+    return {
+        f"{d[:4]}-{d[4:6]}-{d[6:]}": float(close)
+        for d, close in NAVER_ITEM_RE.findall(res.text)
+    }
+
+
+def fetch_yahoo_history(ticker, days=400):
+    url = YAHOO_CHART_URL.format(ticker=ticker, range="2y" if days > 365 else "1y")
+    with timed("fetch", f"yahoo-chart:{ticker}") as m:
+        res = requests.get(url, headers=HEADERS, timeout=10)
+        m.add_bytes(len(res.content))
+        res.raise_for_status()
+    result = res.json()["chart"]["result"][0]
+    offset = timedelta(seconds=result["meta"].get("gmtoffset", 0))
+    closes = result["indicators"]["quote"][0]["close"]
+    return {
+        (datetime.fromtimestamp(ts, timezone.utc) + offset).strftime("%Y-%m-%d"): float(c)
+        for ts, c in zip(result["timestamp"], closes)
+        if c is not None
+    }
+
+
+def backfill(symbols, days=400):
+    """기록이 days 의 절반도 안 되는 종목만 과거 데이터를 받아 합침"""
+    from Quote_Client import is_krx_code
+
+    for symbol in symbols:
+        closes = load_history(symbol)
+        if len(closes) >= days // 2:
+            continue
+        try:
+            if is_krx_code(symbol):
+                fetched = fetch_naver_history(symbol, days)
+            else:
+                fetched = fetch_yahoo_history(symbol, days)
+        except Exception as e:
+            print(f"[WARN] 과거 시세 조회 실패: {symbol} ({e})")
+            continue
+        fetched.update(closes)   # 직접 기록한 값 우선
+        save_history(symbol, fetched)
+        print(f"{symbol}: {len(fetched)}일")
+
+
+if __name__ == "__main__":
+    if "--backfill" in sys.argv:
+        from Risk_Analytics import held_symbols
+
+        args = [a for a in sys.argv[1:] if not a.startswith("--")]
+        backfill(held_symbols(), int(args[0]) if args else 400)
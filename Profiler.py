@@ -0,0 +1,218 @@
+import os
+import sys
+import time
+import runpy
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime
+
+# =========================
+# 실행 프로파일 (샘플링 → flame graph 용 collapsed stack + 상위 N 요약)
+# =========================
+# 사용법
+#   python Index.py --profile                 # 각 봇 __main__ 의 profile_if_requested()
+#   python Profiler.py NEWS.py [인자 ...]      # 아무 스크립트나 그대로 실행하며 프로파일
+#   PROFILE=1 python Bot_Launcher.py etf      # 환경변수로도 켤 수 있음 (Bot_Launcher --profile 도 같음)
+#
+# PROFILE_INTERVAL 마다 모든 스레드의 파이썬 스택을 찍고, 그 사이 해당 스레드가 실제로 쓴 CPU 시간
+# (스레드별 CPU 시계) 을 함께 기록 → 같은 스택에서 보낸 벽시계 시간 중 CPU / 대기 를 나눔
+#   대기 = 네트워크 응답 / sleep / 락 등 CPU 를 쓰지 않고 멈춰 있던 시간
+# 결과 (data/profiles/<봇>-<시각>.*)
+#   .wall.collapsed  스택별 벽시계 ms  ┐ flamegraph.pl / speedscope 에 그대로 입력
+#   .cpu.collapsed   스택별 CPU ms     ┘
+#   .txt             구분별 (network / parse / render / compute) CPU·대기 + 함수별 상위 N
+# C 코드가 GIL 을 오래 잡고 있으면 샘플이 그만큼 늦게 찍히지만, 간격은 실제 경과 시간으로 계산하므로 합계는 맞음
+PROFILE_DIR = "data/profiles"
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))   # 초
+TOP_N = 20
+
+# 스택에서 처음 만나는 (잎 쪽부터) 패키지로 구분
+CATEGORIES = {
+    "network": ("socket", "ssl", "http", "urllib", "urllib3", "requests", "aiohttp", "selectors", "yfinance", "telegram"),
+    "parse": ("bs4", "html", "lxml", "json", "csv", "feedparser", "openpyxl", "ijson"),
+    "render": ("matplotlib", "PIL"),
+    "compute": ("numpy", "pandas"),
+}
+_CATEGORY_OF = {pkg: cat for cat, pkgs in CATEGORIES.items() for pkg in pkgs}
+
+_active = None
+
+
+def _thread_clock(ident):
+    try:
+        return time.pthread_getcpuclockid(ident)
+    except (AttributeError, OSError):   # Windows 등 → CPU / 대기 구분 없이 벽시계만
+        return None
+
+
+class SamplingProfiler:
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.wall = Counter()   # 스택 → 초
+        self.cpu = Counter()
+        self.samples = 0
+        self._clocks = {}       # 스레드 id → (CPU 시계, 직전 CPU 시간)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        self.cpu_total = time.process_time() - self.cpu_started
+
+    # -------------------------
+    # 샘플링
+    # -------------------------
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = now
+
+    def _cpu_delta(self, ident):
+        entry = self._clocks.get(ident)
+        if entry is None:
+            clock = _thread_clock(ident)
+            if clock is None:
+                return None
+            entry = self._clocks[ident] = (clock, time.clock_gettime(clock))
+        clock, before = entry
+        try:
+            now = time.clock_gettime(clock)
+        except OSError:   # 그 사이 끝난 스레드
+            return None
+        self._clocks[ident] = (clock, now)
+        return now - before
+
+    def _sample(self, dt):
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = self._stack(frame, names.get(ident, f"thread-{ident}"))
+            used = self._cpu_delta(ident)
+            self.wall[stack] += dt
+            if used is not None:
+                self.cpu[stack] += min(used, dt)
+        self.samples += 1
+
+    @staticmethod
+    def _stack(frame, thread_name):
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__") or os.path.basename(code.co_filename)
+            frames.append(f"{module}:{code.co_name}")
+            frame = frame.f_back
+        if thread_name != "MainThread":
+            frames.append(thread_name)
+        return tuple(reversed(frames))
+
+    # -------------------------
+    # 결과
+    # -------------------------
+    @staticmethod
+    def category(stack):
+        for label in reversed(stack):
+            pkg = label.split(":", 1)[0].split(".", 1)[0]
+            if pkg in _CATEGORY_OF:
+                return _CATEGORY_OF[pkg]
+        return "app"
+
+    def write(self, name, directory=PROFILE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        for kind, counter in (("wall", self.wall), ("cpu", self.cpu)):
+            with open(f"{base}.{kind}.collapsed", "w", encoding="utf-8") as f:
+                for stack, seconds in counter.most_common():
+                    ms = round(seconds * 1000)
+                    if ms:
+                        f.write(f"{';'.join(stack)} {ms}\n")
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(self.summary(name))
+        return base
+
+    def summary(self, name, top=TOP_N):
+        has_cpu = bool(self.cpu) or not self.wall
+        by_cat = {}
+        by_func = {}
+        for stack, wall in self.wall.items():
+            cpu = self.cpu.get(stack, 0.0)
+            for key, table in ((self.category(stack), by_cat), (stack[-1], by_func)):
+                w, c = table.get(key, (0.0, 0.0))
+                table[key] = (w + wall, c + cpu)
+
+        lines = [
+            f"# {name} 프로파일 {datetime.now().isoformat(timespec='seconds')}",
+            f"실행 {self.elapsed:.2f}초 / 프로세스 CPU {self.cpu_total:.2f}초 / 샘플 {self.samples}회 ({self.interval * 1000:.0f}ms)",
+            "(스레드별 합계 → 여러 스레드가 동시에 기다리면 실행 시간보다 클 수 있음)",
+            "",
+            f"{'구분':<10}{'벽시계':>10}{'CPU':>10}{'대기':>10}",
+        ]
+        for cat, (wall, cpu) in sorted(by_cat.items(), key=lambda kv: -kv[1][0]):
+            wait = f"{wall - cpu:>9.2f}s" if has_cpu else f"{'-':>10}"
+            lines.append(f"{cat:<10}{wall:>9.2f}s{cpu:>9.2f}s{wait}")
+
+        for title, key in (("CPU", lambda kv: -kv[1][1]), ("대기", lambda kv: -(kv[1][0] - kv[1][1]))):
+            if not has_cpu:
+                break
+            lines += ["", f"상위 {top} 함수 ({title}, 잎 프레임 기준)"]
+            for func, (wall, cpu) in sorted(by_func.items(), key=key)[:top]:
+                value = cpu if title == "CPU" else wall - cpu
+                if value * 1000 < 1:
+                    break
+                lines.append(f"{value:>9.3f}s  {func}")
+        if not has_cpu:
+            lines += ["", f"상위 {top} 함수 (벽시계, 잎 프레임 기준)"]
+            for func, (wall, _) in sorted(by_func.items(), key=lambda kv: -kv[1][0])[:top]:
+                lines.append(f"{wall:>9.3f}s  {func}")
+        return "\n".join(lines) + "\n"
+
+
+# =========================
+# 봇 연결
+# =========================
+def _finish(name):
+    _active.stop()
+    base = _active.write(name)
+    print(f"[PROFILE] {base}.txt / .wall.collapsed / .cpu.collapsed")
+
+
+def profile_if_requested(name=None, force=False):
+    """--profile 인자 (또는 PROFILE=1) 가 있으면 프로세스 끝날 때까지 샘플링 → 종료 시 저장
+
+    --profile 은 sys.argv 에서 빼므로 각 봇의 인자 처리에는 영향 없음
+    """
+    global _active
+    requested = force or "--profile" in sys.argv or os.environ.get("PROFILE", "") not in ("", "0", "false")
+    while "--profile" in sys.argv:
+        sys.argv.remove("--profile")
+    if not requested or _active is not None:
+        return _active
+    name = name or os.path.splitext(os.path.basename(sys.argv[0] or "interactive"))[0]
+    _active = SamplingProfiler().start()
+    atexit.register(_finish, name)
+    return _active
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("사용법: python Profiler.py <스크립트.py> [인자 ...]")
+        sys.exit(1)
+    script = sys.argv[1]
+    sys.argv = sys.argv[1:]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    # 스크립트가 import 하는 Profiler 와 같은 모듈 상태를 쓰도록 (__main__ 사본이 아닌 모듈로 시작)
+    import Profiler
+    Profiler.profile_if_requested(os.path.splitext(os.path.basename(script))[0], force=True)
+    runpy.run_path(script, run_name="__main__")
@@ -0,0 +1,132 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from Perf_Metrics import timed
+from Price_Guard import REQUEST_TIMEOUT, SourceUnavailable, fetch_with_breaker
+from FX_Service import FXService
+
+# =========================
+# 공용 시세 클라이언트 (커넥션 풀 + TTL 캐시)
+# =========================
+# 로컬 테스트 시 주소를 바꿔서 대체 서버(Local_Stub_Server.py)로 연결
+NAVER_BASE_URL = os.environ.get("NAVER_BASE_URL", "https://finance.naver.com")
+YAHOO_BASE_URL = os.environ.get("YAHOO_BASE_URL", "https://query1.finance.yahoo.com")
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+DEFAULT_TTL = 30  # 초
+
+
+def is_krx_code(symbol):
+    # 국내 종목코드는 6자리 (005930, 0072R0 등), 나머지는 해외 티커
+    return len(symbol) == 6 and symbol[0].isdigit()
+
+
+class QuoteClient:
+    """Naver / Yahoo 시세 조회. 같은 종목은 TTL 동안 캐시에서 응답"""
+
+    def __init__(self, ttl=DEFAULT_TTL, pool_size=16, timeout=REQUEST_TIMEOUT):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=pool_size)
+        self._cache = {}
+        self._lock = threading.Lock()
+        # 환율은 같은 세션으로 FX_Service 경유 (파일 캐시 / 기록 공유)
+        self.fx = FXService(session=self.session, ttl=ttl)
+
+    # -------------------------
+    # 캐시
+    # -------------------------
+    def cached(self, key, max_age=None):
+        """TTL 이내의 캐시 값 (없으면 None)"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry and time.time() - entry[1] < max_age:
+            return entry[0]
+        return None
+
+    def _store(self, key, value):
+        with self._lock:
+            self._cache[key] = (value, time.time())
+        return value
+
+    # -------------------------
+    # 원본 조회
+    # -------------------------
+    def fetch_kr_price(self, code):
+        url = f"{NAVER_BASE_URL}/item/main.naver?code={code}"
+        with timed("fetch", f"naver:{code}") as m:
+            res = self.session.get(url, timeout=self.timeout)
+            m.add_bytes(len(res.content))
+            res.raise_for_status()
+        with timed("parse", f"naver:{code}"):
+            soup = BeautifulSoup(res.text, "html.parser")
+            price = soup.select_one("p.no_today span.blind")
+            if not price:
+                raise ValueError(f"현재가 조회 실패: {code}")
+        return int(price.text.replace(",", ""))
+
+    def fetch_yahoo_price(self, ticker):
+        url = f"{YAHOO_BASE_URL}/v8/finance/chart/{ticker}"
+        with timed("fetch", f"yahoo:{ticker}") as m:
+            r = self.session.get(url, timeout=self.timeout)
+            m.add_bytes(len(r.content))
+            r.raise_for_status()
+        return r.json()["chart"]["result"][0]["meta"]["regularMarketPrice"]
+
+    # -------------------------
+    # 캐시 경유 조회
+    # -------------------------
+    def _fetch(self, symbol, source, fetch):
+        """소스 차단기를 거쳐 조회. 실패하면 TTL 이 지난 캐시 값이라도 사용"""
+        try:
+            return self._store(symbol, fetch_with_breaker(source, fetch, symbol, deadline=None))
+        except Exception as e:
+            with self._lock:
+                entry = self._cache.get(symbol)
+            if entry is None:
+                raise
+            print(f"[WARN] {symbol} 조회 실패 ({e}) → 이전 값 사용")
+            return entry[0]
+
+    def price(self, symbol, max_age=None):
+        """국내 코드는 원화, 해외 티커는 현지 통화 가격"""
+        value = self.cached(symbol, max_age)
+        if value is not None:
+            return value
+        if is_krx_code(symbol):
+            return self._fetch(symbol, "naver", self.fetch_kr_price)
+        return self._fetch(symbol, "yahoo", self.fetch_yahoo_price)
+
+    def usdkrw(self, max_age=None):
+        value = self.fx.rate("USD/KRW", max_age)
+        if value is None:
+            raise SourceUnavailable("환율 조회 실패: USD/KRW")
+        return value
+
+    def prices(self, symbols, max_age=None):
+        """여러 종목 동시 조회 → {종목: 가격}. 실패한 종목은 결과에서 빠짐"""
+        symbols = list(dict.fromkeys(symbols))
+        futures = {s: self.pool.submit(self.price, s, max_age) for s in symbols}
+        result = {}
+        for s, f in futures.items():
+            try:
+                result[s] = f.result()
+            except Exception as e:
+                print(f"[WARN] 시세 조회 실패: {s} ({e})")
+        return result
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+        self.session.close()
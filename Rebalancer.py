@@ -0,0 +1,111 @@
+import os
+import json
+
+import numpy as np
+
+from Share_Allocator import allocate
+
+# =========================
+# 계좌별 리밸런싱 제안
+# =========================
+# 목표 비중은 rebalance_targets.json 에서 읽음
+#   {"IRP": {"weights": {"360750": 40, ...}, "cash": 0, "band": 1.0, "lots": {"360750": 1}}}
+#   weights: 목표 비중 (합이 100이 아니어도 비율로 처리, 0이면 전량 매도)
+#   cash   : 계좌 예수금 (매수에 쓸 수 있는 현금)
+#   band   : 허용 오차 (%p). 이 안쪽 종목은 거래하지 않음 → 거래 횟수 최소화
+#   lots   : 종목별 거래 단위 (기본 1주)
+# 목표에 없는 보유 종목은 리밸런싱 대상에서 제외하고 그대로 둠
+TARGETS_FILE = "rebalance_targets.json"
+DEFAULT_BAND = 1.0
+
+
+def load_targets(path=TARGETS_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def rebalance(prices, qty, weights, cash=0.0, band=DEFAULT_BAND, lots=None):
+    """
+    목표 비중으로 되돌리는 정수 거래 수량
+    반환: (거래 수량 배열 (+매수 / -매도), 거래 후 현금, 현재 비중 %, 거래 후 비중 %)
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    qty = np.asarray(qty, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    lots = np.ones(len(prices), dtype=np.int64) if lots is None else np.asarray(lots, dtype=np.int64)
+
+    total = float(qty @ prices) + cash
+    target = weights / weights.sum()
+    before = qty * prices / total * 100
+    drift = before - target * 100
+
+    # 허용 오차를 벗어난 종목만 계좌 전체 기준 목표금액(target × total)으로 되돌리고 나머지는 현재 수량 유지
+    # 목표금액과 쓸 수 있는 금액(계좌 - 유지 종목)의 차이는 현금으로 남김
+    move = np.abs(drift) > band
+    if not move.any():
+        return np.zeros(len(prices), dtype=np.int64), cash, before, before
+
+    available = total - float(qty[~move] @ prices[~move])
+    budget = min(available, float(target[move].sum()) * total)
+    new_qty = qty.copy()
+    if budget > 0:
+        units, _ = allocate(budget, prices[move] * lots[move], target[move])
+        new_qty[move] = units * lots[move]
+    else:
+        new_qty[move] = 0
+    left = available - float(new_qty[move] @ prices[move])
+
+    trades = new_qty - qty
+    return trades, left, before, new_qty * prices / total * 100
+
+
+def suggest(holdings, prices, targets=None):
+    """
+    holdings: [{"account", "name", "code", "qty"}] / prices: {코드: 현재가}
+    반환: {계좌: [(이름, 거래 수량, 현재 비중, 거래 후 비중)]} (목표가 있는 계좌만)
+    """
+    targets = load_targets() if targets is None else targets
+    result = {}
+    for acc, conf in targets.items():
+        codes = list(conf["weights"])
+        if any(c not in prices for c in codes):
+            continue  # 시세가 빠진 계좌는 제안하지 않음
+
+        held = {}
+        names = {}
+        for h in holdings:
+            if h["account"] == acc:
+                held[h["code"]] = held.get(h["code"], 0) + h["qty"]
+                names[h["code"]] = h["name"]
+
+        trades, _, before, after = rebalance(
+            [prices[c] for c in codes],
+            [held.get(c, 0) for c in codes],
+            [conf["weights"][c] for c in codes],
+            cash=conf.get("cash", 0),
+            band=conf.get("band", DEFAULT_BAND),
+            lots=[conf.get("lots", {}).get(c, 1) for c in codes],
+        )
+        result[acc] = [
+            (names.get(c, c), int(t), float(b), float(a))
+            for c, t, b, a in zip(codes, trades, before, after)
+            if t
+        ]
+    return result
+
+
+def render_actions(suggestions):
+    """제안 → 리포트 하단에 붙일 줄 목록"""
+    if not suggestions:
+        return []
+    lines = ["", "🔁 리밸런싱 제안"]
+    for acc, actions in suggestions.items():
+        if not actions:
+            lines.append(f"• {acc}: 목표 비중 이내")
+            continue
+        for name, trade, before, after in actions:
+            side = "매수" if trade > 0 else "매도"
+            lines.append(f"• {acc} {name}: {side} {abs(trade)}주 ({before:.1f}% → {after:.1f}%)")
+    return lines
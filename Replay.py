@@ -0,0 +1,333 @@
+import os
+import sys
+import json
+import time
+import shutil
+import bisect
+import tempfile
+import importlib
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# =========================
+# 오프라인 재생 (기록된 시세로 리포트 여러 날 연속 실행)
+# =========================
+# 실행: python Replay.py [리포트 ...] [--from=YYYY-MM-DD] [--to=YYYY-MM-DD] [--days=N]
+#                        [--dataset=파일.json] [--out=폴더] [--no-charts] [--save-photos]
+#   리포트   : jonghak woorisaju pension three_women index (생략 시 전체)
+#   --dataset: {"YYYY-MM-DD": {"종목": 종가}} — 없으면 data/history, data/ohlc 기록 사용
+#   --out    : 재생용 작업 폴더 (기본 임시 폴더). 스냅샷 / 거래일 상태 / 그래프는 여기에만 씀
+#   --no-charts: 그래프 생략 (리포트 본문만 최대 속도로)
+# 네이버 / 야후 / 텔레그램 요청 없음. 보낸 메시지는 <out>/messages.jsonl
+# 각 리포트의 시세 조회 / 전송 / 시계 / 장 달력만 바꿔 끼우고 run_report / main 은 그대로 실행
+KST = ZoneInfo("Asia/Seoul")
+
+REPORTS = {
+    # 이름: (모듈, 진입 함수, 실행 시각 기준 시장)
+    "jonghak": ("Jonghak_ETF_Telegram", "run_report", "KRX"),
+    "woorisaju": ("Woorisaju", "run_report", "KRX"),
+    "pension": ("Pension_ETF_Telegram", "run_report", "KRX"),
+    "three_women": ("Three_Women_ETF", "run_report", "US"),
+    "index": ("Index", "main", "KRX"),
+}
+RUN_DELAY = timedelta(minutes=10)   # 장 마감 후 실행 시각
+
+
+def option(name, default=None):
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return default
+
+
+# =========================
+# 시계 (datetime.now 대체)
+# =========================
+class ReplayClock(datetime):
+    current = None   # 시간대 포함 시각
+
+    @classmethod
+    def now(cls, tz=None):
+        if tz is not None:
+            return cls.current.astimezone(tz)
+        return cls.current.astimezone(KST).replace(tzinfo=None)
+
+
+@contextmanager
+def patched(module, **attrs):
+    saved = {k: getattr(module, k) for k in attrs}
+    for k, v in attrs.items():
+        setattr(module, k, v)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(module, k, v)
+
+
+# =========================
+# 기록된 시세
+# =========================
+class Feed:
+    """{종목: {날짜: 종가}} + 지수용 일봉. 날짜는 YYYY-MM-DD 문자열"""
+
+    def __init__(self, symbols, ohlc_symbols=(), dataset=None):
+        from Price_History import load_history
+        from OHLC_Cache import load_ohlc
+
+        self.closes = {s: load_history(s) for s in symbols}
+        self.ohlc = {s: load_ohlc(s) for s in ohlc_symbols}
+        if dataset:
+            with open(dataset, "r", encoding="utf-8") as f:
+                for day, row in json.load(f).items():
+                    for s, close in row.items():
+                        self.closes.setdefault(s, {})[day] = close
+                        if s in self.ohlc:
+                            self.ohlc[s][day] = (close, close, close, close)
+        self.ohlc_days = {s: sorted(rows) for s, rows in self.ohlc.items()}
+        self.day = None
+
+    def days(self, symbols):
+        return sorted({d for s in symbols for d in self.closes.get(s, ())} |
+                      {d for s in symbols for d in self.ohlc.get(s, ())})
+
+    def price(self, symbol):
+        return self.closes.get(symbol, {}).get(self.day)
+
+    def prices(self, symbols):
+        return {s: self.closes[s][self.day] for s in symbols if self.day in self.closes.get(s, {})}
+
+    def change(self, symbol):
+        """→ (당일 종가, 직전 기록 대비 %)"""
+        closes = self.closes.get(symbol, {})
+        days = sorted(d for d in closes if d <= self.day)
+        if not days or days[-1] != self.day:
+            return None, None
+        if len(days) < 2:
+            return closes[self.day], None
+        prev = closes[days[-2]]
+        return closes[self.day], round((closes[self.day] - prev) / prev * 100, 2)
+
+    def ohlc_until(self, symbol):
+        """실제 캐시처럼 보관 구간(history_start ~ 당일)만"""
+        from OHLC_Cache import history_start
+
+        days = self.ohlc_days.get(symbol, [])
+        lo = bisect.bisect_left(days, history_start(date.fromisoformat(self.day)).isoformat())
+        hi = bisect.bisect_right(days, self.day)
+        rows = self.ohlc[symbol]
+        return {d: rows[d] for d in days[lo:hi]}
+
+
+# =========================
+# 전송 대체 (로컬 기록)
+# =========================
+class Sink:
+    def __init__(self, out_dir, save_photos=False):
+        self.out_dir = out_dir
+        self.save_photos = save_photos
+        self.file = open(os.path.join(out_dir, "messages.jsonl"), "w", encoding="utf-8")
+        self.count = 0
+        self.report = self.day = None
+
+    def text(self, text):
+        self.count += 1
+        self.file.write(json.dumps({"report": self.report, "day": self.day, "kind": "text", "text": text},
+                                   ensure_ascii=False) + "\n")
+
+    def photo(self, photo, caption=""):
+        self.count += 1
+        if isinstance(photo, str):
+            with open(photo, "rb") as f:
+                data = f.read()
+        else:
+            data = photo if isinstance(photo, bytes) else photo.read()
+        path = None
+        if self.save_photos:
+            path = os.path.join(self.out_dir, "photos", f"{self.report}_{self.day}.png")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        self.file.write(json.dumps({"report": self.report, "day": self.day, "kind": "photo",
+                                    "caption": caption, "bytes": len(data), "path": path},
+                                   ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+# =========================
+# 리포트별 바꿔 끼울 함수
+# =========================
+def fail_missing(symbol, value):
+    from Price_Guard import SourceUnavailable
+
+    if value is None:
+        raise SourceUnavailable(f"재생 데이터 없음: {symbol}")
+    return value, None
+
+
+def overrides(name, module, feed, sink, charts):
+    """→ [(모듈, {속성: 값})]"""
+    import Market_Calendar
+
+    common = [(Market_Calendar, {"datetime": ReplayClock}), (module, {"datetime": ReplayClock})]
+    if name in ("jonghak", "woorisaju"):
+        codes = [p["code"] for p in module.portfolio]
+        return common + [(module, {
+            "fetch_prices": lambda: (feed.prices(codes), {}),
+            "send_telegram": sink.text,
+            "record_closes": lambda *a: None,
+        })]
+    if name == "pension":
+        codes = [p["code"] for p in module.portfolio]
+        attrs = {
+            "fetch_prices": lambda: (feed.prices(codes), {}),
+            "send_msg": sink.text,
+            "send_photo": lambda path, caption: sink.photo(path, caption),
+            "record_closes": lambda *a: None,
+        }
+        if not charts:
+            attrs.update(render_chart=lambda *a: None, render_history_chart=lambda *a: None,
+                         send_photo=lambda *a: None)
+        return common + [(module, attrs)]
+    if name == "three_women":
+        attrs = {
+            "get_price": lambda ticker: fail_missing(ticker, feed.price(ticker)),
+            "get_fx": lambda currency="USD": fail_missing(f"{currency}/KRW", feed.price("KRW=X")),
+            "send_msg": sink.text,
+            "send_photo": lambda path, caption: sink.photo(path, caption),
+            "record_closes": lambda *a: None,
+        }
+        if not charts:
+            attrs.update(render_chart=lambda *a: None, send_photo=lambda *a: None)
+        return common + [(module, attrs)]
+    if name == "index":
+        def send(text, photo=None):
+            sink.text(text)
+            if photo is not None:
+                sink.photo(photo)
+        attrs = {
+            "get_ohlc": lambda symbol, today=None, max_age=0: feed.ohlc_until(symbol),
+            "get_fx": lambda pair="USD/KRW": feed.change("KRW=X"),
+            "send_telegram": send,
+        }
+        if not charts:
+            attrs["create_chart"] = lambda *a: None
+        return common + [(module, attrs)]
+    raise ValueError(f"알 수 없는 리포트: {name}")
+
+
+def report_symbols(name, module):
+    """→ (종가 종목, 일봉 종목)"""
+    if name == "three_women":
+        return [p["ticker"] for p in module.portfolio] + ["KRW=X"], []
+    if name == "index":
+        tickers = list(module.DASHBOARD_TICKERS.values())
+        return ["KRW=X"], tickers
+    return [p["code"] for p in module.portfolio], []
+
+
+def run_clock(market, day):
+    """해당 거래일 장 마감 직후 (휴장일이면 None)"""
+    from Market_Calendar import session
+
+    hours = session(market, day)
+    return hours[1] + RUN_DELAY if hours else None
+
+
+# =========================
+# 실행
+# =========================
+def replay(names, start=None, end=None, last_days=None, dataset=None, out_dir=None,
+           charts=True, save_photos=False):
+    os.environ.setdefault("BOT_TOKEN", "replay")
+    os.environ.setdefault("CHAT_ID", "0")
+    modules = {n: importlib.import_module(REPORTS[n][0]) for n in names}
+
+    symbols, ohlc_symbols = set(), set()
+    for n, m in modules.items():
+        s, o = report_symbols(n, m)
+        symbols.update(s)
+        ohlc_symbols.update(o)
+    feed = Feed(sorted(symbols), sorted(ohlc_symbols), dataset)
+
+    plans = {}
+    for n, m in modules.items():
+        s, o = report_symbols(n, m)
+        days = [d for d in feed.days(s if n != "index" else o)
+                if (not start or d >= start) and (not end or d <= end)]
+        plans[n] = days[-last_days:] if last_days else days
+
+    out_dir = out_dir or tempfile.mkdtemp(prefix="replay_")
+    os.makedirs(os.path.join(out_dir, "data"), exist_ok=True)
+    if os.path.exists("rebalance_targets.json"):
+        shutil.copy("rebalance_targets.json", out_dir)
+    sink = Sink(os.path.abspath(out_dir), save_photos)
+
+    # 날짜순으로 모든 리포트를 섞어 실행 (실제 하루 흐름과 같은 순서)
+    runs = [(run_clock(REPORTS[n][2], date.fromisoformat(d)), n, d) for n, days in plans.items() for d in days]
+    runs = sorted(r for r in runs if r[0] is not None)
+
+    cwd = os.getcwd()
+    os.chdir(out_dir)
+    stats = {n: {"runs": 0, "errors": 0, "seconds": 0.0} for n in names}
+    started = time.perf_counter()
+    try:
+        for clock, n, day in runs:
+            module = modules[n]
+            ReplayClock.current = clock
+            feed.day = sink.day = day
+            sink.report = n
+            t = time.perf_counter()
+            with _apply(overrides(n, module, feed, sink, charts)):
+                try:
+                    getattr(module, REPORTS[n][1])()
+                except Exception as e:
+                    stats[n]["errors"] += 1
+                    print(f"[{n} {day}] 실패: {e}")
+            stats[n]["runs"] += 1
+            stats[n]["seconds"] += time.perf_counter() - t
+    finally:
+        from Perf_Metrics import flush
+        flush()   # 계측 기록도 재생 폴더에
+        os.chdir(cwd)
+        sink.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"재생 완료: {len(runs)}회 / 메시지 {sink.count}건 / {elapsed:.2f}초 → {out_dir}")
+    for n, s in stats.items():
+        if s["runs"]:
+            print(f"  {n}: {s['runs']}회, 실패 {s['errors']}회, 평균 {s['seconds'] / s['runs'] * 1000:.1f}ms")
+    return out_dir, stats
+
+
+@contextmanager
+def _apply(pairs):
+    if not pairs:
+        yield
+        return
+    (module, attrs), rest = pairs[0], pairs[1:]
+    with patched(module, **attrs), _apply(rest):
+        yield
+
+
+if __name__ == "__main__":
+    names = [a for a in sys.argv[1:] if not a.startswith("--")] or list(REPORTS)
+    unknown = [n for n in names if n not in REPORTS]
+    if unknown:
+        print(f"알 수 없는 리포트: {', '.join(unknown)} (가능: {', '.join(REPORTS)})")
+        sys.exit(1)
+    days = option("days")
+    replay(
+        names,
+        start=option("from"),
+        end=option("to"),
+        last_days=int(days) if days else None,
+        dataset=option("dataset"),
+        out_dir=option("out"),
+        charts="--no-charts" not in sys.argv,
+        save_photos="--save-photos" in sys.argv,
+    )
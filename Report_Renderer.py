@@ -0,0 +1,124 @@
+import html
+from operator import attrgetter
+from string import Formatter
+
+from Core_Model import Valuation
+
+# =========================
+# 리포트 렌더러 (템플릿은 import 시 한 번만 조립)
+# =========================
+# 사용법
+#   HOLDING = compile_template("■ {name}", [
+#       ("현재가", "{price:,}원"),
+#       ("수익률", "{rate:+.2f}% {rate_arrow}"),
+#   ])
+#   lines += render_blocks(HOLDING, rows, separator="- - - - -")
+#   text = "\n".join(lines)        # 마지막에 한 번만 join
+#
+# mode="html" 이면 제목을 <b>로 감싸고 문자열 값은 HTML 이스케이프
+# (텔레그램 전송 시 parse_mode="HTML")
+#
+# 템플릿마다 포맷 문자열이 참조하는 필드만 골라 위치 인자 포맷("{0:,}원")으로 바꿔 둠
+# → 행마다 attrgetter 한 번 + str.format 한 번 (values() dict 를 만들지 않음)
+# Valuation 속성이 아닌 필드가 있으면 values() + format_map 으로 처리
+
+# =========================
+# 데이터 모델 (종목 / 계좌 요약 / 전체 요약 공통) → Core_Model.Valuation
+# =========================
+Row = Valuation
+
+
+# =========================
+# 템플릿
+# =========================
+# Valuation 속성으로 바로 읽는 필드 (values() 의 키와 같음)
+ROW_FIELDS = (
+    "name", "price", "now", "cost", "profit", "rate", "delta", "weight",
+    "rate_arrow", "profit_arrow", "delta_arrow",
+)
+# html 모드에서 이스케이프할 필드 (나머지는 숫자 / 화살표)
+TEXT_FIELDS = ("name",)
+
+
+def _positional(fmt):
+    """'{name} {rate:+.2f}%' → ('{0} {1:+.2f}%', ('name', 'rate')). Valuation 속성이 아닌 필드가 있으면 None"""
+    out = []
+    fields = []
+    for literal, field, spec, conv in Formatter().parse(fmt):
+        out.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field not in ROW_FIELDS:
+            return None
+        if field not in fields:
+            fields.append(field)
+        out.append("{" + str(fields.index(field)) + (f"!{conv}" if conv else "") + (f":{spec}" if spec else "") + "}")
+    return "".join(out), tuple(fields)
+
+
+class Template:
+    """제목 + '라벨: 값' 줄 + 꼬리말로 된 블록. text / html 포맷 문자열을 미리 만들어 둠"""
+
+    def __init__(self, title, fields, footer=None):
+        body = [f"{label}: {fmt}" for label, fmt in fields]
+        tail = [footer] if footer is not None else []
+        text = "\n".join(([title] if title else []) + body + tail)
+        markup = "\n".join(([f"<b>{title}</b>"] if title else []) + body + tail)
+        self._text = text.format_map
+        self._html = markup.format_map
+        compiled = _positional(text)
+        if compiled is None:
+            self._get = None
+        else:
+            self._text_pos, names = compiled
+            self._html_pos = _positional(markup)[0]
+            getter = attrgetter(*names)
+            # 필드가 하나면 attrgetter 가 튜플이 아닌 값 하나를 돌려줌
+            self._get = getter if len(names) > 1 else (lambda row: (getter(row),))
+            self._escape = [i for i, name in enumerate(names) if name in TEXT_FIELDS]
+
+    def render(self, values, mode="text"):
+        """값 dict 로 렌더 (행 객체는 render_row)"""
+        if mode == "html":
+            return self._html({k: html.escape(v) if isinstance(v, str) else v for k, v in values.items()})
+        return self._text(values)
+
+    def _html_row(self, row):
+        values = list(self._get(row))
+        for i in self._escape:
+            if isinstance(values[i], str):
+                values[i] = html.escape(values[i])
+        return self._html_pos.format(*values)
+
+    def render_row(self, row, mode="text"):
+        if self._get is None:
+            return self.render(row.values(), mode)
+        if mode == "html":
+            return self._html_row(row)
+        return self._text_pos.format(*self._get(row))
+
+    def render_rows(self, rows, separator=None, mode="text"):
+        if self._get is None or mode == "html":
+            render = lambda row: self.render_row(row, mode)
+        else:
+            fmt, get = self._text_pos.format, self._get
+            render = lambda row: fmt(*get(row))
+        out = []
+        for row in rows:
+            out.append(render(row))
+            if separator is not None:
+                out.append(separator)
+        return out
+
+
+def compile_template(title, fields, footer=None):
+    return Template(title, fields, footer)
+
+
+def render_block(template, row, mode="text"):
+    return template.render_row(row, mode)
+
+
+def render_blocks(template, rows, separator=None, mode="text"):
+    """행 목록 → 출력 줄 목록 (블록 뒤마다 구분선)"""
+    return template.render_rows(rows, separator, mode)
@@ -0,0 +1,244 @@
+import os
+import sys
+import json
+from datetime import datetime
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from Perf_Metrics import timed, with_perf_footer
+from Price_History import load_history
+from Quote_Client import is_krx_code
+
+# =========================
+# 주간 리스크 리포트 (변동성 / 최대 낙폭 / 상관관계 / VaR)
+# =========================
+# 실행: python Risk_Analytics.py [--dry-run]
+# data/history 에 쌓인 일별 종가만 사용 → 네트워크 요청 없음 (텔레그램 전송 제외)
+# 같은 날 같은 기록이면 data/risk_cache.json 결과를 그대로 사용
+BOT_TOKEN = os.environ.get("BOT_TOKEN")
+CHAT_ID = os.environ.get("CHAT_ID")
+
+CACHE_FILE = "data/risk_cache.json"
+LOOKBACK = 250          # 거래일
+VOL_WINDOW = 20         # 이동 변동성 구간
+VAR_ALPHA = 0.05        # VaR 95%
+Z_95 = 1.6449
+TRADING_DAYS = 252
+FX_SYMBOL = "KRW=X"
+
+
+# =========================
+# 보유 현황 (계좌 → {종목: 수량})
+# =========================
+def load_accounts():
+    import Jonghak_ETF_Telegram as jonghak
+    import Pension_ETF_Telegram as pension
+    import Woorisaju as woorisaju
+    import Three_Women_ETF as three_women
+
+    accounts = {}
+    names = {}
+    for p in pension.portfolio:
+        acc = accounts.setdefault(p["account"], {})
+        acc[p["code"]] = acc.get(p["code"], 0) + p["qty"]
+        names[p["code"]] = p["name"]
+    for label, module in (("김종학", jonghak), ("우리사주", woorisaju)):
+        acc = accounts.setdefault(label, {})
+        for p in module.portfolio:
+            acc[p["code"]] = acc.get(p["code"], 0) + p["qty"]
+            names.setdefault(p["code"], p["name"])
+    women = accounts.setdefault("Three Women", {})
+    for p in three_women.portfolio:
+        women[p["ticker"]] = women.get(p["ticker"], 0) + p["qty"]
+        names.setdefault(p["ticker"], p["ticker"])
+    return accounts, names
+
+
+def held_symbols(accounts=None):
+    """기록이 필요한 종목 (해외 종목이 있으면 환율 포함)"""
+    if accounts is None:
+        accounts = load_accounts()[0]
+    symbols = sorted({s for acc in accounts.values() for s in acc})
+    if any(not is_krx_code(s) for s in symbols):
+        symbols.append(FX_SYMBOL)
+    return symbols
+
+
+# =========================
+# 가격 행렬
+# =========================
+def forward_fill(P):
+    """열별로 앞 값 채우기, 상장 전 구간은 첫 값으로 채움 (수익률 0)"""
+    T = P.shape[0]
+    valid = ~np.isnan(P)
+    idx = np.where(valid, np.arange(T)[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    P = P[idx, np.arange(P.shape[1])]
+    first = valid.argmax(axis=0)
+    lead = np.arange(T)[:, None] < first
+    return np.where(lead, P[first, np.arange(P.shape[1])], P)
+
+
+def price_matrix(symbols, lookback=LOOKBACK):
+    """→ (날짜 목록, 원화 환산 종가 행렬 T×N). 기록이 없는 종목은 빠짐"""
+    histories = {s: load_history(s) for s in symbols}
+    fx = histories.pop(FX_SYMBOL, None) or load_history(FX_SYMBOL)
+    symbols = [s for s in symbols if s != FX_SYMBOL and histories.get(s)]
+    dates = sorted(set().union(*(histories[s] for s in symbols)))[-(lookback + 1):]
+    if not symbols or len(dates) < VOL_WINDOW + 1:
+        return dates, symbols, None
+
+    P = np.array([[histories[s].get(d, np.nan) for s in symbols] for d in dates])
+    P = forward_fill(P)
+
+    foreign = np.array([not is_krx_code(s) for s in symbols])
+    if foreign.any():
+        rate = np.array([fx.get(d, np.nan) for d in dates])[:, None]
+        if np.isnan(rate).all():
+            raise ValueError("환율 기록 없음 (python Price_History.py --backfill)")
+        rate = forward_fill(rate)[:, 0]
+        P[:, foreign] *= rate[:, None]
+    return dates, symbols, P
+
+
+# =========================
+# 지표 계산 (전 종목 / 전 계좌 한 번에)
+# =========================
+def max_drawdown(V):
+    return (V / np.maximum.accumulate(V, axis=0) - 1).min(axis=0)
+
+
+def analyze(P, symbols, accounts, window=VOL_WINDOW, alpha=VAR_ALPHA):
+    R = np.diff(np.log(P), axis=0)                                   # (T-1, N)
+    rolling_vol = sliding_window_view(R, window, axis=0).std(axis=-1, ddof=1) * np.sqrt(TRADING_DAYS)
+    cov = np.cov(R, rowvar=False)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.nan_to_num(cov / np.outer(std, std))   # 가격 변동이 없던 종목은 0
+
+    acc_names = list(accounts)
+    Q = np.array([[accounts[a].get(s, 0) for s in symbols] for a in acc_names], dtype=float)  # (A, N)
+    V = P @ Q.T                                                      # (T, A)
+    value = V[-1]
+    W = Q * P[-1] / np.where(value, value, 1)[:, None]               # (A, N)
+    sigma = np.sqrt(np.einsum("an,nm,am->a", W, cov, W))
+    AR = np.diff(np.log(np.where(V > 0, V, np.nan)), axis=0)
+
+    return {
+        "symbols": {
+            s: {
+                "vol": float(rolling_vol[-1, i]),
+                "vol_avg": float(rolling_vol[:, i].mean()),
+                "mdd": float(m),
+            }
+            for i, (s, m) in enumerate(zip(symbols, max_drawdown(P)))
+        },
+        "accounts": {
+            a: {
+                "value": float(value[k]),
+                "vol": float(np.nanstd(AR[-window:, k], ddof=1) * np.sqrt(TRADING_DAYS)),
+                "mdd": float(max_drawdown(V[:, k])),
+                "var_param": float(Z_95 * sigma[k] * value[k]),
+                "var_hist": float(-np.nanquantile(AR[:, k], alpha) * value[k]),
+            }
+            for k, a in enumerate(acc_names)
+            if value[k] > 0
+        },
+        "corr": np.round(corr, 4).tolist(),
+        "order": symbols,
+    }
+
+
+def top_pairs(result, k=3):
+    corr = np.array(result["corr"])
+    i, j = np.triu_indices(len(corr), 1)
+    order = np.argsort(-corr[i, j])[:k]
+    return [(result["order"][i[o]], result["order"][j[o]], float(corr[i[o], j[o]])) for o in order]
+
+
+# =========================
+# 일별 캐시
+# =========================
+def load_cache():
+    if not os.path.exists(CACHE_FILE):
+        return {}
+    with open(CACHE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compute(accounts=None):
+    """오늘 같은 기록으로 계산한 결과가 있으면 재사용"""
+    if accounts is None:
+        accounts = load_accounts()[0]
+    symbols = held_symbols(accounts)
+    with timed("parse", "history"):
+        dates, symbols, P = price_matrix(symbols)
+    if P is None:
+        return None
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    signature = {"through": dates[-1], "symbols": symbols, "accounts": accounts}
+    cache = load_cache()
+    if cache.get("date") == today and cache.get("signature") == signature:
+        return cache["result"]
+
+    with timed("compute", "risk"):
+        result = analyze(P, symbols, accounts)
+    result["through"] = dates[-1]
+    result["days"] = len(dates)
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"date": today, "signature": signature, "result": result}, f, ensure_ascii=False)
+    return result
+
+
+# =========================
+# 리포트
+# =========================
+def render_report(result, names):
+    lines = [
+        "📉 주간 리스크 리포트",
+        f"🕒 기준일 {result['through']} (최근 {result['days']}거래일)",
+        "",
+    ]
+    for acc, r in result["accounts"].items():
+        lines += [
+            f"📂 [{acc}]",
+            f"평가금액: {r['value']:,.0f}원",
+            f"변동성(연환산, {VOL_WINDOW}일): {r['vol'] * 100:.1f}%",
+            f"최대 낙폭: {r['mdd'] * 100:.1f}%",
+            f"1일 VaR 95%: {r['var_param']:,.0f}원 (모수) / {r['var_hist']:,.0f}원 (과거)",
+            "- - - - -",
+        ]
+
+    lines.append("📊 종목별 변동성 / 최대 낙폭")
+    for s, r in sorted(result["symbols"].items(), key=lambda kv: -kv[1]["vol"]):
+        lines.append(f"• {names.get(s, s)}: {r['vol'] * 100:.1f}% (평균 {r['vol_avg'] * 100:.1f}%) / {r['mdd'] * 100:.1f}%")
+
+    lines += ["", "🔗 상관계수 높은 조합"]
+    for a, b, c in top_pairs(result):
+        lines.append(f"• {names.get(a, a)} ↔ {names.get(b, b)}: {c:.2f}")
+    return "\n".join(lines)
+
+
+def main():
+    accounts, names = load_accounts()
+    result = compute(accounts)
+    if result is None:
+        print("가격 기록이 부족합니다. python Price_History.py --backfill 먼저 실행")
+        return
+    text = with_perf_footer(render_report(result, names))
+    if "--dry-run" in sys.argv:
+        print(text)
+        return
+
+    from Telegram_Delivery import deliver_text
+    deliver_text(BOT_TOKEN, CHAT_ID, "risk", text)
+
+
+if __name__ == "__main__":
+    if "--dry-run" not in sys.argv and (not BOT_TOKEN or not CHAT_ID):
+        print("오류: BOT_TOKEN 또는 CHAT_ID 환경 변수가 설정되지 않았습니다.")
+        sys.exit(1)
+    main()
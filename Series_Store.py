@@ -0,0 +1,137 @@
+import os
+import csv
+import json
+from datetime import date
+
+import numpy as np
+
+# =========================
+# 일별 다중 시계열 (계좌별 평가금액 등) + 차트용 축약본
+# =========================
+# - 원본: data/history/<이름>.csv (날짜, 열, 값) → 추가만 하고 평소에는 읽지 않음
+# - 축약본: data/<이름>_series.json → 차트는 이것만 읽음
+#     points : LTTB 로 줄인 과거 점 (최대 MAX_POINTS)
+#     tail   : 마지막 축약 이후 추가된 원본 점
+#   tail 이 차서 전체가 MAX_POINTS 를 넘으면 points + tail 을 MAX_POINTS / 2 로 다시 줄임
+#   → 하루 실행 비용은 점 하나 추가, 기록이 몇 년이 되어도 그리는 점 수는 일정
+# - 열이 여러 개면 합계 기준으로 고른 점을 모든 열에 똑같이 적용 (누적 그래프용으로 날짜 정렬 유지)
+HISTORY_DIR = "data/history"
+MAX_POINTS = 400
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets → 남길 점의 인덱스 (처음 / 마지막 점 포함)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    edges = np.append(edges, n)
+    idx = np.empty(threshold, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        s, e, ne = edges[i], edges[i + 1], edges[i + 2]
+        avg_x = x[e:ne].mean()
+        avg_y = y[e:ne].mean()
+        area = np.abs((x[a] - avg_x) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (avg_y - y[a]))
+        a = s + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+class SeriesStore:
+    def __init__(self, name, max_points=MAX_POINTS):
+        self.name = name
+        self.max_points = max_points
+        self.raw_file = os.path.join(HISTORY_DIR, f"{name}.csv")
+        self.cache_file = f"data/{name}_series.json"
+        self.state = self._load()
+
+    # -------------------------
+    # 저장
+    # -------------------------
+    def _load(self):
+        if os.path.exists(self.cache_file):
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        if os.path.exists(self.raw_file):
+            return self.rebuild()
+        return {"columns": [], "points": [], "tail": []}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        with open(self.cache_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+
+    def rebuild(self):
+        """축약본이 없을 때만 원본 전체를 읽어 다시 만듦"""
+        rows = {}
+        columns = []
+        with open(self.raw_file, "r", encoding="utf-8", newline="") as f:
+            for day, col, value in csv.reader(f):
+                if col not in columns:
+                    columns.append(col)
+                rows.setdefault(day, {})[col] = float(value)   # 같은 날 다시 기록하면 마지막 값
+        points = [[day, *(rows[day].get(c, 0.0) for c in columns)] for day in sorted(rows)]
+        self.state = {"columns": columns, "points": self._downsample(points, self.max_points), "tail": []}
+        self._save()
+        return self.state
+
+    # -------------------------
+    # 추가 / 조회
+    # -------------------------
+    def _row(self, day, values):
+        for col in values:
+            if col not in self.state["columns"]:
+                self.state["columns"].append(col)
+                for p in self.state["points"] + self.state["tail"]:
+                    p.append(0.0)
+        return [day, *(float(values.get(c, 0.0)) for c in self.state["columns"])]
+
+    def _merge(self, row, values):
+        """같은 날 다시 기록 → 들어온 열만 바꾸고 나머지 열은 유지 (rebuild 와 같은 결과)"""
+        self._row(row[0], values)   # 새 열 추가
+        columns = self.state["columns"]
+        for col, value in values.items():
+            row[columns.index(col) + 1] = float(value)
+        return row
+
+    def append(self, day, values):
+        """day(YYYY-MM-DD) 의 {열: 값} 추가. 같은 날이면 마지막 점에 열별로 덮어씀"""
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        with open(self.raw_file, "a", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows([day, col, value] for col, value in values.items())
+
+        tail = self.state["tail"]
+        last = (tail or self.state["points"] or [[None]])[-1]
+        if last[0] == day:
+            self._merge(last, values)
+        else:
+            tail.append(self._row(day, values))
+        if len(self.state["points"]) + len(tail) > self.max_points:
+            self.state["points"] = self._downsample(self.state["points"] + tail, self.max_points // 2)
+            self.state["tail"] = []
+        self._save()
+
+    def series(self, live=None):
+        """→ (열 이름, 날짜 목록, 값 행렬 T×C). live=(날짜, {열: 값}) 이면 저장하지 않고 끝에 붙임"""
+        rows = self.state["points"] + self.state["tail"]
+        if live is not None:
+            day, values = live
+            if rows and rows[-1][0] == day:
+                rows = rows[:-1] + [self._merge(list(rows[-1]), values)]
+            else:
+                rows = rows + [self._row(day, values)]
+        dates = [date.fromisoformat(r[0]) for r in rows]
+        values = np.array([r[1:] for r in rows], dtype=np.float64).reshape(len(rows), len(self.state["columns"]))
+        return list(self.state["columns"]), dates, values
+
+    @staticmethod
+    def _downsample(rows, threshold):
+        if len(rows) <= threshold:
+            return rows
+        x = [date.fromisoformat(r[0]).toordinal() for r in rows]
+        total = [sum(r[1:]) for r in rows]
+        return [rows[i] for i in lttb(x, total, threshold)]
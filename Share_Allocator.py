@@ -0,0 +1,62 @@
+import numpy as np
+
+# =========================
+# 정수 주식수 배분 (바스켓 전체를 한 번에 계산)
+# =========================
+# 목적함수: 종목별 (목표금액 - 매수금액)^2 + 남은현금^2 최소화
+#  - 현금도 "목표 비중 0%인 자산"으로 보고 같은 기준으로 벌점을 줌
+#  - 1주 추가 매수 시 변화량 ΔJ = 2p² - 2p(d + c)
+#    (p: 주가, d: 해당 종목 부족분, c: 남은 현금)
+#  - ΔJ < 0 인 종목 중 가장 크게 줄어드는 종목을 1주씩 추가 (그리디)
+
+
+def naive_allocate(budget, prices, weights):
+    """기존 방식: 종목별 할당액 // 주가"""
+    prices = np.asarray(prices, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    targets = budget * weights / weights.sum()
+    qty = np.floor(targets / prices).astype(np.int64)
+    return qty, budget - float(qty @ prices)
+
+
+def allocate(budget, prices, weights, max_steps=None):
+    """
+    예산을 비중대로 배분하는 정수 수량 계산
+    반환: (수량 배열, 남은 현금)
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(prices) == 0:
+        return np.zeros(0, dtype=np.int64), float(budget)
+
+    targets = budget * weights / weights.sum()
+
+    # 1단계: 내림 배분 (기존 방식과 동일한 출발점)
+    qty = np.floor(targets / prices).astype(np.int64)
+    deficit = targets - qty * prices
+    cash = budget - float(qty @ prices)
+
+    # 2단계: 남은 현금을 1주씩 재배분
+    # 매 단계 최소 1주(최저가 이상)를 사므로 반복 횟수는 cash / 최저가 이하
+    if max_steps is None:
+        max_steps = int(cash // prices.min()) + 1
+
+    for _ in range(max_steps):
+        gain = prices * (deficit + cash) - prices * prices
+        gain[prices > cash] = -np.inf
+        i = int(gain.argmax())
+        if gain[i] <= 0:
+            break
+        qty[i] += 1
+        deficit[i] -= prices[i]
+        cash -= prices[i]
+
+    return qty, cash
+
+
+def weight_deviation(budget, prices, weights, qty):
+    """목표 비중 대비 실제 비중 차이 (퍼센트포인트, 종목별)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    actual = qty * prices / budget * 100
+    return actual - weights / weights.sum() * 100
@@ -0,0 +1,59 @@
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 로컬 실행 → 잠금 없이 원자적 쓰기만
+    fcntl = None
+
+# =========================
+# 공용 상태 파일 (여러 봇 동시 실행 대비)
+# =========================
+# - file_lock: <파일>.lock 에 배타 잠금 (같은 파일을 읽고-고치고-쓰는 구간 보호)
+# - write_atomic: 임시 파일에 쓴 뒤 교체 → 읽는 쪽이 반쯤 쓰인 파일을 보지 않음
+# - update_json: 잠금 안에서 최신 내용을 다시 읽어 고친 뒤 저장 → 다른 봇이 쓴 키를 덮어쓰지 않음
+
+
+@contextmanager
+def file_lock(path):
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_atomic(path, text, newline=None):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline=newline) as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_json(path, default=None):
+    if not os.path.exists(path):
+        return {} if default is None else default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update_json(path, update, indent=2):
+    """update(data) 로 제자리 수정 → 저장된 data 반환"""
+    with file_lock(path):
+        data = load_json(path)
+        update(data)
+        write_atomic(path, json.dumps(data, ensure_ascii=False, indent=indent))
+    return data
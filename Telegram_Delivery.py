@@ -0,0 +1,135 @@
+import os
+import re
+import json
+import hashlib
+
+import requests
+
+from Perf_Metrics import timed
+from State_File import update_json
+
+# =========================
+# 변경분만 반영하는 리포트 전송
+# =========================
+# REPORT_DELIVERY=edit 일 때
+#   - 내용이 그대로면 전송 생략
+#   - 숫자만 바뀌었으면 지난 메시지를 editMessageText / editMessageMedia 로 수정
+#   - 구성이 바뀌었으면 새 메시지 전송
+# 그 외(기본값 send)에는 지금처럼 매번 새 메시지 전송
+# CI 에서는 run.yml(ETF 봇) / Index.yml 이 edit 으로 실행 → STATE_FILE 은 run.yml 커밋 / setup-bots 캐시로 유지
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+REPORT_DELIVERY = os.environ.get("REPORT_DELIVERY", "send")
+STATE_FILE = "data/telegram_messages.json"
+
+TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}")
+NUMBER_RE = re.compile(r"[+-]?\d[\d,]*(?:\.\d+)?")
+ARROW_RE = re.compile("[🔺🔻➖⬆⬇]️?")
+
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_entry(key, entry):
+    # 다른 리포트가 동시에 저장해도 자기 항목만 갱신
+    update_json(STATE_FILE, lambda state: state.update({key: entry}))
+
+
+def digest(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_key(text):
+    """시각 표시를 뺀 본문 → 실제 내용이 바뀌었는지 비교용"""
+    return digest(TIMESTAMP_RE.sub("", text))
+
+
+def layout_key(text):
+    """숫자 / 화살표를 뺀 골격 → 숫자만 바뀌었는지 비교용"""
+    return digest(ARROW_RE.sub("", NUMBER_RE.sub("#", text)))
+
+
+def call_api(token, method, data, files=None):
+    url = f"{TELEGRAM_API_URL}/bot{token}/{method}"
+    with timed("send", f"telegram:{method}") as m:
+        res = requests.post(url, data=data, files=files, timeout=20)
+        body = res.request.body or b""
+        m.add_bytes(len(body.encode("utf-8") if isinstance(body, str) else body))
+    try:
+        body = res.json()
+    except ValueError:
+        return None
+    return body.get("result") if body.get("ok") else None
+
+
+def deliver_text(token, chat_id, report_type, text, **options):
+    """텍스트 리포트 전송 → 실제 동작 ("sent" | "edited" | "skipped")"""
+    payload = {"chat_id": chat_id, "text": text, **options}
+    if REPORT_DELIVERY != "edit":
+        call_api(token, "sendMessage", payload)
+        return "sent"
+
+    state = load_state()
+    key = f"{chat_id}:{report_type}"
+    prev = state.get(key)
+    entry = {"kind": "text", "content": content_key(text), "layout": layout_key(text)}
+
+    if prev and prev.get("kind") == "text" and prev["content"] == entry["content"]:
+        return "skipped"
+
+    action = "sent"
+    result = None
+    if prev and prev.get("kind") == "text" and prev["layout"] == entry["layout"]:
+        result = call_api(token, "editMessageText", {**payload, "message_id": prev["message_id"]})
+        if result:
+            action = "edited"
+    if result is None:
+        result = call_api(token, "sendMessage", payload)
+        action = "sent"
+
+    if result:
+        entry["message_id"] = result.get("message_id", prev and prev.get("message_id"))
+        save_entry(key, entry)
+    return action
+
+
+def deliver_photo(token, chat_id, report_type, photo, caption=""):
+    """이미지 리포트 전송 (photo: bytes 또는 파일 객체) → ("sent" | "edited" | "skipped")"""
+    data = photo if isinstance(photo, bytes) else photo.read()
+    if REPORT_DELIVERY != "edit":
+        call_api(token, "sendPhoto", {"chat_id": chat_id, "caption": caption}, files={"photo": data})
+        return "sent"
+
+    state = load_state()
+    key = f"{chat_id}:{report_type}"
+    prev = state.get(key)
+    entry = {"kind": "photo", "content": digest(data + caption.encode("utf-8"))}
+
+    if prev and prev.get("kind") == "photo" and prev["content"] == entry["content"]:
+        return "skipped"
+
+    action = "sent"
+    result = None
+    if prev and prev.get("kind") == "photo":
+        media = {"type": "photo", "media": "attach://photo", "caption": caption}
+        result = call_api(
+            token,
+            "editMessageMedia",
+            {"chat_id": chat_id, "message_id": prev["message_id"], "media": json.dumps(media, ensure_ascii=False)},
+            files={"photo": data},
+        )
+        if result:
+            action = "edited"
+    if result is None:
+        result = call_api(token, "sendPhoto", {"chat_id": chat_id, "caption": caption}, files={"photo": data})
+        action = "sent"
+
+    if result:
+        entry["message_id"] = result.get("message_id", prev and prev.get("message_id"))
+        save_entry(key, entry)
+    return action
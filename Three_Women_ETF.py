@@ -4,6 +4,13 @@ import os
 import json
 import matplotlib.pyplot as plt
 from matplotlib import font_manager, rc
+from Perf_Metrics import timed, with_perf_footer
+from Report_Renderer import compile_template, render_blocks
+from Core_Model import Portfolio, Quote
+from Market_Calendar import check_sessions, mark_reported
+from Price_Guard import REQUEST_TIMEOUT, guarded_price, stale_note
+from Price_History import record_closes
+from FX_Service import guarded_rate
 
 # =========================
 # 텔레그램 설정
@@ -26,26 +33,44 @@ if os.path.exists(font_path):
     plt.rcParams["axes.unicode_minus"] = False
 
 # =========================
-# 포트폴리오 (투자 원금 포함)
+# 포트폴리오 (투자 원금 포함, 원금은 원화 / 가격은 currency 통화 그대로)
 # =========================
 portfolio = [
-    {"name": "Hyunjoo", "ticker": "SPYM", "qty": 107, "principal": 6_731_607},
-    {"name": "Seohye",  "ticker": "SPYM", "qty": 77,  "principal": 5_581_502},
-    {"name": "Wooseon", "ticker": "SPYM", "qty": 72,  "principal": 4_927_559},
+    {"name": "Hyunjoo", "ticker": "SPYM", "qty": 107, "currency": "USD", "principal": 6_731_607},
+    {"name": "Seohye",  "ticker": "SPYM", "qty": 77,  "currency": "USD", "principal": 5_581_502},
+    {"name": "Wooseon", "ticker": "SPYM", "qty": 72,  "currency": "USD", "principal": 4_927_559},
 ]
 
+# =========================
+# 리포트 템플릿
+# =========================
+HOLDING_BLOCK = compile_template("■ {name} (SPYM)", [
+    ("현재가", "{price:,.0f}원"),
+    ("투자 원금", "{cost:,.0f}원"),
+    ("평가금액", "{now:,.0f}원"),
+    ("수익률", "{rate:+.2f}% {rate_arrow}"),
+    ("평가손익", "{profit:+,.0f}원"),
+    ("전일 대비", "{delta:+,.0f}원 {delta_arrow}"),
+])
+
 # =========================
 # 가격 / 환율 조회
 # =========================
-def get_price(ticker):
+def fetch_yahoo(ticker):
     url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+    with timed("fetch", f"yahoo:{ticker}") as m:
+        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=REQUEST_TIMEOUT)
+        m.add_bytes(len(r.content))
+        r.raise_for_status()
     return r.json()["chart"]["result"][0]["meta"]["regularMarketPrice"]
 
-def get_usdkrw():
-    url = "https://query1.finance.yahoo.com/v8/finance/chart/KRW=X"
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-    return r.json()["chart"]["result"][0]["meta"]["regularMarketPrice"]
+# 실패하면 마지막 조회값으로 대체 → (값, 저장 시각 또는 None)
+def get_price(ticker):
+    return guarded_price("yahoo", ticker, fetch_yahoo)
+
+# 환율은 FX_Service 공용 캐시 경유 (다른 봇이 방금 조회했으면 재사용)
+def get_fx(currency="USD"):
+    return guarded_rate(f"{currency}/KRW")
 
 # =========================
 # 스냅샷
@@ -63,10 +88,12 @@ def save_snapshot(data):
 # =========================
 # 텔레그램
 # =========================
+@timed("send", "telegram:sendMessage")
 def send_msg(text):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     requests.post(url, data={"chat_id": CHAT_ID, "text": text}, timeout=10)
 
+@timed("send", "telegram:sendPhoto")
 def send_photo(path, caption):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendPhoto"
     with open(path, "rb") as f:
@@ -81,11 +108,15 @@ def send_photo(path, caption):
 # 실행
 # =========================
 def run_report():
+    # 지난 실행 이후 미국 장이 열리지 않았으면 시세 조회 전에 종료
+    run, sessions = check_sessions("three_women", ["US"])
+    if not run:
+        return
+
     prev = load_snapshot()
-    today = {}
 
-    price = get_price("SPYM")
-    fx = get_usdkrw()
+    price, price_at = get_price("SPYM")
+    fx, fx_at = get_fx("USD")
 
     lines = [
         "👩‍👩‍👧 Three Women ETF 리포트",
@@ -93,41 +124,39 @@ def run_report():
         ""
     ]
 
-    names, values = [], []
-
-    for p in portfolio:
-        now_amt = p["qty"] * price * fx
-        prev_amt = prev.get(p["name"], now_amt)
+    # 같은 종목을 여러 명이 보유 → 스냅샷은 사람별
+    book = Portfolio.from_records(portfolio, key=lambda h: h.name)
+    rates = {"USD": fx}
+    for h in book:
+        if h.currency not in rates:
+            rates[h.currency] = get_fx(h.currency)[0]
+    book.mark({"SPYM": Quote("SPYM", price, price_at)}, prev, fx=rates)
 
-        principal = p["principal"]
-        profit = now_amt - principal
-        rate = profit / principal * 100
-        delta = now_amt - prev_amt
-
-        rate_emoji = "🔺" if rate > 0 else "🔻" if rate < 0 else "➖"
-        delta_emoji = "🔺" if delta > 0 else "🔻" if delta < 0 else "➖"
-
-        today[p["name"]] = now_amt
-        names.append(p["name"])
-        values.append(now_amt)
-
-        lines.append(
-            f"■ {p['name']} (SPYM)\n"
-            f"현재가: {(price * fx):,.0f}원\n"
-            f"투자 원금: {principal:,.0f}원\n"
-            f"평가금액: {now_amt:,.0f}원\n"
-            f"수익률: {rate:+.2f}% {rate_emoji}\n"
-            f"평가손익: {profit:+,.0f}원\n"
-            f"전일 대비: {delta:+,.0f}원 {delta_emoji}"
-        )
-        lines.append("- - - - -")
+    today = book.snapshot(prev)
+    names = [h.name for h in book]
+    values = book.now.tolist()
+    rows = [book.valuation(i) for i in range(len(book))]
 
+    lines += render_blocks(HOLDING_BLOCK, rows, separator="- - - - -")
     lines.append(f"💱 USD/KRW 환율: {fx:,.2f}원")
-    send_msg("\n".join(lines))
+    lines += stale_note({k: at for k, at in (("SPYM", price_at), ("USD/KRW", fx_at)) if at})
+    send_msg(with_perf_footer("\n".join(lines)))
 
     # =========================
     # 그래프
     # =========================
+    render_chart(names, values)
+    send_photo(GRAPH_FILE, "📊 Three Women ETF Total Value")
+
+    # 새 거래일일 때만 스냅샷 갱신 (전일 대비 기준 = 직전 거래일 종가)
+    if sessions:
+        save_snapshot(today)
+        mark_reported("three_women", sessions)
+        # 리스크 분석용 일별 종가 (지연 시세 제외)
+        record_closes({"SPYM": None if price_at else price, "KRW=X": None if fx_at else fx}, sessions["US"])
+
+@timed("render", "three_women_etf")
+def render_chart(names, values):
     plt.figure(figsize=(6, 4))
     bars = plt.bar(names, values)
     plt.title("Total Value")
@@ -146,8 +175,5 @@ def run_report():
     plt.savefig(GRAPH_FILE)
     plt.close()
 
-    send_photo(GRAPH_FILE, "📊 Three Women ETF Total Value")
-    save_snapshot(today)
-
 if __name__ == "__main__":
     run_report()
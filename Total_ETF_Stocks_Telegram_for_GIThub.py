@@ -3,7 +3,24 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 import time
 import os
-import matplotlib.pyplot as plt
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from Perf_Metrics import timed, with_perf_footer, record_elapsed, record_failure
+from Price_Guard import REQUEST_TIMEOUT, guarded_price, stale_note
+from FX_Service import guarded_rate
+from Core_Model import BOLD_ARROWS, Portfolio, arrow
+
+# =====================================================
+# 실행 구조 (리포트 4개를 겹쳐 실행)
+# =====================================================
+# - 시세 조회: 스레드 풀 (FETCH_WORKERS). 여러 리포트에 같은 종목이 있으면 한 번만 조회
+# - 차트: 프로세스 풀 (CHART_WORKERS) → matplotlib 이 GIL 을 잡고 있는 동안에도 다른 리포트 조회 / 전송 진행
+# - 전송: 리포트마다 본문이 준비되는 즉시 보내고, 차트는 렌더링이 끝나는 즉시 보냄
+#   → 전체 시간 ≈ 가장 느린 리포트 (리포트 간 메시지 순서는 준비된 순서)
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "8"))
+CHART_WORKERS = int(os.environ.get("CHART_WORKERS", "2"))
 
 # =====================================================
 # 텔레그램 설정
@@ -11,10 +28,12 @@ import matplotlib.pyplot as plt
 BOT_TOKEN = os.environ["BOT_TOKEN"]
 CHAT_ID = os.environ["CHAT_ID"]
 
+@timed("send", "telegram:sendMessage")
 def send_msg(text):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     requests.post(url, data={"chat_id": CHAT_ID, "text": text}, timeout=10)
 
+@timed("send", "telegram:sendPhoto")
 def send_photo(path, caption):
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendPhoto"
     with open(path, "rb") as f:
@@ -25,81 +44,152 @@ def send_photo(path, caption):
             timeout=20
         )
 
-# =====================================================
-# 공통 유틸
-# =====================================================
-def arrow(val):
-    if val > 0:
-        return "⬆️"
-    elif val < 0:
-        return "⬇️"
-    return "➖"
-
-def get_kr_price(code):
+# 조회 실패 시 마지막 조회값으로 대체 (지연 시세는 리포트별 stale 에 기록 후 하단 표시)
+# 대체값도 없으면 None → 해당 종목은 합계에서 제외
+def fetch_kr_price(code):
     url = f"https://finance.naver.com/item/main.naver?code={code}"
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-    soup = BeautifulSoup(r.text, "html.parser")
-    
-    tag = soup.select_one("p.no_today span.blind")
-    if not tag:
-        return 0
-
-    return int(soup.select_one("p.no_today span.blind").text.replace(",", ""))
-
-def get_us_price(ticker):
+    with timed("fetch", f"naver:{code}") as m:
+        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=REQUEST_TIMEOUT)
+        m.add_bytes(len(r.content))
+        r.raise_for_status()
+    with timed("parse", f"naver:{code}"):
+        soup = BeautifulSoup(r.text, "html.parser")
+        tag = soup.select_one("p.no_today span.blind")
+        if not tag:
+            raise ValueError(f"현재가 태그 없음: {code}")
+    return int(tag.text.replace(",", ""))
+
+def fetch_yahoo_price(ticker):
     url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-    try:
+    with timed("fetch", f"yahoo:{ticker}") as m:
         r = requests.get(
             url,
             headers={"User-Agent": "Mozilla/5.0"},
-            timeout=10
+            timeout=REQUEST_TIMEOUT
         )
+        m.add_bytes(len(r.content))
+        r.raise_for_status()
+    with timed("parse", f"yahoo:{ticker}"):
         data = r.json()
         return data["chart"]["result"][0]["meta"]["regularMarketPrice"]
-    except Exception as e:
-        print(f"[WARN] 미국 주가 조회 실패: {ticker} ({e})")
-        return 0
+
+# 같은 실행 안에서 (소스, 종목) 별 조회 결과 공유 → Future
+_quotes = {}
+_quotes_lock = threading.Lock()
+_fetch_pool = None   # run_all() 실행 중에만 스레드 풀 (없으면 호출한 스레드에서 바로 조회)
 
 
-def get_fx():
-    url = "https://query1.finance.yahoo.com/v8/finance/chart/KRW=X"
+def _guarded_result(source, symbol, fetch):
     try:
-        r = requests.get(
-            url,
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=10
-        )
-        data = r.json()
-        return data["chart"]["result"][0]["meta"]["regularMarketPrice"]
+        return guarded_price(source, symbol, fetch), None
+    except Exception as e:
+        return None, e
+
+
+def prefetch(source, symbol, fetch):
+    """조회 시작만 하고 Future 반환 (이미 조회 중 / 완료면 같은 Future)"""
+    with _quotes_lock:
+        future = _quotes.get((source, symbol))
+        if future is not None:
+            return future
+        if _fetch_pool is not None:
+            future = _quotes[(source, symbol)] = _fetch_pool.submit(_guarded_result, source, symbol, fetch)
+            return future
+        future = _quotes[(source, symbol)] = Future()
+    future.set_result(_guarded_result(source, symbol, fetch))
+    return future
+
+
+def guarded(source, symbol, fetch, label, stale):
+    result, error = prefetch(source, symbol, fetch).result()
+    if error is not None:
+        print(f"[WARN] 시세 없음: {label} ({error})")
+        return None
+    value, at = result
+    if at:
+        stale[label] = at
+    return value
+
+def get_kr_price(code, stale):
+    return guarded("naver", code, fetch_kr_price, code, stale)
+
+def get_us_price(ticker, stale):
+    return guarded("yahoo", ticker, fetch_yahoo_price, ticker, stale)
+
+def kr_prices(records, stale):
+    """포트폴리오 종목을 한꺼번에 조회 요청 후 결과 수집 → {코드: 가격} (실패 종목 제외)"""
+    for r in records:
+        prefetch("naver", r["code"], fetch_kr_price)
+    prices = {}
+    for r in records:
+        price = get_kr_price(r["code"], stale)
+        if price is not None:
+            prices[r["code"]] = price
+    return prices
+
+
+def get_fx(stale, pair="USD/KRW"):
+    # 환율은 FX_Service 공용 캐시 경유
+    try:
+        value, at = guarded_rate(pair)
     except Exception as e:
-        print(f"[WARN] 환율 조회 실패 (KRW=X): {e}")
-        return 0
+        print(f"[WARN] 환율 없음: {pair} ({e})")
+        return None
+    if at:
+        stale[pair] = at
+    return value
+
 
 # =====================================================
-# 가격 / 환율 조회
+# 차트 (프로세스 풀에서 실행 → 인자 / 반환값은 pickle 가능한 값만)
 # =====================================================
-def get_price(ticker):
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-    return r.json()["chart"]["result"][0]["meta"]["regularMarketPrice"]
+def _warm_up():
+    # 첫 리포트 차트 전에 워커에서 matplotlib import 를 미리 끝냄 (시세 조회와 겹침)
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
 
-def get_usdkrw():
-    url = "https://query1.finance.yahoo.com/v8/finance/chart/KRW=X"
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-    return r.json()["chart"]["result"][0]["meta"]["regularMarketPrice"]
+
+def render_bar_chart(path, labels, values):
+    """막대 + 값 라벨 → path 저장. 걸린 ms 반환"""
+    started = time.perf_counter()
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(6, 4))
+    bars = plt.bar(labels, values)
+    plt.title("Total Value")
+    plt.ylabel("won")
+    for b in bars:
+        plt.text(
+            b.get_x() + b.get_width() / 2,
+            b.get_height(),
+            f"{int(b.get_height()):,}",
+            ha="center",
+            va="bottom"
+        )
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+    return (time.perf_counter() - started) * 1000
 
 
 # =====================================================
 # 1️⃣ 김종학 ETF
 # =====================================================
+JONGHAK_PRINCIPAL = 41_180_360
+JONGHAK = [
+    {"name": "TIGER KRX 금현물", "code": "0072R0", "qty": 878, "buy": 9932},
+    {"name": "KODEX 200TR", "code": "278530", "qty": 575, "buy": 15176},
+    {"name": "TIGER 미국 S&P500", "code": "360750", "qty": 413, "buy": 21355},
+    {"name": "KODEX 200 타겟 위클리 커버드콜", "code": "498400", "qty": 1029, "buy": 17068},
+]
+
 def report_jonghak():
-    principal = 41_180_360
-    portfolio = [
-        ("TIGER KRX 금현물", "0072R0", 878, 9932),
-        ("KODEX 200TR", "278530", 575, 15176),
-        ("TIGER 미국 S&P500", "360750", 413, 21355),
-        ("KODEX 200 타겟 위클리 커버드콜", "498400", 1029, 17068),
-    ]
+    """→ (본문, 차트 없음)"""
+    stale = {}
+    book = Portfolio.from_records(JONGHAK).mark(kr_prices(JONGHAK, stale))
 
     lines = [
         "📊 김종학 ETF 리포트",
@@ -107,52 +197,53 @@ def report_jonghak():
         ""
     ]
 
-    total_now = 0
-
-    for name, code, qty, buy in portfolio:
-        price = get_kr_price(code)
-        now = price * qty
-        buy_amt = buy * qty
-        profit = now - buy_amt
-        rate = profit / buy_amt * 100
-
-        total_now += now
-
+    missing = []
+    for i, h in enumerate(book):
+        if not book.priced[i]:
+            missing.append(h.name)
+            continue
+        v = book.valuation(i, name=f"{h.name} ⚠️" if h.code in stale else None)
         lines.append(
-            f"■ {name}\n"
-            f"현재가: {price:,} 원\n"
-            f"평가금액: {now:,} 원\n"
-            f"수익률: {rate:+.2f}% {arrow(rate)}\n"
-            f"평가손익: {profit:+,} 원 {arrow(profit)}"
+            f"■ {v.name}\n"
+            f"현재가: {v.price:,} 원\n"
+            f"평가금액: {v.now:,} 원\n"
+            f"수익률: {v.rate:+.2f}% {arrow(v.rate, BOLD_ARROWS)}\n"
+            f"평가손익: {v.profit:+,} 원 {arrow(v.profit, BOLD_ARROWS)}"
         )
         lines.append("────────────────")
 
-    total_profit = total_now - principal
-    total_rate = total_profit / principal * 100
+    total = book.total(cost=JONGHAK_PRINCIPAL)
 
     lines += [
         "",
         "📈 전체 요약",
-        f"총 투자원금: {principal:,} 원",
-        f"총 평가금액: {total_now:,} 원",
-        f"전체 수익금: {total_profit:+,} 원 {arrow(total_profit)}",
-        f"전체 수익률: {total_rate:+.2f}% {arrow(total_rate)}",
+        f"총 투자원금: {total.cost:,} 원",
+        f"총 평가금액: {total.now:,} 원",
+        f"전체 수익금: {total.profit:+,} 원 {arrow(total.profit, BOLD_ARROWS)}",
+        f"전체 수익률: {total.rate:+.2f}% {arrow(total.rate, BOLD_ARROWS)}",
     ]
+    if missing:
+        lines.append(f"❌ 시세 조회 실패 (합계 제외): {', '.join(missing)}")
+    lines += stale_note(stale)
 
-    send_msg("\n".join(lines))
+    return "\n".join(lines), None
 
 # =====================================================
 # 2️⃣ Three Women ETF
 # =====================================================
-def report_three_women():
-    portfolio = [
-        ("Hyunjoo", 107, 6_731_607),
-        ("Seohye", 77, 5_581_502),
-        ("Wooseon", 72, 4_927_559),
-    ]
+THREE_WOMEN = [
+    {"name": "Hyunjoo", "ticker": "SPYM", "qty": 107, "currency": "USD", "principal": 6_731_607},
+    {"name": "Seohye", "ticker": "SPYM", "qty": 77, "currency": "USD", "principal": 5_581_502},
+    {"name": "Wooseon", "ticker": "SPYM", "qty": 72, "currency": "USD", "principal": 4_927_559},
+]
 
-    price = get_us_price("SPYM")
-    fx = get_fx()
+def report_three_women():
+    """→ (본문, (차트 파일, 설명, 이름, 평가금액)) / 시세·환율 없으면 안내 본문만"""
+    stale = {}
+    price = get_us_price("SPYM", stale)
+    fx = get_fx(stale)
+    if price is None or fx is None:
+        return "👩‍👩‍👧 Three Women ETF 리포트\n❌ SPYM 시세 / 환율 조회 실패로 이번 리포트를 건너뜁니다.", None
 
     lines = [
         "👩‍👩‍👧 Three Women ETF 리포트",
@@ -160,75 +251,62 @@ def report_three_women():
         ""
     ]
 
-    names, values = [], []
-    total_principal = total_now = 0
-
-    for name, qty, principal in portfolio:
-        now = price * qty * fx
-        profit = now - principal
-        rate = profit / principal * 100
-
-        names.append(name)
-        values.append(now)
-        total_principal += principal
-        total_now += now
+    book = Portfolio.from_records(THREE_WOMEN, key=lambda h: h.name).mark({"SPYM": price}, fx={"USD": fx})
 
+    for i in range(len(book)):
+        v = book.valuation(i)
         lines.append(
-            f"■ {name}\n"
-            f"현재가: {price * fx:.2f} 원\n"
-            f"평가금액: {now:,.0f} 원\n"
-            f"수익률: {rate:+.2f}% {arrow(rate)}\n"
-            f"평가손익: {profit:+,.0f} 원 {arrow(profit)}"
+            f"■ {v.name}\n"
+            f"현재가: {v.price:.2f} 원\n"
+            f"평가금액: {v.now:,.0f} 원\n"
+            f"수익률: {v.rate:+.2f}% {arrow(v.rate, BOLD_ARROWS)}\n"
+            f"평가손익: {v.profit:+,.0f} 원 {arrow(v.profit, BOLD_ARROWS)}"
         )
         lines.append("────────────────")
 
-    total_profit = total_now - total_principal
-    total_rate = total_profit / total_principal * 100
+    total = book.total()
 
     lines += [
         "",
         "📈 전체 요약",
-        f"총 투자원금: {total_principal:,} 원",
-        f"총 평가금액: {total_now:,.0f} 원",
-        f"전체 수익금: {total_profit:+,.0f} 원 {arrow(total_profit)}",
-        f"전체 수익률: {total_rate:+.2f}% {arrow(total_rate)}",
+        f"총 투자원금: {total.cost:,} 원",
+        f"총 평가금액: {total.now:,.0f} 원",
+        f"전체 수익금: {total.profit:+,.0f} 원 {arrow(total.profit, BOLD_ARROWS)}",
+        f"전체 수익률: {total.rate:+.2f}% {arrow(total.rate, BOLD_ARROWS)}",
     ]
     
     lines.append(f"💱 USD/KRW 환율: {fx:,.2f}원")
+    lines += stale_note(stale)
 
-    send_msg("\n".join(lines))
-
-    plt.figure(figsize=(6,4))
-    bars = plt.bar(names, values)
-    plt.title("Total Value")
-    plt.ylabel("won")
-    for b in bars:
-        plt.text(b.get_x()+b.get_width()/2, b.get_height(), f"{int(b.get_height()):,}",
-                 ha="center", va="bottom")
-    plt.tight_layout()
-    plt.savefig("three_women.png")
-    plt.close()
-    send_photo("three_women.png", "📊 Three Women ETF Total Value")
+    chart = ("three_women.png", "📊 Three Women ETF Total Value", [h.name for h in book], book.now.tolist())
+    return "\n".join(lines), chart
 
 # =====================================================
 # 3️⃣ 연금 ETF
 # =====================================================
-def report_pension():
-    portfolio = [
-        ("IRP", "ACE 미국 나스닥100 미국채 혼합 50 액티브", "438100", 88, 14621),
-        ("IRP", "TIGER 미국 S&P500", "360750", 50, 24485),
-        ("IRP", "KODEX 200 TR", "278530", 36, 28325),        
+PENSION_ACCOUNTS = ["IRP", "Non Tax Pension", "ISA", "Personal Account"]
+PENSION = [
+    {"account": "IRP", "name": "ACE 미국 나스닥100 미국채 혼합 50 액티브", "code": "438100", "qty": 88, "buy": 14621},
+    {"account": "IRP", "name": "TIGER 미국 S&P500", "code": "360750", "qty": 50, "buy": 24485},
+    {"account": "IRP", "name": "KODEX 200 TR", "code": "278530", "qty": 36, "buy": 28325},
 
-        ("Non Tax Pension", "TIGER KRX 금현물", "0072R0", 197, 12211),
-        ("Non Tax Pension", "KODEX 200TR", "278530", 155, 29532),
-        ("Non Tax Pension", "TIGER 미국 S&P500", "360750", 128, 23556),
-        ("Non Tax Pension", "TIGER 미국 나스닥100", "133690", 17, 158065),
+    {"account": "Non Tax Pension", "name": "TIGER KRX 금현물", "code": "0072R0", "qty": 197, "buy": 12211},
+    {"account": "Non Tax Pension", "name": "KODEX 200TR", "code": "278530", "qty": 155, "buy": 29532},
+    {"account": "Non Tax Pension", "name": "TIGER 미국 S&P500", "code": "360750", "qty": 128, "buy": 23556},
+    {"account": "Non Tax Pension", "name": "TIGER 미국 나스닥100", "code": "133690", "qty": 17, "buy": 158065},
 
-        ("ISA", "KODEX 미국 배당 커버드콜 액티브", "441640", 57, 12865),
+    {"account": "ISA", "name": "KODEX 미국 배당 커버드콜 액티브", "code": "441640", "qty": 57, "buy": 12865},
 
-        ("Personal Account", "KODEX 200타겟 위클리 커버드콜", "498400", 29, 17435),
-        ("Personal Account", "KODEX 금융 고배당 Top10 타겟 위클리 커버드콜", "498410", 33, 14960),
-    ]
+    {"account": "Personal Account", "name": "KODEX 200타겟 위클리 커버드콜", "code": "498400", "qty": 29, "buy": 17435},
+    {"account": "Personal Account", "name": "KODEX 금융 고배당 Top10 타겟 위클리 커버드콜", "code": "498410", "qty": 33, "buy": 14960},
+]
+
+def report_pension():
+    """→ (본문, (차트 파일, 설명, 계좌, 계좌별 평가금액))"""
+    stale = {}
+    book = Portfolio.from_records(PENSION).mark(kr_prices(PENSION, stale))
+    totals = book.totals()
+    missing = [f"{h.name} ({h.account})" for h, ok in zip(book, book.priced) if not ok]
 
     lines = [
         "🧓 연금 ETF 리포트",
@@ -236,120 +314,77 @@ def report_pension():
         ""
     ]
 
-    accounts = {}
-    totals = {}
-
-    # -------------------------
-    # 데이터 수집
-    # -------------------------
-    for acc, name, code, qty, buy in portfolio:
-        price = get_kr_price(code)
-        now = price * qty
-        buy_amt = buy * qty
-        profit = now - buy_amt
-        rate = profit / buy_amt * 100
-
-        accounts.setdefault(acc, [])
-        totals.setdefault(acc, {"buy": 0, "now": 0})
-
-        accounts[acc].append({
-            "name": name,
-            "price": price,
-            "now": now,
-            "profit": profit,
-            "rate": rate
-        })
-
-        totals[acc]["buy"] += buy_amt
-        totals[acc]["now"] += now
-
     # -------------------------
     # 출력 (계좌별)
     # -------------------------
     graph_labels = []
     graph_values = []
 
-    for acc in ["IRP", "Non Tax Pension", "ISA", "Personal Account"]:
+    for acc in PENSION_ACCOUNTS:
         lines.append(f"📂 [{acc} 계좌]")
         lines.append("────────────────")
 
-        for item in accounts.get(acc, []):
+        if acc not in totals:
+            continue
+
+        for i in book.groups()[acc]:
+            if not book.priced[i]:
+                continue
+            h = book.holdings[i]
+            v = book.valuation(i, name=f"{h.name} ⚠️" if h.code in stale else None)
             lines.append(
-                f"■ {item['name']}\n"
-                f"현재가: {item['price']:,} 원\n"
-                f"평가금액: {item['now']:,} 원\n"
-                f"수익률: {item['rate']:+.2f}% {arrow(item['rate'])}\n"
-                f"평가손익: {item['profit']:+,} 원 {arrow(item['profit'])}"
+                f"■ {v.name}\n"
+                f"현재가: {v.price:,} 원\n"
+                f"평가금액: {v.now:,} 원\n"
+                f"수익률: {v.rate:+.2f}% {arrow(v.rate, BOLD_ARROWS)}\n"
+                f"평가손익: {v.profit:+,} 원 {arrow(v.profit, BOLD_ARROWS)}"
             )
             lines.append("- - - - -")
 
-        acc_buy = totals[acc]["buy"]
-        acc_now = totals[acc]["now"]
-        acc_profit = acc_now - acc_buy
-        acc_rate = acc_profit / acc_buy * 100 if acc_buy else 0
-
+        t = totals[acc]
         lines.extend([
             f"🧾 {acc} 요약",
-            f"총 투자원금: {acc_buy:,} 원",
-            f"총 평가금액: {acc_now:,} 원",
-            f"총 수익금: {acc_profit:+,} 원 {arrow(acc_profit)}",
-            f"총 수익률: {acc_rate:+.2f}% {arrow(acc_rate)}",
+            f"총 투자원금: {t.cost:,} 원",
+            f"총 평가금액: {t.now:,} 원",
+            f"총 수익금: {t.profit:+,} 원 {arrow(t.profit, BOLD_ARROWS)}",
+            f"총 수익률: {t.rate:+.2f}% {arrow(t.rate, BOLD_ARROWS)}",
             ""
         ])
 
         graph_labels.append(acc)
-        graph_values.append(acc_now)
+        graph_values.append(t.now)
 
     # -------------------------
     # 전체 요약
     # -------------------------
-    total_buy = sum(v["buy"] for v in totals.values())
-    total_now = sum(v["now"] for v in totals.values())
-    total_profit = total_now - total_buy
-    total_rate = total_profit / total_buy * 100 if total_buy else 0
+    total = book.total()
 
     lines.extend([
         "📈 전체 요약",
-        f"총 투자원금: {total_buy:,} 원",
-        f"총 평가금액: {total_now:,} 원",
-        f"전체 수익금: {total_profit:+,} 원 {arrow(total_profit)}",
-        f"전체 수익률: {total_rate:+.2f}% {arrow(total_rate)}",
+        f"총 투자원금: {total.cost:,} 원",
+        f"총 평가금액: {total.now:,} 원",
+        f"전체 수익금: {total.profit:+,} 원 {arrow(total.profit, BOLD_ARROWS)}",
+        f"전체 수익률: {total.rate:+.2f}% {arrow(total.rate, BOLD_ARROWS)}",
     ])
+    if missing:
+        lines.append(f"❌ 시세 조회 실패 (합계 제외): {', '.join(missing)}")
+    lines += stale_note(stale)
 
-    send_msg("\n".join(lines))
-
-    # -------------------------
-    # 그래프 (계좌별 평가금액)
-    # -------------------------
-    plt.figure(figsize=(6, 4))
-    bars = plt.bar(graph_labels, graph_values)
-    plt.title("Total Value")
-    plt.ylabel("won")
-
-    for b in bars:
-        plt.text(
-            b.get_x() + b.get_width() / 2,
-            b.get_height(),
-            f"{int(b.get_height()):,}",
-            ha="center",
-            va="bottom"
-        )
-
-    plt.tight_layout()
-    plt.savefig("pension.png")
-    plt.close()
-
-    send_photo("pension.png", "📊 연금 계좌별 총 평가금액")
+    return "\n".join(lines), ("pension.png", "📊 연금 계좌별 총 평가금액", graph_labels, graph_values)
 
 
 # =====================================================
 # 4️⃣ 우리사주
 # =====================================================
+WOORISAJU = [
+    {"name": "현대차", "code": "005380", "qty": 239, "buy": 205_789},
+    {"name": "현대차우", "code": "005385", "qty": 20, "buy": 198_908},
+]
+
 def report_woorisaju():
-    portfolio = [
-        ("현대차", "005380", 239, 205_789),
-        ("현대차우", "005385", 20, 198_908),
-    ]
+    """→ (본문, 차트 없음)"""
+    stale = {}
+    book = Portfolio.from_records(WOORISAJU).mark(kr_prices(WOORISAJU, stale))
 
     lines = [
         "🏢 우리사주 리포트",
@@ -357,46 +392,83 @@ def report_woorisaju():
         ""
     ]
 
-    total_principal = total_now = 0
-
-    for name, code, qty, buy in portfolio:
-        price = get_kr_price(code)
-        now = price * qty
-        buy_amt = buy * qty
-        profit = now - buy_amt
-        rate = profit / buy_amt * 100
-
-        total_principal += buy_amt
-        total_now += now
-
+    missing = []
+    for i, h in enumerate(book):
+        if not book.priced[i]:
+            missing.append(h.name)
+            continue
+        v = book.valuation(i, name=f"{h.name} ⚠️" if h.code in stale else None)
         lines.append(
-            f"■ {name}\n"
-            f"현재가: {price:,} 원\n"
-            f"평가금액: {now:,} 원\n"
-            f"수익률: {rate:+.2f}% {arrow(rate)}\n"
-            f"평가손익: {profit:+,} 원 {arrow(profit)}"
+            f"■ {v.name}\n"
+            f"현재가: {v.price:,} 원\n"
+            f"평가금액: {v.now:,} 원\n"
+            f"수익률: {v.rate:+.2f}% {arrow(v.rate, BOLD_ARROWS)}\n"
+            f"평가손익: {v.profit:+,} 원 {arrow(v.profit, BOLD_ARROWS)}"
         )
         lines.append("────────────────")
 
-    total_profit = total_now - total_principal
-    total_rate = total_profit / total_principal * 100
+    total = book.total()
 
     lines += [
         "",
         "📈 전체 요약",
-        f"총 투자원금: {total_principal:,} 원",
-        f"총 평가금액: {total_now:,} 원",
-        f"전체 수익금: {total_profit:+,} 원 {arrow(total_profit)}",
-        f"전체 수익률: {total_rate:+.2f}% {arrow(total_rate)}",
+        f"총 투자원금: {total.cost:,} 원",
+        f"총 평가금액: {total.now:,} 원",
+        f"전체 수익금: {total.profit:+,} 원 {arrow(total.profit, BOLD_ARROWS)}",
+        f"전체 수익률: {total.rate:+.2f}% {arrow(total.rate, BOLD_ARROWS)}",
     ]
+    if missing:
+        lines.append(f"❌ 시세 조회 실패 (합계 제외): {', '.join(missing)}")
+    lines += stale_note(stale)
 
-    send_msg("\n".join(lines))
+    return "\n".join(lines), None
 
 # =====================================================
 # 실행
 # =====================================================
+REPORTS = [report_jonghak, report_three_women, report_pension, report_woorisaju]
+
+
+def deliver(report, charts):
+    """리포트 하나: 본문 작성 → 바로 전송 → 차트는 프로세스 풀에서 그려 끝나는 대로 전송"""
+    text, chart = report()
+    send_msg(with_perf_footer(text))
+    if chart is None:
+        return
+    path, caption, labels, values = chart
+    name = report.__name__.replace("report_", "")
+    try:
+        ms = charts.submit(render_bar_chart, path, labels, values).result()
+    except Exception as e:
+        record_failure("render", name, e)
+        raise
+    record_elapsed("render", name, ms)
+    send_photo(path, caption)
+
+
+def run_all(reports=REPORTS):
+    """→ 실패한 리포트 이름 목록 (하나가 실패해도 나머지는 계속)"""
+    global _fetch_pool
+    failed = []
+    # 스레드를 만든 뒤 fork 하지 않도록 spawn (Windows 와 같은 방식)
+    charts = ProcessPoolExecutor(CHART_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    _fetch_pool = ThreadPoolExecutor(FETCH_WORKERS, thread_name_prefix="fetch")
+    try:
+        charts.submit(_warm_up)
+        with ThreadPoolExecutor(len(reports), thread_name_prefix="report") as pool:
+            futures = {pool.submit(deliver, r, charts): r.__name__ for r in reports}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"[ERROR] {futures[future]} 실패: {e}")
+                    failed.append(futures[future])
+    finally:
+        _fetch_pool.shutdown()
+        _fetch_pool = None
+        charts.shutdown()
+    return failed
+
+
 if __name__ == "__main__":
-    report_jonghak()
-    report_three_women()
-    report_pension()
-    report_woorisaju()
+    sys.exit(1 if run_all() else 0)
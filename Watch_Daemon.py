@@ -0,0 +1,216 @@
+import os
+import sys
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from Core_Model import Portfolio, arrow
+from Quote_Client import QuoteClient, is_krx_code
+from Alert_Engine import AlertEngine, render_alerts
+from Perf_Metrics import timed, flush
+from Market_Calendar import is_open, market_date, is_session_over
+
+# =========================
+# 장중 감시 모드 (프로세스 하나로 KRX / 미국 장 동안 계속 실행)
+# =========================
+# 실행: python Watch_Daemon.py [--always] [--once]
+#   --always : 장 시간과 관계없이 계속 조회 (로컬 대체 서버 테스트용)
+#   --once   : 조회 + 리포트 한 번만 실행하고 종료
+#   --no-alerts : 조건 알림(Alert_Engine) 평가 끄기
+# 시작한 날(거래소 현지 날짜) 감시하는 장이 모두 폐장했거나 휴장이면 상태 / 지표를 저장하고 종료 (--always 제외)
+BOT_TOKEN = os.environ["BOT_TOKEN"]
+CHAT_ID = os.environ["CHAT_ID"]
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+
+POLL_SECONDS = int(os.environ.get("WATCH_POLL_SECONDS", "60"))
+REPORT_SECONDS = int(os.environ.get("WATCH_REPORT_SECONDS", "1800"))
+
+
+def is_session_open(market, now=None):
+    # 휴장일 / 조기 폐장은 Market_Calendar 기준
+    return is_open(market, now)
+
+
+# =========================
+# 고정 간격 스케줄러
+# =========================
+class IntervalScheduler:
+    """작업별로 정해진 간격마다 실행. 밀린 실행은 건너뛰고 다음 간격에 맞춤"""
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.jobs = []
+
+    def every(self, seconds, job):
+        self.jobs.append({"interval": seconds, "job": job, "next": self.clock()})
+
+    def run_pending(self):
+        now = self.clock()
+        for j in self.jobs:
+            if now >= j["next"]:
+                try:
+                    j["job"]()
+                except Exception as e:
+                    print(f"[WARN] 작업 실패: {getattr(j['job'], '__name__', j['job'])} ({e})")
+                missed = int((now - j["next"]) // j["interval"])
+                j["next"] += (missed + 1) * j["interval"]
+
+    def run_forever(self, until=None):
+        """until() 이 True 를 돌려줄 때까지 실행 (없으면 계속)"""
+        while until is None or not until():
+            self.run_pending()
+            wait = min(j["next"] for j in self.jobs) - self.clock()
+            if wait > 0:
+                self.sleep(wait)
+
+
+# =========================
+# 감시 포트폴리오 (Core_Model.Portfolio + 지금까지 받은 시세)
+# =========================
+class WatchBook:
+    def __init__(self, title, market, records):
+        """records: 각 봇의 포트폴리오 설정 (Holding.from_record 형식)"""
+        self.title = title
+        self.market = market
+        self.book = Portfolio.from_records(records)
+        self.symbols = list(dict.fromkeys(h.code for h in self.book))
+        self.foreign = any(h.currency != "KRW" for h in self.book)
+        self.quotes = {}          # 종목 → 마지막으로 받은 가격 (현지 통화)
+        self.total = None         # 전체 합계 Valuation (처음 반영 전에는 None)
+        self.last_pushed = None
+
+    @property
+    def ready(self):
+        return self.total is not None and bool(self.book.priced.all())
+
+    def update(self, quotes, fx=None):
+        """이번 조회 시세 반영 (빠진 종목은 직전 가격 유지) → 전체 합계 Valuation
+
+        외화 종목이 있는데 환율이 없으면 반영하지 않고 직전 합계 유지
+        """
+        self.quotes.update((s, quotes[s]) for s in self.symbols if s in quotes)
+        if self.foreign and not fx:
+            return self.total
+        self.book.mark(self.quotes, fx={"USD": fx} if self.foreign else None)
+        self.total = self.book.total(self.title)
+        return self.total
+
+
+def load_books():
+    import Jonghak_ETF_Telegram as jonghak
+    import Pension_ETF_Telegram as pension
+    import Woorisaju as woorisaju
+    import Three_Women_ETF as three_women
+
+    return [
+        WatchBook("📊 김종학 ETF", "KRX", jonghak.portfolio),
+        WatchBook("📊 연금 / ISA", "KRX", pension.portfolio),
+        WatchBook("📊 우리사주", "KRX", woorisaju.portfolio),
+        WatchBook("👩‍👩‍👧 Three Women ETF", "US", three_women.portfolio),
+    ]
+
+
+# =========================
+# 데몬
+# =========================
+class WatchDaemon:
+    def __init__(self, books, client=None, always_open=False, alerts=None):
+        self.books = books
+        self.client = client or QuoteClient(ttl=max(1, POLL_SECONDS // 2))
+        self.always_open = always_open
+        self.alerts = alerts
+        self.fx = None
+        self.days = {}          # 시장 → 감시할 거래일 (run 시작 시 현지 날짜)
+
+    def open_books(self):
+        return [b for b in self.books if self.always_open or is_session_open(b.market)]
+
+    def finished(self):
+        """감시하는 장이 모두 시작한 날 더 열리지 않으면 True"""
+        if self.always_open:
+            return False
+        return all(is_session_over(m, day) for m, day in self.days.items())
+
+    def poll(self):
+        """열린 장의 종목만 한 번에 조회해 평가액 갱신"""
+        books = self.open_books()
+        if not books:
+            return
+
+        symbols = {s for b in books for s in b.symbols}
+        quotes = self.client.prices(symbols)
+
+        if any(not is_krx_code(s) for s in symbols):
+            try:
+                self.fx = self.client.usdkrw()
+            except Exception as e:
+                print(f"[WARN] 환율 조회 실패 ({e})")
+
+        for b in books:
+            b.update(quotes, self.fx)
+
+        # 조회할 때마다 알림 규칙 평가 → 발동한 것만 짧게 전송
+        if self.alerts:
+            krw_quotes = {s: p for s, p in quotes.items() if is_krx_code(s)}
+            fired = self.alerts.evaluate(krw_quotes, self.fx)
+            if fired:
+                self.send(render_alerts(fired))
+            self.alerts.save()
+
+    def push_due(self):
+        """직전 알림 이후 평가액이 바뀐 포트폴리오만 전송"""
+        now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%H:%M")
+        for b in self.open_books():
+            if not b.ready or b.last_pushed == round(b.total.now):
+                continue
+            self.send(render_summary(b, now))
+            b.last_pushed = round(b.total.now)
+
+    @timed("send", "telegram:sendMessage")
+    def send(self, text):
+        url = f"{TELEGRAM_API_URL}/bot{BOT_TOKEN}/sendMessage"
+        self.client.session.post(url, data={"chat_id": CHAT_ID, "text": text}, timeout=10)
+
+    def run(self, once=False):
+        if once:
+            self.poll()
+            self.push_due()
+            return
+        self.days = {b.market: market_date(b.market) for b in self.books}
+        scheduler = IntervalScheduler()
+        scheduler.every(POLL_SECONDS, self.poll)
+        scheduler.every(REPORT_SECONDS, self.push_due)
+        scheduler.every(600, flush)
+        scheduler.run_forever(until=self.finished)
+        print("[INFO] 감시하는 장이 모두 마감 → 종료")
+        if self.alerts:
+            self.alerts.save()
+        flush()
+
+
+def render_summary(book, now):
+    total = book.total
+    lines = [
+        f"{book.title} 장중 ({now})",
+        f"평가금액: {total.now:,.0f}원",
+        f"수익률: {total.rate:+.2f}% {arrow(total.rate)}",
+    ]
+    if book.last_pushed is not None:
+        delta = total.now - book.last_pushed
+        lines.append(f"직전 알림 대비: {delta:+,.0f}원 {arrow(delta)}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    daemon = WatchDaemon(
+        load_books(),
+        always_open="--always" in sys.argv,
+        alerts=None if "--no-alerts" in sys.argv else AlertEngine(),
+    )
+    try:
+        daemon.run(once="--once" in sys.argv)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.client.close()
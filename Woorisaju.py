@@ -4,6 +4,13 @@ from datetime import datetime
 import time
 import os
 import json
+from Perf_Metrics import timed, with_perf_footer
+from Telegram_Delivery import deliver_text
+from Market_Calendar import check_sessions, mark_reported
+from Price_Guard import REQUEST_TIMEOUT, guarded_price, stale_note
+from Price_History import record_closes
+from Report_Renderer import compile_template, render_block, render_blocks
+from Core_Model import Portfolio, Quote
 
 # =========================
 # 텔레그램 설정
@@ -24,18 +31,39 @@ portfolio = [
     {"name": "현대차우", "code": "005385", "qty": 20, "buy": 198908},
 ]
 
+# =========================
+# 리포트 템플릿
+# =========================
+HOLDING_BLOCK = compile_template("■ {name}", [
+    ("현재가", "{price:,}원"),
+    ("수익률", "{rate:+.2f}% {profit_arrow}"),
+    ("평가손익", "{profit:+,}원"),
+    ("전일 대비", "{delta:+,}원 {delta_arrow}"),
+])
+
+SUMMARY_BLOCK = compile_template("📈 전체 요약", [
+    ("총 평가금액", "{now:,}원"),
+    ("전체 수익금", "{profit:+,}원"),
+    ("전체 수익률", "{rate:+.2f}%"),
+    ("전일 대비 합계", "{delta:+,}원 {delta_arrow}"),
+])
+
 # =========================
 # 현재가 조회
 # =========================
 def get_current_price(code):
     url = f"https://finance.naver.com/item/main.naver?code={code}"
     headers = {"User-Agent": "Mozilla/5.0"}
-    res = requests.get(url, headers=headers, timeout=10)
-    soup = BeautifulSoup(res.text, "html.parser")
+    with timed("fetch", f"naver:{code}") as m:
+        res = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        m.add_bytes(len(res.content))
+        res.raise_for_status()
 
-    price = soup.select_one("p.no_today span.blind")
-    if not price:
-        raise ValueError("현재가 조회 실패")
+    with timed("parse", f"naver:{code}"):
+        soup = BeautifulSoup(res.text, "html.parser")
+        price = soup.select_one("p.no_today span.blind")
+        if not price:
+            raise ValueError(f"현재가 조회 실패: {code}")
 
     return int(price.text.replace(",", ""))
 
@@ -57,83 +85,79 @@ def save_snapshot(snapshot):
 # 텔레그램 전송
 # =========================
 def send_telegram(text):
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    requests.post(url, data={"chat_id": CHAT_ID, "text": text}, timeout=10)
+    # REPORT_DELIVERY=edit 이면 지난 리포트 메시지를 수정하거나 변경 없을 때 생략
+    deliver_text(BOT_TOKEN, CHAT_ID, "woorisaju", text)
 
 # =========================
 # 리포트 실행
 # =========================
-def run_report():
-    prev_snapshot = load_snapshot()
-    today_snapshot = {}
-
-    total_buy = 0
-    total_now = 0
-    total_prev = 0
-
-    lines = []
-    lines.append("📊 우리사주 리포트")
-    lines.append(f"🕒 {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    lines.append("")
-
-    # 현재가 미리 조회
+def fetch_prices():
+    """→ (현재가, 지연 시세 {종목코드: 저장 시각}). 대체값도 없는 종목은 빠짐"""
     prices = {}
-    for item in portfolio:
-        prices[item["code"]] = get_current_price(item["code"])
-        time.sleep(0.3)
-
+    stale = {}
     for item in portfolio:
         code = item["code"]
-        name = item["name"]
-        qty = item["qty"]
-        buy = item["buy"]
-        price = prices[code]
+        try:
+            prices[code], at = guarded_price("naver", code, get_current_price)
+        except Exception as e:
+            print(f"[WARN] {item['name']} 시세 없음 ({e})")
+            continue
+        if at:
+            stale[code] = at
+        time.sleep(0.3)
+    return prices, stale
 
-        buy_amt = qty * buy
-        now_amt = qty * price
-        prev_amt = prev_snapshot.get(code, now_amt)
+def build_report(prices, prev_snapshot, stale=None):
+    """조회된 현재가로 리포트 작성 → (본문, 오늘 스냅샷)
 
-        profit = now_amt - buy_amt
-        rate = profit / buy_amt * 100
-        delta = now_amt - prev_amt
+    prices 에 없는 종목은 본문에서 빼고 스냅샷은 이전 값 유지,
+    stale 종목은 ⚠️ 표시 후 하단에 기준 시각 안내
+    """
+    stale = stale or {}
+    book = Portfolio.from_records(portfolio).mark(Quote.table(prices, stale), prev_snapshot)
+    missing = [h.name for h, ok in zip(book, book.priced) if not ok]
+    stale_names = {h.name: stale[h.code] for h, s in zip(book, book.stale) if s}
 
-        total_buy += buy_amt
-        total_now += now_amt
-        total_prev += prev_amt
+    lines = []
+    lines.append("📊 우리사주 리포트")
+    lines.append(f"🕒 {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    lines.append("")
 
-        today_snapshot[code] = now_amt
+    rows = [
+        book.valuation(i, name=f"{h.name} ⚠️" if book.stale[i] else None)
+        for i, h in enumerate(book) if book.priced[i]
+    ]
+    lines += render_blocks(HOLDING_BLOCK, rows, separator="────────────────────")
 
-        emoji = "🔺" if profit > 0 else "🔻" if profit < 0 else "➖"
-        delta_emoji = "🔺" if delta > 0 else "🔻" if delta < 0 else "➖"
+    # 전체 요약
+    lines.append("")
+    lines.append(render_block(SUMMARY_BLOCK, book.total()))
+    if missing:
+        lines.append(f"❌ 시세 조회 실패 (합계 제외): {', '.join(missing)}")
+    lines += stale_note(stale_names)
 
-        lines.append(
-            f"■ {name}\n"
-            f"현재가: {price:,}원\n"
-            f"수익률: {rate:+.2f}% {emoji}\n"
-            f"평가손익: {profit:+,}원\n"
-            f"전일 대비: {delta:+,}원 {delta_emoji}"
-        )
-        lines.append("────────────────────")
+    return "\n".join(lines), book.snapshot(prev_snapshot)
 
-        time.sleep(0.3)
+def run_report():
+    # KRX 휴장일이면 시세 조회 전에 종료
+    run, sessions = check_sessions("woorisaju", ["KRX"])
+    if not run:
+        return
 
-    # 전체 요약
-    total_profit = total_now - total_buy
-    total_rate = total_profit / total_buy * 100
-    total_delta = total_now - total_prev
-    total_delta_emoji = "🔺" if total_delta > 0 else "🔻" if total_delta < 0 else "➖"
+    prev_snapshot = load_snapshot()
 
-    lines.append("")
-    lines.append("📈 전체 요약")
-    lines.append(f"총 평가금액: {total_now:,}원")
-    lines.append(f"전체 수익금: {total_profit:+,}원")
-    lines.append(f"전체 수익률: {total_rate:+.2f}%")
-    lines.append(f"전일 대비 합계: {total_delta:+,}원 {total_delta_emoji}")
+    # 현재가 미리 조회
+    prices, stale = fetch_prices()
 
-    send_telegram("\n".join(lines))
+    text, today_snapshot = build_report(prices, prev_snapshot, stale)
+    send_telegram(with_perf_footer(text))
 
-    # 스냅샷 저장
-    save_snapshot(today_snapshot)
+    # 새 거래일일 때만 스냅샷 갱신 (전일 대비 기준 = 직전 거래일 종가)
+    if sessions:
+        save_snapshot(today_snapshot)
+        mark_reported("woorisaju", sessions)
+        # 리스크 분석용 일별 종가 (지연 시세 제외)
+        record_closes({c: p for c, p in prices.items() if c not in stale}, sessions["KRX"])
 
 # =========================
 # 실행
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Share_Allocator import allocate, naive_allocate, weight_deviation
+from Rebalancer import rebalance
+
+# =========================
+# 정수 배분 벤치마크
+# python benchmarks/bench_allocation.py
+# =========================
+CASES = [
+    (5, 8_500_000),
+    (50, 100_000_000),
+    (300, 1_000_000_000),
+    (1000, 10_000_000_000),
+]
+
+
+def run_case(n, budget, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = np.round(rng.lognormal(mean=10, sigma=1.2, size=n), 0) + 1000
+    weights = rng.dirichlet(np.ones(n)) * 100
+
+    t = time.perf_counter()
+    _, naive_cash = naive_allocate(budget, prices, weights)
+    naive_ms = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    qty, cash = allocate(budget, prices, weights)
+    solve_ms = (time.perf_counter() - t) * 1000
+
+    dev = np.abs(weight_deviation(budget, prices, weights, qty)).max()
+    print(
+        f"{n:>5} 종목 | 예산 {budget:>15,.0f} | "
+        f"잔액 {naive_cash / budget * 100:5.2f}% → {cash / budget * 100:5.3f}% | "
+        f"최대 비중오차 {dev:5.3f}%p | "
+        f"{naive_ms:7.2f} ms → {solve_ms:8.2f} ms"
+    )
+
+
+def check_rebalance():
+    """허용 오차를 벗어난 종목이 하나뿐이어도 계좌 전체 목표 비중으로 되돌리는지 확인"""
+    trades, left, before, after = rebalance([1000, 1000, 1000], [430, 385, 185], [40, 40, 20], band=2.0)
+    assert trades.tolist() == [-30, 0, 0], trades
+    assert left == 30_000 and after.round(1).tolist() == [40.0, 38.5, 18.5], (left, after)
+
+    # 유지 종목이 목표보다 많아 쓸 수 있는 금액이 모자라면 그 안에서 비율대로
+    trades, left, _, _ = rebalance([1000, 1000, 1000], [300, 410, 290], [40, 40, 20], band=5.0)
+    assert trades.tolist() == [93, 0, -93] and left == 0, (trades, left)
+
+
+if __name__ == "__main__":
+    check_rebalance()
+    for n, budget in CASES:
+        run_case(n, budget)
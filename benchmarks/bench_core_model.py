@@ -0,0 +1,132 @@
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Core_Model import Holding, Portfolio, Quote
+
+# =========================
+# 보유 종목 평가 벤치마크 (dict 방식 vs Core_Model)
+# python benchmarks/bench_core_model.py
+# =========================
+# 기존 방식: 종목마다 8개 키 dict 를 만들고 계좌 합계도 dict 에 += 누적 (연금 리포트 build_report)
+# Core_Model: Holding 은 __slots__, 평가금액 / 합계는 Portfolio 배열 연산
+# 리포트는 실행마다 Portfolio 를 새로 만들므로 비교 기준은 "생성+평가" (평가만은 참고용)
+N_POSITIONS = (1_000, 10_000, 50_000)
+ACCOUNTS = ["IRP", "Non Tax Pension", "ISA", "Personal Account"]
+REPEAT = 5
+
+
+def make_records(n, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        price = rng.randint(5_000, 200_000)
+        records.append({
+            "account": ACCOUNTS[i % len(ACCOUNTS)],
+            "name": f"종목 {i:05d}",
+            "code": f"{i:06d}",
+            "qty": rng.randint(1, 500),
+            "buy": int(price * rng.uniform(0.7, 1.3)),
+        })
+    prices = {r["code"]: int(r["buy"] * rng.uniform(0.8, 1.2)) for r in records}
+    prev = {f"{r['account']}_{r['code']}": r["qty"] * prices[r["code"]] for r in records[::2]}
+    return records, prices, prev
+
+
+def legacy(records, prices, prev):
+    accounts = {}
+    totals = {}
+    for p in records:
+        acc = p["account"]
+        code = p["code"]
+        qty = p["qty"]
+        if code not in prices:
+            continue
+        buy_amt = qty * p["buy"]
+        now_amt = qty * prices[code]
+        prev_amt = prev.get(f"{acc}_{code}", now_amt)
+        accounts.setdefault(acc, [])
+        totals.setdefault(acc, {"buy": 0, "now": 0, "prev": 0})
+        accounts[acc].append({
+            "name": p["name"],
+            "code": code,
+            "qty": qty,
+            "price": prices[code],
+            "buy": buy_amt,
+            "now": now_amt,
+            "prev": prev_amt,
+            "profit": now_amt - buy_amt,
+        })
+        totals[acc]["buy"] += buy_amt
+        totals[acc]["now"] += now_amt
+        totals[acc]["prev"] += prev_amt
+    return accounts, totals
+
+
+def core(book, quotes, prev):
+    book.mark(quotes, prev)
+    return book, book.totals()
+
+
+def bench(fn, *args):
+    best = float("inf")
+    for _ in range(REPEAT):
+        t = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def peak_kb(fn, *args):
+    """결과를 들고 있는 동안의 메모리 (KB)"""
+    tracemalloc.start()
+    result = fn(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 1024
+
+
+def attr_access(objs, get):
+    total = 0
+    for o in objs:
+        total += get(o)
+    return total
+
+
+if __name__ == "__main__":
+    for n in N_POSITIONS:
+        records, prices, prev = make_records(n)
+        quotes = Quote.table(prices)
+
+        def build():
+            return Portfolio.from_records(records, key=lambda h: f"{h.account}_{h.code}")
+
+        book = build()
+        # 결과 검증: 계좌 합계가 같아야 함
+        _, old_totals = legacy(records, prices, prev)
+        _, new_totals = core(book, quotes, prev)
+        assert {a: (t["now"], t["buy"], t["prev"]) for a, t in old_totals.items()} == \
+            {a: (t.now, t.cost, t.prev) for a, t in new_totals.items()}
+
+        print(
+            f"{n:>6} 종목 | 평가+합계  dict {bench(legacy, records, prices, prev):8.2f} ms"
+            f" | Portfolio 생성+평가 {bench(lambda: core(build(), quotes, prev)):8.2f} ms"
+            f" (평가만 {bench(core, book, quotes, prev):8.2f} ms)"
+        )
+        print(
+            f"{'':>6}      | 메모리     dict {peak_kb(legacy, records, prices, prev):8.0f} KB"
+            f" | Portfolio {peak_kb(lambda: core(build(), quotes, prev)):8.0f} KB"
+        )
+
+        dicts = [dict(r) for r in records]
+        holdings = [Holding.from_record(r) for r in records]
+        print(
+            f"{'':>6}      | 종목 객체  dict {peak_kb(lambda: [dict(r) for r in records]):8.0f} KB"
+            f" | Holding   {peak_kb(lambda: [Holding.from_record(r) for r in records]):8.0f} KB"
+            f" | 속성 접근 dict {bench(attr_access, dicts, lambda o: o['qty']):6.2f} ms"
+            f" / slots {bench(attr_access, holdings, lambda o: o.qty):6.2f} ms"
+        )
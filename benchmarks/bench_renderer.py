@@ -0,0 +1,99 @@
+import os
+import sys
+import html
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "bench")
+os.environ.setdefault("CHAT_ID", "0")
+from Report_Renderer import Row, render_block, render_blocks
+from Pension_ETF_Telegram import HOLDING_BLOCK, ACCOUNT_BLOCK
+
+# =========================
+# 리포트 렌더링 벤치마크 (1,000 종목)
+# python benchmarks/bench_renderer.py
+# =========================
+N_HOLDINGS = 1000
+REPEAT = 20
+
+
+def make_rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        qty = rng.randint(1, 500)
+        price = rng.randint(5_000, 200_000)
+        buy = int(price * rng.uniform(0.7, 1.3))
+        now = qty * price
+        rows.append(Row(f"종목 {i:04d}", now, qty * buy, int(now * rng.uniform(0.97, 1.03)), price=price))
+    total = sum(r.now for r in rows)
+    for r in rows:
+        r.weight = r.now / total * 100
+    return rows
+
+
+def legacy(rows, mode="text"):
+    """기존 방식: 종목마다 이모지 삼항식 + f-string, 문자열 += 누적 (계좌 요약 포함, 출력은 rendered 와 같음)"""
+    markup = mode == "html"
+    b, _b = ("<b>", "</b>") if markup else ("", "")
+    text = ""
+    for r in rows:
+        name = html.escape(r.name) if markup else r.name
+        profit = r.now - r.cost
+        rate = profit / r.cost * 100 if r.cost else 0
+        delta = r.now - r.prev
+        rate_emoji = "🔺" if rate > 0 else "🔻" if rate < 0 else "➖"
+        delta_emoji = "🔺" if delta > 0 else "🔻" if delta < 0 else "➖"
+        text += (
+            f"{b}■ {name}{_b}\n"
+            f"현재가: {r.price:,}원\n"
+            f"수익률: {rate:+.2f}% {rate_emoji}\n"
+            f"평가손익: {profit:+,}원\n"
+            f"전일 대비: {delta:+,}원 {delta_emoji}\n"
+            f"비중: {r.weight:.1f}%\n"
+        )
+        text += "- - - - -\n"
+    now = sum(r.now for r in rows)
+    cost = sum(r.cost for r in rows)
+    profit = now - cost
+    rate = profit / cost * 100 if cost else 0
+    delta = now - sum(r.prev for r in rows)
+    rate_emoji = "🔺" if rate > 0 else "🔻" if rate < 0 else "➖"
+    delta_emoji = "🔺" if delta > 0 else "🔻" if delta < 0 else "➖"
+    text += (
+        f"{b}🧾 전체 요약{_b}\n"
+        f"총 평가금액: {now:,}원\n"
+        f"총 수익금: {profit:+,}원\n"
+        f"총 수익률: {rate:+.2f}% {rate_emoji}\n"
+        f"전일 대비: {delta:+,}원 {delta_emoji}\n"
+        f"========================\n"
+    )
+    return text
+
+
+def rendered(rows, mode="text"):
+    lines = render_blocks(HOLDING_BLOCK, rows, separator="- - - - -", mode=mode)
+    total = Row("전체", sum(r.now for r in rows), sum(r.cost for r in rows), sum(r.prev for r in rows))
+    lines.append(render_block(ACCOUNT_BLOCK, total, mode))
+    return "\n".join(lines)
+
+
+def bench(fn, *args):
+    best = float("inf")
+    for _ in range(REPEAT):
+        t = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    for n in (10, 100, N_HOLDINGS):
+        rows = make_rows(n)
+        for mode in ("text", "html"):
+            assert legacy(rows, mode) == rendered(rows, mode)
+            print(
+                f"{n:>5} 종목 {mode:<4} | 기존 {bench(legacy, rows, mode):7.2f} ms | "
+                f"템플릿 {bench(rendered, rows, mode):7.2f} ms"
+            )